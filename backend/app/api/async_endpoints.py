@@ -0,0 +1,20 @@
+from django.urls import path
+
+from app.api.endpoints import urlpatterns as sync_urlpatterns
+from app.api.views.async_views import async_view
+from app.api.views.simulation import NextStepView, StartUserScenarioView
+from app.api.views.template_scenario import TemplateScenarioUserListView
+from history.view import ResultView, ResultsView
+
+# API routes for ASGI deployments (see softDsim/asgi.py). The hot endpoints are
+# replaced by their async variants, all other routes are the same as in endpoints.py.
+urlpatterns = [
+    path("sim/next", async_view(NextStepView)),
+    path("sim/start", async_view(StartUserScenarioView)),
+    path("template-overview", async_view(TemplateScenarioUserListView)),
+    path(
+        "template-overview/<int:scenario_id>", async_view(TemplateScenarioUserListView)
+    ),
+    path("result/<int:id>", async_view(ResultView)),
+    path("results", async_view(ResultsView)),
+] + sync_urlpatterns
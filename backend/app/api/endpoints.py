@@ -8,6 +8,7 @@ from app.api.security.security import (
     RegisterView,
 )
 from app.api.views.management_goal import ManagementGoalView
+from app.api.views.metrics import DatabaseConnectionView, MongoConnectionView
 from app.api.views.question import QuestionView
 from app.api.views.question_collection import QuestionCollectionView
 from app.api.views.scenario_config import ScenarioConfigView
@@ -15,6 +16,11 @@ from app.api.views.simulation import (
     AdjustMemberView,
     StartUserScenarioView,
     NextStepView,
+    StreamStepView,
+    BatchStepView,
+    StepJobView,
+    ForecastView,
+    AdmissionView,
 )
 from app.api.views.team import SkillTypeView, TeamViews, MemberView, SkillTypeInfoView
 # all request with /api/ land here (see softDsim/urls.py)
@@ -27,7 +33,15 @@ from app.api.views.template_scenario import (
 from app.api.views.user import UserView
 # from app.api.views.sim_api import ParameterSimulation
 from app.api.views.user_scenario import UserScenarioViews
-from history.view import HistoryView, ResultView, ResultsView
+from history.view import (
+    HistoryExportView,
+    HistoryView,
+    LeaderboardView,
+    ResultExportView,
+    ResultStatisticsView,
+    ResultView,
+    ResultsView,
+)
 from app.api.views.course import CourseView, CourseUserView, CourseScenarioView, UserCoursesView
 from app.api.views.score_card import ScoreCardView
 
@@ -85,6 +99,14 @@ urlpatterns = [
     # SIMULATION Endpoints
     path("sim/start", StartUserScenarioView.as_view()),
     path("sim/next", NextStepView.as_view()),
+    path("sim/stream", StreamStepView.as_view()),
+    path("sim/batch", BatchStepView.as_view()),
+    path("sim/jobs", StepJobView.as_view()),
+    path("sim/jobs/<int:id>", StepJobView.as_view()),
+    path("sim/forecast", ForecastView.as_view()),
+    path("sim/admission", AdmissionView.as_view()),
+    path("metrics/db", DatabaseConnectionView.as_view()),
+    path("metrics/mongo", MongoConnectionView.as_view()),
     path("sim/team", AdjustMemberView.as_view()),
     path("sim/team/<int:id>", AdjustMemberView.as_view()),
     # HISTORY Endpoints
@@ -92,6 +114,10 @@ urlpatterns = [
     path("history/<int:id>", HistoryView.as_view()),
     path("result/<int:id>", ResultView.as_view()),
     path("results", ResultsView.as_view()),
+    path("results/statistics", ResultStatisticsView.as_view()),
+    path("results/export", ResultExportView.as_view()),
+    path("history/export", HistoryExportView.as_view()),
+    path("leaderboard/<int:template_id>", LeaderboardView.as_view()),
     # path("sim/param", ParameterSimulation.as_view()),
 
     # Course
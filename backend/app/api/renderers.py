@@ -0,0 +1,20 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer for the simulation endpoints. Renders with orjson if it is
+    installed and falls back to the default DRF renderer otherwise (or for data
+    orjson cannot handle)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from config import get_config
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the thread pool that runs the async variants of the views. Its size
+    (ASYNC_WORKERS) bounds how many of these requests use the database and the CPU
+    at the same time, all other requests only wait on the event loop."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_config().async_workers, thread_name_prefix="async-view"
+        )
+    return _executor
+
+
+def run_view(view, request, *args, **kwargs):
+    """Runs a sync view and renders its response in a thread of the executor. The
+    database connections of the thread are handled like at the start and end of a
+    request."""
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view_class):
+    """Returns an async variant of a DRF view class for ASGI deployments. The view
+    itself (authentication, ORM work and simulation) runs in the bounded executor
+    instead of the single thread ASGI uses for sync views. The view is the sync view
+    wrapped with sync_to_async, it makes no async ORM queries."""
+    view = view_class.as_view()
+
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(
+            run_view, thread_sensitive=False, executor=get_executor()
+        )(view, request, *args, **kwargs)
+
+    # like all DRF views, CSRF is handled by the authentication classes
+    wrapper.csrf_exempt = True
+    return wrapper
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from app.decorators.decorators import allowed_roles
+from app.src.util.pagination_util import paginated_response
 from app.models.course import Course
 from app.serializers.course import CourseNameSerializer, CourseSerializer
 from custom_user.models import User
@@ -28,15 +29,14 @@ class CourseView(APIView):
                 }
                 return Response(response_data, status=status.HTTP_200_OK)
 
-            courses = Course.objects.all()
-            serializer = CourseNameSerializer(courses, many=True)
-            response_data = {
-                "data": [{
-                    "id": course.id,
-                    "name": course.name
-                } for course in courses]
-            }
-            return Response(response_data, status=status.HTTP_200_OK)
+            return paginated_response(
+                request,
+                Course.objects.all(),
+                CourseSerializer,
+                body=lambda data, next_cursor: {"data": data, "next": next_cursor},
+                prefetch_related={"scenarios": "scenarios", "users": "users"},
+                default_fields=["id", "name"],
+            )
 
         except Exception as e:
             return Response(
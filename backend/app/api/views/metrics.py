@@ -0,0 +1,37 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from app.db.metrics import connection_metrics
+from app.db.mongo import mongo_clients
+from app.decorators.decorators import allowed_roles
+
+
+class DatabaseConnectionView(APIView):
+    """Returns the database connection counters of the worker that handles the
+    request: open connections, connects and closes, the time spent waiting for new
+    connections and failed health checks."""
+
+    permission_classes = (IsAuthenticated,)
+
+    @allowed_roles(["admin"])
+    def get(self, request):
+        return Response(connection_metrics.as_dict(), status=status.HTTP_200_OK)
+
+
+class MongoConnectionView(APIView):
+    """Returns the MongoDB pool counters of the worker that handles the request and
+    whether the server answers a ping."""
+
+    permission_classes = (IsAuthenticated,)
+
+    @allowed_roles(["admin"])
+    def get(self, request):
+        metrics = mongo_clients.metrics()
+        return Response(
+            metrics,
+            status=status.HTTP_200_OK
+            if metrics["healthy"]
+            else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
@@ -1,4 +1,5 @@
 import logging
+import os
 
 from django.core.exceptions import ObjectDoesNotExist
 from custom_user.models import User
@@ -7,8 +8,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from app.api.renderers import FastJSONRenderer
 from app.cache.scenario import CachedScenario
-from app.decorators.decorators import allowed_roles, has_access_to_scenario
+from app.decorators.decorators import (
+    admission_controlled,
+    allowed_roles,
+    has_access_to_scenario,
+)
 from app.exceptions import (
     SimulationException,
     RequestTypeException,
@@ -17,7 +23,9 @@ from app.exceptions import (
     RequestTypeMismatchException,
     TooManyMeetingsException,
 )
+from app.models.idempotency_key import IdempotencyKey
 from app.models.scenario import ScenarioConfig
+from app.models.step_job import StepJob
 from app.models.task import Task
 from app.models.team import Member, SkillType
 from app.models.team import Team
@@ -25,8 +33,21 @@ from app.models.template_scenario import TemplateScenario
 from app.models.user_scenario import ScenarioState, UserScenario, EventStatus
 from app.serializers.team import MemberSerializer
 from app.serializers.user_scenario import UserScenarioSerializer
-from app.src.simulation import continue_simulation
-from app.src.util.scenario_util import create_correct_request_model
+from app.src.forecast import forecast
+from app.src.jobs import enqueue_step
+from app.src.stream import astream_step, stream_step
+from app.src.simulation import continue_simulation, continue_simulation_batch
+from app.src.util.admission_util import get_admission_controller
+from app.src.util.delta_util import encode_step_response
+from app.src.util.streaming_util import is_asgi_request
+from app.src.util.user_scenario_util import lock_scenario_state
+from app.src.util.scenario_util import (
+    create_correct_request_model,
+    create_request_model,
+)
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from pydantic import ValidationError
 from datetime import datetime, timezone
 
 
@@ -35,6 +56,7 @@ class StartUserScenarioView(APIView):
 
     @allowed_roles(["student"])
     @has_access_to_scenario("template-id", True)
+    @admission_controlled
     def post(self, request):
         template_id = request.data.get("template-id")
         config_id = request.data.get("config-id")
@@ -123,9 +145,51 @@ class StartUserScenarioView(APIView):
 
 class NextStepView(APIView):
     permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer,)
 
     @allowed_roles(["all"])
+    @admission_controlled
     def post(self, request):
+        # steps of the same scenario run one after another, a retry of a request
+        # with an idempotency key gets the response of the first request again
+        with transaction.atomic():
+            state = lock_scenario_state(request.data.get("scenario_id"))
+            key = request.headers.get("Idempotency-Key") or request.data.get(
+                "idempotency_key"
+            )
+            if key and len(key) > 64:
+                return Response(
+                    {
+                        "status": "error",
+                        "error-message": "Idempotency key must not be longer than 64 characters.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if state is not None and key:
+                # an expired key is run again like a new one
+                IdempotencyKey.purge(user_scenario_id=state.user_scenario_id)
+                replay = IdempotencyKey.objects.filter(
+                    user_scenario_id=state.user_scenario_id,
+                    user_scenario__user=request.user,
+                    key=key,
+                ).first()
+                if replay is not None:
+                    return Response(replay.response, status=status.HTTP_200_OK)
+
+            response = self.next_step(request)
+            if response.status_code >= 400:
+                # nothing of a failed step is stored
+                transaction.set_rollback(True)
+            elif key:
+                IdempotencyKey.objects.create(
+                    user_scenario_id=state.user_scenario_id,
+                    key=key,
+                    step_counter=state.step_counter,
+                    response=response.data,
+                )
+            return response
+
+    def next_step(self, request):
         session: CachedScenario = auth_user_scenario(request)
         if isinstance(session, Response):
             return session
@@ -144,7 +208,141 @@ class NextStepView(APIView):
         try:
             response = continue_simulation(session, req)
             session.save()
-            return Response(response.dict(), status=status.HTTP_200_OK)
+            data = response.dict()
+            # clients that opt in to delta responses get only the changes to the
+            # response of the step they have seen last (state_version)
+            if request.data.get("delta"):
+                data = encode_step_response(
+                    session.scenario.id,
+                    data,
+                    session.scenario.state.step_counter,
+                    request.data.get("state_version"),
+                )
+            return Response(data, status=status.HTTP_200_OK)
+        except (
+            SimulationException,
+            RequestTypeException,
+            RequestActionException,
+            RequestMembersException,
+            RequestTypeMismatchException,
+            TooManyMeetingsException,
+        ) as e:
+            logging.error(e, exc_info=True)
+            return Response(
+                {"status": "error", "error-message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            return Response(
+                {"status": "error", "data": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class StreamStepView(APIView):
+    """Like sim/next, but streams the progress of the step as server-sent events:
+    one 'day' event per simulated day, then a 'response' event with the response
+    of the step (or an 'error' event)."""
+
+    permission_classes = (IsAuthenticated,)
+
+    @allowed_roles(["all"])
+    @admission_controlled
+    def post(self, request):
+        session: CachedScenario = auth_user_scenario(request)
+        if isinstance(session, Response):
+            return session
+
+        req = create_correct_request_model(request)
+        if req is None:
+            return Response(
+                {
+                    "status": "error",
+                    "error-message": "Type of request was not specified. Type has to be one of the following: QUESTION, SIMULATION, MODEL",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # under ASGI the events are sent from the event loop (see is_asgi_request)
+        stream = astream_step if is_asgi_request(request) else stream_step
+        response = StreamingHttpResponse(
+            stream(session, req), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # tell nginx not to buffer the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class BatchStepView(APIView):
+    """Runs several steps of a scenario in one request. 'steps' is an ordered list
+    of request bodies like for sim/next (without scenario_id). All steps run on the
+    same session, which is saved once at the end. If 'final_only' is set, only the
+    response of the last processed step is returned."""
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer,)
+    max_steps = 50
+
+    @allowed_roles(["all"])
+    @admission_controlled
+    def post(self, request):
+        # all steps are stored or none of them, steps of the same scenario run one
+        # after another
+        with transaction.atomic():
+            lock_scenario_state(request.data.get("scenario_id"))
+            response = self.run_steps(request)
+            if response.status_code >= 400:
+                transaction.set_rollback(True)
+            return response
+
+    def run_steps(self, request):
+        steps = request.data.get("steps")
+        if not isinstance(steps, list) or not 0 < len(steps) <= self.max_steps:
+            return Response(
+                {
+                    "status": "error",
+                    "error-message": f"Attribute steps must be a list of 1 to {self.max_steps} requests.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        session: CachedScenario = auth_user_scenario(request)
+        if isinstance(session, Response):
+            return session
+
+        reqs = []
+        for i, step in enumerate(steps):
+            req = None
+            if isinstance(step, dict):
+                try:
+                    req = create_request_model(
+                        {**step, "scenario_id": session.scenario.id}
+                    )
+                except ValidationError as e:
+                    return Response(
+                        {
+                            "status": "error",
+                            "error-message": f"Step {i} is not a valid request: {e}",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+            if req is None:
+                return Response(
+                    {
+                        "status": "error",
+                        "error-message": f"Type of step {i} has to be one of the following: QUESTION, SIMULATION, MODEL, EVENT, START, END",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            reqs.append(req)
+
+        try:
+            responses, stopped = continue_simulation_batch(session, reqs)
+            if isinstance(responses[-1], Response):
+                return responses[-1]
+            session.save()
         except (
             SimulationException,
             RequestTypeException,
@@ -165,6 +363,174 @@ class NextStepView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        completed = len(responses)
+        if request.data.get("final_only"):
+            responses = responses[-1:]
+        return Response(
+            {
+                "completed": completed,
+                "stopped": stopped,
+                "responses": [r.dict() for r in responses],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class StepJobView(APIView):
+    """Runs a step in the background. POST takes the same body as sim/next and
+    returns the job of the current step of the scenario immediately, GET returns
+    the job with the response of the step once it is done."""
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer,)
+
+    @allowed_roles(["all"])
+    def post(self, request):
+        if request.data.get("type") is None:
+            return Response(
+                {
+                    "status": "error",
+                    "error-message": "Type of request was not specified. Type has to be one of the following: QUESTION, SIMULATION, MODEL",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            scenario = UserScenario.objects.select_related("state", "user").get(
+                id=request.data.get("scenario_id")
+            )
+        except (ObjectDoesNotExist, ValueError, TypeError):
+            msg = f"Could not get all data for scenario {request.data.get('scenario_id')}"
+            logging.error(msg)
+            return Response(
+                {"status": "error", "data": msg}, status=status.HTTP_404_NOT_FOUND
+            )
+        if scenario.user_id != request.user.id:
+            return Response(
+                {
+                    "status": "error",
+                    "data": f"User {request.user.username} is not authorized to access scenario {scenario.id}",
+                },
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        job = enqueue_step(scenario, dict(request.data))
+        return Response(step_job_data(job), status=status.HTTP_202_ACCEPTED)
+
+    @allowed_roles(["all"])
+    def get(self, request, id=None):
+        try:
+            job = StepJob.objects.select_related("user_scenario").get(id=id)
+        except ObjectDoesNotExist:
+            return Response(
+                {"status": "error", "data": f"Step job {id} does not exist."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if job.user_scenario.user_id != request.user.id:
+            return Response(
+                {
+                    "status": "error",
+                    "data": f"User {request.user.username} is not authorized to access step job {id}",
+                },
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+        return Response(step_job_data(job), status=status.HTTP_200_OK)
+
+
+def step_job_data(job: StepJob) -> dict:
+    return {
+        "id": job.id,
+        "scenario_id": job.user_scenario_id,
+        "step_counter": job.step_counter,
+        "status": job.status,
+        "response": job.response,
+        "error": job.error,
+    }
+
+
+class ForecastView(APIView):
+    """Forecasts the outcome of a workpack without changing the scenario. The body is
+    the same as a SIMULATION request to sim/next, plus the optional number of
+    'replicas' to simulate and a 'seed' for reproducible forecasts."""
+
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer,)
+    max_replicas = 100
+
+    @allowed_roles(["all"])
+    @admission_controlled
+    def post(self, request):
+        session: CachedScenario = auth_user_scenario(request)
+        if isinstance(session, Response):
+            return session
+
+        if request.data.get("type") != "SIMULATION":
+            return Response(
+                {
+                    "status": "error",
+                    "error-message": "Only requests of type SIMULATION can be forecasted.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            replicas = int(request.data.get("replicas", 20))
+            seed = request.data.get("seed")
+            seed = None if seed is None else int(seed)
+        except (TypeError, ValueError):
+            return Response(
+                {
+                    "status": "error",
+                    "error-message": "Attributes replicas and seed must be integers.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 0 < replicas <= self.max_replicas:
+            return Response(
+                {
+                    "status": "error",
+                    "error-message": f"Attribute replicas must be between 1 and {self.max_replicas}.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        req = create_correct_request_model(request)
+        try:
+            response = forecast(session, req, replicas=replicas, seed=seed)
+            return Response(response.dict(), status=status.HTTP_200_OK)
+        except (
+            SimulationException,
+            RequestActionException,
+            TooManyMeetingsException,
+        ) as e:
+            logging.error(e, exc_info=True)
+            return Response(
+                {"status": "error", "error-message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            return Response(
+                {"status": "error", "data": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class AdmissionView(APIView):
+    """Returns the counters of the admission controller of the worker that handles
+    the request, e.g. the current queue depth and the number of rejected requests."""
+
+    permission_classes = (IsAuthenticated,)
+
+    @allowed_roles(["admin"])
+    def get(self, request):
+        controller = get_admission_controller()
+        if controller is None:
+            return Response({"enabled": False}, status=status.HTTP_200_OK)
+        return Response(
+            {"enabled": True, "pid": os.getpid(), **controller.metrics()},
+            status=status.HTTP_200_OK,
+        )
+
 
 class AdjustMemberView(APIView):
     permission_classes = (IsAuthenticated,)
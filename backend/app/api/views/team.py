@@ -6,6 +6,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from app.decorators.decorators import allowed_roles
+from app.src.util.pagination_util import paginated_response
 from app.serializers.team import MemberSerializer, SkillTypeSerializer, TeamSerializer, SkillTypeInfoSerializer
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -50,10 +51,11 @@ class TeamViews(APIView):
                     {"status": "error", "data": msg}, status=status.HTTP_404_NOT_FOUND,
                 )
 
-        items = Team.objects.all()
-        serializer = TeamSerializer(items, many=True)
-        return Response(
-            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        return paginated_response(
+            request,
+            Team.objects.all(),
+            TeamSerializer,
+            prefetch_related={"members": "members__skill_type"},
         )
 
     @allowed_roles(["creator", "staff"])
@@ -129,10 +131,11 @@ class MemberView(APIView):
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
-        items = Member.objects.all()
-        serializer = MemberSerializer(items, many=True)
-        return Response(
-            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        return paginated_response(
+            request,
+            Member.objects.all(),
+            MemberSerializer,
+            select_related={"skill_type": "skill_type"},
         )
 
     @allowed_roles(["creator", "staff"])
@@ -184,11 +187,7 @@ class SkillTypeView(APIView):
                 status=status.HTTP_200_OK,
             )
 
-        items = SkillType.objects.all()
-        serializer = SkillTypeSerializer(items, many=True)
-        return Response(
-            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
-        )
+        return paginated_response(request, SkillType.objects.all(), SkillTypeSerializer)
 
     @allowed_roles(["creator", "staff"])
     def patch(self, request, id=None):
@@ -2,23 +2,21 @@ import logging
 from pprint import pprint
 
 from bson import ObjectId
+from django.db.models import Count, Max
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from app.decorators.decorators import allowed_roles, has_access_to_scenario
-from app.exceptions import IndexException
-from app.models.action import Action
-from app.models.answer import Answer
-from app.models.management_goal import ManagementGoal
-from app.models.model_selection import ModelSelection
-from app.models.question import Question
-from app.models.question_collection import QuestionCollection
-from app.models.score_card import ScoreCard
-from app.models.simulation_end import SimulationEnd
-from app.models.simulation_fragment import SimulationFragment
+from app.decorators.decorators import allowed_roles
+from app.exceptions import (
+    IndexException,
+    RequestParamException,
+    TemplateValidationException,
+)
 from app.models.template_scenario import TemplateScenario
 from app.serializers.template_scenario import (
     ReducedTemplateScenarioSerializer,
@@ -27,10 +25,11 @@ from app.serializers.template_scenario import (
 from app.serializers.course import (
     CourseNameSerializer,
 )
-from config import get_config
+from app.cache.template_scenario import get_template_json, template_etag
+from app.db.mongo import get_template_collection
+from app.src.publish import build_template_graph, save_template_graph
+from app.src.util.studio_util import list_templates, template_document
 from history.models.result import Result
-from app.models.event import Event
-from app.models.event import EventEffect
 from app.models.course import Course
 
 
@@ -41,18 +40,26 @@ class TemplateScenarioView(APIView):
     @allowed_roles(["creator", "staff"])
     def get(self, request, scenario_id=None, format=None):
         try:
+            # the serialized templates are cached by version (see
+            # app/cache/template_scenario.py), only the versions are queried here
+            versions = TemplateScenario.objects.order_by("id").values_list("id", "version")
             if scenario_id:
-                template_scenario = TemplateScenario.objects.get(
-                    id=scenario_id)
-                serializer = TemplateScenarioSerializer(
-                    template_scenario, many=False)
-                return Response(serializer.data, status=status.HTTP_200_OK)
-
-            template_scenarios = TemplateScenario.objects.all()
-            serializer = TemplateScenarioSerializer(
-                template_scenarios, many=True)
+                versions = list(versions.filter(id=scenario_id))
+                if not versions:
+                    raise TemplateScenario.DoesNotExist(
+                        "TemplateScenario matching query does not exist.")
+            else:
+                versions = list(versions)
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etag = template_etag(versions)
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                response = HttpResponseNotModified()
+            else:
+                blobs = get_template_json(versions)
+                content = blobs[0] if scenario_id else b"[" + b",".join(blobs) + b"]"
+                response = HttpResponse(content, content_type="application/json")
+            response["ETag"] = etag
+            return response
         except Exception as e:
             logging.error(
                 f"{e.__class__.__name__} occurred in GET template-scenario")
@@ -136,7 +143,12 @@ class TemplateScenarioView(APIView):
                 template_scenario, data=request.data, partial=True
             )
             if serializer.is_valid():
-                serializer.save()
+                try:
+                    serializer.save()
+                except IndexException as e:
+                    return Response(
+                        {"message": str(e)}, status=status.HTTP_400_BAD_REQUEST,
+                    )
                 return Response({"status": "success", "data": serializer.data})
             else:
                 logging.error("Could not patch template scenario")
@@ -156,12 +168,12 @@ class TemplateScenarioView(APIView):
 class StudioTemplateScenarioView(APIView):
 
     permission_classes = (IsAuthenticated,)
+    max_limit = 500
 
     @allowed_roles(["creator"])
     def get(self, request, scenario_id=None):
         try:
-            config = get_config()
-            collection = config.get_mongo_db_scenario_template_collection()
+            collection = get_template_collection()
 
             if scenario_id:
                 try:
@@ -181,11 +193,32 @@ class StudioTemplateScenarioView(APIView):
                     )
 
             else:
-                # find all
-                all_scenario_templates = [dict(id=str(document["_id"]), scenario=document["scenario"])
-                                          for document in collection.find({})]
+                # summaries of the templates, see list_templates
+                try:
+                    limit = int(request.query_params.get("limit", 100))
+                    if not 0 < limit <= self.max_limit:
+                        raise ValueError()
+                except ValueError:
+                    return Response(
+                        dict(status="error",
+                             data=f"Query parameter <limit> must be between 1 and {self.max_limit}"),
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                order = request.query_params.get("order")
+                try:
+                    templates, next_cursor = list_templates(
+                        collection,
+                        sort=request.query_params.get("sort", "updated"),
+                        descending=None if order is None else order == "desc",
+                        limit=limit,
+                        after=request.query_params.get("after"),
+                    )
+                except RequestParamException as e:
+                    return Response(dict(status="error", data=str(e)),
+                                    status=status.HTTP_400_BAD_REQUEST
+                                    )
 
-                return Response(dict(status="success", data=all_scenario_templates), status=status.HTTP_200_OK)
+                return Response(dict(status="success", data=templates, next=next_cursor), status=status.HTTP_200_OK)
         except:
             return Response(dict(status="error", data="An error occurred while fetching all template scenarios"),
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -194,8 +227,7 @@ class StudioTemplateScenarioView(APIView):
     @allowed_roles(["creator", "staff"])
     def put(self, request, scenario_id):
         try:
-            config = get_config()
-            collection = config.get_mongo_db_scenario_template_collection()
+            collection = get_template_collection()
 
             if scenario_id:
                 scenario_template = request.data
@@ -207,8 +239,7 @@ class StudioTemplateScenarioView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-                scenario_template_dto = dict(
-                    scenario=scenario_template)
+                scenario_template_dto = template_document(scenario_template)
 
                 response = collection.replace_one(
                     {"_id": ObjectId(scenario_id)}, scenario_template_dto)
@@ -241,8 +272,7 @@ class StudioTemplateScenarioView(APIView):
     @allowed_roles(["creator", "staff"])
     def post(self, request):
         try:
-            config = get_config()
-            collection = config.get_mongo_db_scenario_template_collection()
+            collection = get_template_collection()
 
             if "clone" in request.query_params:
                 template_scenario = collection.find_one(
@@ -252,8 +282,8 @@ class StudioTemplateScenarioView(APIView):
                     component for component in template_scenario["scenario"] if component["type"] == "BASE")
                 scenario["template_name"] = f"{scenario['template_name']} (1)"
 
-                template_scenario_dto = dict(
-                    scenario=template_scenario["scenario"])
+                template_scenario_dto = template_document(
+                    template_scenario["scenario"])
                 template_scenario_result = collection.insert_one(
                     template_scenario_dto)
                 duplicate_template_scenario_id = template_scenario_result.inserted_id
@@ -270,7 +300,7 @@ class StudioTemplateScenarioView(APIView):
             else:
                 scenario_template = request.data
 
-                scenario_template_dto = dict(scenario=scenario_template)
+                scenario_template_dto = template_document(scenario_template)
 
                 object_id = collection.insert(scenario_template_dto)
 
@@ -296,8 +326,7 @@ class StudioTemplateScenarioView(APIView):
     def delete(self, request, scenario_id=None):
         try:
             if scenario_id:
-                config = get_config()
-                collection = config.get_mongo_db_scenario_template_collection()
+                collection = get_template_collection()
 
                 response = collection.delete_one(
                     {"_id": ObjectId(scenario_id)})
@@ -341,58 +370,31 @@ class TemplateScenarioFromStudioView(APIView):
 
             studio_template_id = request.query_params["studio_template_id"]
 
-            config = get_config()
-            collection = config.get_mongo_db_scenario_template_collection()
+            collection = get_template_collection()
             template_scenario = collection.find_one({"_id": ObjectId(studio_template_id)}, {
                                                     "scenario": 1, "_id": 0})["scenario"]
 
-            template_scenario[0]["studio_template_id"] = studio_template_id
-
             logging.info("Creating template scenario from studio")
-            scenario = TemplateScenario()
-            scenario.save()
-
-            caller = {
-                "BASE": handle_base,
-                "QUESTIONS": handle_question,
-                "FRAGMENT": handle_simulation,
-                "MODELSELECTION": handle_model,
-                "EVENT": handle_event,
-            }
-            i = 0
-            for component in template_scenario:
-                try:
-                    i = caller[component.get("type", "not-found")](
-                        component, scenario, i
-                    )
-                except KeyError:
-                    msg = f"Invalid component type {component.get('type')}"
-                    logging.warning(msg)
-                    return Response(
-                        dict(status="error", data=msg,),
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-            scenario.save()
-            set_last_fragement(scenario)
+            try:
+                graph = build_template_graph(template_scenario, studio_template_id)
+            except TemplateValidationException as e:
+                msg = str(e)
+                logging.warning(msg)
+                return Response(
+                    dict(status="error", data=msg,),
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            # all objects are saved in one transaction, nothing is left on failure
+            scenario = save_template_graph(graph)
             logging.info("Template scenario created with id: " +
                          str(scenario.id))
 
-            # Create Scorecard
-            scorecard = ScoreCard(template_scenario=scenario)
-            scorecard.save()  # TODO: this should be set by the creator in studio
-
             return Response(
                 dict(status="success", data={"id": scenario.id}),
                 status=status.HTTP_200_OK,
             )
 
         except Exception as e:
-            try:
-                scenario.delete()
-            except Exception:
-                logging.warning(
-                    "Could not delete scenario after failed creation")
             msg = f"{e.__class__.__name__} occured while creating template scenario from studio"
             logging.error(msg)
             return Response(
@@ -436,249 +438,29 @@ def serialize_template_scenario(template_scenario):
     return dict(id=str(template_scenario["_id"]), scenario=template_scenario["scenario"])
 
 
-def handle_base(data, scenario: TemplateScenario, i):
-    scenario.name = data.get("template_name")
-    scenario.story = data.get("text", "")
-    scenario.studio_template_id = data.get("studio_template_id")
-    # Create Management Goal
-    mgoal = ManagementGoal(
-        budget=data.get("budget"),
-        duration=data.get("duration"),
-        easy_tasks=int(data.get("easy_tasks")),
-        medium_tasks=int(data.get("medium_tasks")),
-        hard_tasks=int(data.get("hard_tasks")),
-        tasks_predecessor_p=0.3,  # TODO: this should be set by the creator in studio
-        template_scenario=scenario,
-    )
-
-    mgoal.save()
-    return i
-
-
-def handle_question(data, scenario: TemplateScenario, i):
-    qc = QuestionCollection(
-        index=i, template_scenario=scenario, text=data["text"])
-    qc.save()
-    qi = 0
-    for question_data in data.get("questions", []):
-
-        q = Question(
-            question_index=qi,
-            question_collection=qc,
-            text=question_data.get("text", ""),
-            multi=question_data.get("type") == "MULTI",
-            explanation=question_data.get("explanation", ""),
-        )
-        q.save()
-
-        for answer_data in question_data.get("answers"):
-            a = Answer(
-                label=answer_data.get("label"),
-                points=int(answer_data.get("points")),
-                question=q,
-            )
-            a.save()
-        qi += 1
-
-    return i + 1
-
-
-def handle_simulation(data, scenario: TemplateScenario, i):
-    # Initialize Fragment
-    simfragment = SimulationFragment(
-        index=i, text=data.get("text", ""), template_scenario=scenario
-    )
-    simfragment.save()
-
-    # Create Simulation End
-    simend_data = data.get("simulation_end")
-    simend = SimulationEnd(
-        limit=simend_data.get("limit"),
-        type=simend_data.get("type"),
-        limit_type=simend_data.get("limit_type"),
-        simulation_fragment=simfragment,
-    )
-    simend.save()
-
-    # Create Actions
-    for action_data in data.get("actions"):
-        action = Action(
-            title=action_data.get("action"),
-            lower_limit=action_data.get("lower_limit"),
-            upper_limit=action_data.get("upper_limit"),
-            simulation_fragment=simfragment,
-        )
-        action.save()
-
-    return i + 1
-
-
-def handle_model(data, scenario: TemplateScenario, i):
-    m = ModelSelection(
-        index=i,
-        text=data.get("text", ""),
-        waterfall="Waterfall" in data.get("models"),
-        kanban="Kanban" in data.get("models"),
-        scrum="Scrum" in data.get("models"),
-        template_scenario=scenario,
-    )
-
-    # We have a minimum requirement. That's why this isn't Necessar (Burak)
-    # if not m.waterfall and not m.kanban and not m.scrum:
-    # If no model is selected, select all models
-    # m.waterfall = True
-    # m.scrum = True
-    # m.kanban = True
-
-    m.save()
-    return i + 1
-
-
-def handle_event(data, scenario: TemplateScenario, i):
-    # Events are not yet implemented
-    event = Event()
-
-    event.template_scenario = scenario
-    event.text = data['text']
-    event.trigger_type = data['trigger_type']
-    event.trigger_comparator = data['trigger_comparator']
-
-    try:
-        event.trigger_value = float(data['trigger_value'])
-    except:
-        event.trigger_value = 0
-
-    event.save()
-
-    valued_effect_types = [
-        'budget',
-        'duration',
-        'stress',
-        'motivation',
-        'familiarity'
-    ]
-
-    for effect_type in valued_effect_types:
-        get_valued_effect(effect_type, data[effect_type], event)
-
-    get_tasks_effects(data, event)
-
-    event.save()
-
-    return i + 1
-
-
-def get_valued_effect(effect_type: str, value: str, event: Event) -> EventEffect:
-    effect: EventEffect = EventEffect()
-    effect.event = event
-
-    effect.type = effect_type
-
-    effect.easy_tasks = 0
-    effect.medium_tasks = 0
-    effect.hard_tasks = 0
-
-    try:
-        effect.value = float(value)
-    except:
-        effect.value = 0
-
-    effect.save()
-    return effect
-
-
-def get_tasks_effects(data, event: Event) -> EventEffect:
-    effect: EventEffect = EventEffect()
-    effect.event = event
-    effect.type = 'tasks'
-    effect.value = 0
-
-    try:
-        effect.easy_tasks = int(data['easy_tasks'])
-    except:
-        effect.easy_tasks = 0
-
-    try:
-        effect.medium_tasks = int(data['medium_tasks'])
-    except:
-        effect.medium_tasks = 0
-
-    try:
-        effect.hard_tasks = int(data['hard_tasks'])
-    except:
-        effect.hard_tasks = 0
-
-    effect.save()
-    return effect
-
-
-def get_effect(data, event, effect_type) -> EventEffect:
-    event_effect: EventEffect = EventEffect()
-    event_effect.event = event
-    event_effect.type = effect_type
-
-    try:
-        event_effect.value = float(data[effect_type])
-    except:
-        event_effect.value = 0
-
-    try:
-        event_effect.easy_tasks = int(data['easy_tasks'])
-    except:
-        event_effect.easy_tasks = 0
-
-    try:
-        event_effect.medium_tasks = int(data['medium_tasks'])
-    except:
-        event_effect.medium_tasks = 0
-
-    try:
-        event_effect.hard_tasks = int(data['hard_tasks'])
-    except:
-        event_effect.hard_tasks = 0
-
-    try:
-        return event_effect.save()
-    except Exception as e:
-        logging.error(str(e))
-
-    event_effect.save()
-    return event_effect
-
-
-def set_last_fragement(scenario: TemplateScenario):
-    # Find all fragements
-    fragments = SimulationFragment.objects.filter(template_scenario=scenario).order_by(
-        "-index"
-    )
-    # Set the one with highest index as last fragment
-    if fragments.count():
-        last_fragment = fragments[0]
-        last_fragment.last = True
-        last_fragment.save()
-
-
 class TemplateScenarioUserListView(APIView):
 
     permission_classes = (IsAuthenticated,)
 
     @allowed_roles(["all"])
-    @has_access_to_scenario("scenario_id", False)
     def get(self, request, scenario_id=None, format=None):
         try:
+            user = request.user
+            template_scenarios = self.get_template_scenarios(user)
             if scenario_id:
-                data = self.get_data_for_single_scenario(
-                    scenario_id, request.user.username
-                )
-                return Response(data, status=status.HTTP_200_OK)
+                template_scenarios = template_scenarios.filter(id=scenario_id)
 
-            template_scenarios = TemplateScenario.objects.all()
+            data = self.get_overview(template_scenarios, user)
 
-            data = [
-                self.get_data_for_single_scenario(
-                    scenario.id, request.user.username)
-                for scenario in template_scenarios
-            ]
+            if scenario_id:
+                if not data:
+                    return Response(
+                        {
+                            "message": f"User {user.username} is not authorized to access scenario {scenario_id}."
+                        },
+                        status=status.HTTP_403_FORBIDDEN,
+                    )
+                return Response(data[0], status=status.HTTP_200_OK)
             return Response(data, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -693,19 +475,43 @@ class TemplateScenarioUserListView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    def get_data_for_single_scenario(self, scenario_id: int, username: str):
-        template_scenario = TemplateScenario.objects.get(id=scenario_id)
-        serializer = ReducedTemplateScenarioSerializer(
-            template_scenario, many=False)
-        results = Result.objects.filter(
-            user_scenario__user__username=username,
-            user_scenario__template__id=template_scenario.id,
+    @staticmethod
+    def get_template_scenarios(user):
+        """Template scenarios the user can see: all for admins, staff and creators,
+        the scenarios of their courses for everyone else (see has_access_to_scenario)."""
+        template_scenarios = TemplateScenario.objects.only(
+            *ReducedTemplateScenarioSerializer.Meta.fields
+        ).order_by("id")
+        if user.admin or user.staff or user.creator:
+            return template_scenarios
+        return template_scenarios.filter(
+            id__in=Course.objects.filter(users=user).values("scenarios")
         )
-        tries = len(results)
-        max_score = 0
-        if tries:
-            max_score = max(map(lambda x: x.total_score, results))
-        return {**serializer.data, "tries": tries, "max_score": max_score}
+
+    @staticmethod
+    def get_overview(template_scenarios, user) -> list:
+        """Returns the scenarios with the tries and the max score of the user. The
+        results of all scenarios are counted with one grouped query."""
+        template_scenarios = list(template_scenarios)
+        stats = {
+            row["user_scenario__template_id"]: row
+            for row in Result.objects.filter(
+                user_scenario__user=user,
+                user_scenario__template_id__in=[t.id for t in template_scenarios],
+            )
+            .values("user_scenario__template_id")
+            .annotate(tries=Count("id"), max_score=Max("total_score"))
+            .order_by()
+        }
+        serializer = ReducedTemplateScenarioSerializer(template_scenarios, many=True)
+        return [
+            {
+                **data,
+                "tries": stats.get(data["id"], {}).get("tries", 0),
+                "max_score": stats.get(data["id"], {}).get("max_score", 0),
+            }
+            for data in serializer.data
+        ]
 
 
 class ScenarioCoursesView(APIView):
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from app.decorators.decorators import allowed_roles
+from app.src.util.pagination_util import paginated_response
 from app.serializers.user import UserSerializer
 from custom_user.models import User
 
@@ -26,7 +27,10 @@ class UserView(APIView):  # PermissionRequiredMixin,
         Method for GET-Requests to the /api/user endpoint.
         Retrieves users from the database.
         Returns one user if a username is specified as an url parameter (example: /api/user/Mario)
-        Returns all users if no url parameter is given.
+        Returns all users as a list if no url parameter is given. With the query
+        parameters <limit> or <after> one page of users is returned (see
+        pagination_util), the link to the next page is in the Link header.
+        <fields> selects the returned fields.
 
         Returns: Response with requested user/users and HTTP-Status Code
         """
@@ -36,10 +40,9 @@ class UserView(APIView):  # PermissionRequiredMixin,
             user = UserSerializer(user, many=False)
             return Response(user.data, status=status.HTTP_200_OK)
 
-        users = User.objects.all()
-        users = UserSerializer(users, many=True)
-
-        return Response(users.data, status=status.HTTP_200_OK)
+        return paginated_response(
+            request, User.objects.all(), UserSerializer, body=lambda data, _: data
+        )
 
     @allowed_roles(["staff"])
     def delete(self, requests, username=None, format=None):
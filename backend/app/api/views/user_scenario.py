@@ -6,14 +6,17 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from app.cache.template_scenario import template_scenario_queryset
 from app.decorators.decorators import allowed_roles, has_access_to_scenario
 from app.models.template_scenario import TemplateScenario
 from app.serializers.user_scenario import UserScenarioSerializer
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
 
 from app.models.user_scenario import UserScenario
 from app.models.scenario import ScenarioConfig
 from app.models.team import Team
+from app.src.util.pagination_util import paginated_response
 from custom_user.models import User
 
 
@@ -86,10 +89,20 @@ class UserScenarioViews(APIView):
                 status=status.HTTP_200_OK,
             )
 
-        items = UserScenario.objects.all()
-        serializer = UserScenarioSerializer(items, many=True)
-        return Response(
-            {"status": "success", "data": serializer.data}, status=status.HTTP_200_OK
+        return paginated_response(
+            request,
+            UserScenario.objects.all(),
+            UserScenarioSerializer,
+            select_related={
+                "user": "user",
+                "config": "config",
+                "state": "state",
+                "team": "team",
+            },
+            prefetch_related={
+                "team": "team__members__skill_type",
+                "template": Prefetch("template", queryset=template_scenario_queryset()),
+            },
         )
 
     @allowed_roles(["creator", "staff"])
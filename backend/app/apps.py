@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SimulationAppConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "app"
+
+    def ready(self):
+        # connects the receivers that increase the version of changed templates
+        import app.cache.question_collection  # noqa: F401
+        import app.cache.template_scenario  # noqa: F401
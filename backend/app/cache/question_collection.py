@@ -0,0 +1,111 @@
+import logging
+from dataclasses import dataclass
+from time import perf_counter
+from types import MappingProxyType
+from typing import Dict, Mapping
+
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.dto.response import QuestionCollectionDTO
+from app.models.answer import Answer
+from app.models.question import Question
+from app.models.question_collection import QuestionCollection
+from app.models.template_scenario import TemplateScenario
+
+
+@dataclass(frozen=True)
+class CompiledQuestions:
+    """All question collections of one version of a template, compiled once and
+    shared by every scenario of the template. Must not be changed."""
+
+    version: int
+    # question collection (questions sorted by index) by index of the collection
+    collections: Mapping[int, QuestionCollectionDTO]
+    # points of every answer by answer id
+    points: Mapping[int, int]
+
+
+_compiled: Dict[int, CompiledQuestions] = {}
+
+
+def get_compiled_questions(template: TemplateScenario) -> CompiledQuestions:
+    """Returns the compiled question collections of the template. They are compiled
+    on first use and again whenever the version of the template has changed."""
+    compiled = _compiled.get(template.id)
+    if compiled is None or compiled.version != template.version:
+        compiled = compile_questions(template)
+        _compiled[template.id] = compiled
+    return compiled
+
+
+def compile_questions(template: TemplateScenario) -> CompiledQuestions:
+    start = perf_counter()
+    question_collections = QuestionCollection.objects.filter(
+        template_scenario_id=template.id
+    ).prefetch_related(
+        Prefetch(
+            "questions",
+            queryset=Question.objects.order_by("question_index").prefetch_related(
+                "answers"
+            ),
+        )
+    )
+
+    collections = {}
+    points = {}
+    for qc in question_collections:
+        collections[qc.index] = QuestionCollectionDTO(
+            id=qc.id,
+            index=qc.index,
+            questions=[
+                {
+                    "id": q.id,
+                    "question_index": q.question_index,
+                    "text": q.text,
+                    "multi": q.multi,
+                    "answers": [
+                        {"id": a.id, "label": a.label, "points": a.points}
+                        for a in q.answers.all()
+                    ],
+                }
+                for q in qc.questions.all()
+            ],
+        )
+        for q in qc.questions.all():
+            for a in q.answers.all():
+                points[a.id] = a.points
+
+    logging.info(
+        f"Compiling questions of template {template.id} took {perf_counter() - start} seconds"
+    )
+    return CompiledQuestions(
+        version=template.version,
+        collections=MappingProxyType(collections),
+        points=MappingProxyType(points),
+    )
+
+
+# Any change to the questions of a template increases the version of the template,
+# so every process compiles the questions again on next use.
+
+
+@receiver([post_save, post_delete], sender=QuestionCollection)
+def question_collection_changed(sender, instance, **kwargs):
+    TemplateScenario.bump_version(id=instance.template_scenario_id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    TemplateScenario.bump_version(question_collections=instance.question_collection_id)
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def answer_changed(sender, instance, **kwargs):
+    TemplateScenario.bump_version(question_collections__questions=instance.question_id)
+
+
+@receiver(post_delete, sender=TemplateScenario)
+def template_deleted(sender, instance, **kwargs):
+    _compiled.pop(instance.id, None)
@@ -1,9 +1,12 @@
+import copy
 import logging
-from typing import List
+import random
+from typing import Deque, List, Optional
 from app.models.task import CachedTasks
 from app.models.team import Member
 from app.models.user_scenario import UserScenario
 
+import numpy as np
 from time import perf_counter
 
 
@@ -11,14 +14,59 @@ class CachedScenario:
     scenario: UserScenario
     members: List[Member]
     tasks: CachedTasks
+    # if set, simulate appends a snapshot after every simulated day (see stream_step)
+    progress: Optional[Deque[dict]] = None
+    # random number generators of the simulation, the global ones by default. A
+    # fork can get its own seeded generators (see forecast), so that simulating it
+    # neither changes nor depends on the global state.
+    rng = random
+    np_rng = np.random
 
     def __init__(self, scenario_id: int) -> None:
         start_counter = perf_counter()
-        self.scenario: UserScenario = UserScenario.objects.get(id=scenario_id)
-        self.members: List[Member] = Member.objects.filter(team=self.scenario.team)
+        self.scenario: UserScenario = UserScenario.objects.select_related(
+            "template"
+        ).get(id=scenario_id)
+        self.members: List[Member] = Member.objects.filter(
+            team=self.scenario.team
+        ).select_related("skill_type")
         self.tasks: CachedTasks = CachedTasks(self.scenario.id)
 
 
+    def fork(self) -> "CachedScenario":
+        """Returns an in-memory copy of this session. The copy can be simulated
+        without changing this session and without touching the database, e.g. to
+        forecast the outcome of a workpack. Related objects that are needed during
+        a simulation are loaded once on this session, so that further forks do not
+        need any query."""
+        # make sure all related objects are cached on this session
+        self.members = list(self.members)
+        self.scenario.config, self.scenario.state
+        for member in self.members:
+            member.skill_type
+
+        fork = copy.copy(self)
+        fork.scenario = copy.copy(self.scenario)
+        fork.scenario.state = copy.copy(self.scenario.state)
+        fork.scenario.team = copy.copy(self.scenario.team)
+        fork.set_members([copy.copy(m) for m in self.members])
+        fork.tasks = self.tasks.fork()
+        fork.progress = None
+        return fork
+
+    def set_members(self, members: List[Member]) -> None:
+        """Replaces the members of the session without touching the database. The
+        members are also cached on the team (like prefetch_related does), so that
+        team.members.all() returns them without a query."""
+        team = self.scenario.team
+        for member in members:
+            member.team = team
+        queryset = Member.objects.filter(team=team)
+        queryset._result_cache = members
+        queryset._prefetch_done = True
+        team._prefetched_objects_cache = {"members": queryset}
+        self.members = members
+
     def save(self) -> None:
         start = perf_counter()
         self.update_internals()
@@ -0,0 +1,117 @@
+import hashlib
+import logging
+from time import perf_counter
+from typing import Dict, Iterable, List, Tuple
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.renderers import JSONRenderer
+
+from app.models.action import Action
+from app.models.event import Event, EventEffect
+from app.models.management_goal import ManagementGoal
+from app.models.model_selection import ModelSelection
+from app.models.question import Question
+from app.models.score_card import ScoreCard
+from app.models.simulation_end import SimulationEnd
+from app.models.simulation_fragment import SimulationFragment
+from app.models.template_scenario import TemplateScenario
+
+# serialized templates are kept until they are evicted, a new version of a template
+# has a new key
+TEMPLATE_JSON_TIMEOUT = None
+
+
+def template_json_key(template_id: int, version: int) -> str:
+    return f"template-scenario-json-{template_id}-{version}"
+
+
+def template_scenario_queryset():
+    """Template scenarios with everything TemplateScenarioSerializer reads, loaded
+    with a fixed number of queries however many templates there are."""
+    return TemplateScenario.objects.select_related(
+        "management_goal", "score_card"
+    ).prefetch_related(
+        Prefetch(
+            "question_collections__questions",
+            queryset=Question.objects.prefetch_related("answers"),
+        ),
+        Prefetch(
+            "simulation_fragments",
+            queryset=SimulationFragment.objects.select_related(
+                "simulation_end"
+            ).prefetch_related("actions"),
+        ),
+        "model_selections",
+        "events__effects",
+    )
+
+
+def get_template_json(versions: Iterable[Tuple[int, int]]) -> List[bytes]:
+    """Returns the serialized JSON of the templates with the given (id, version).
+    Templates not in the cache are serialized together and cached by version."""
+    versions = list(versions)
+    keys = {template_json_key(i, v): i for i, v in versions}
+    blobs: Dict[int, bytes] = {
+        keys[k]: blob for k, blob in cache.get_many(keys.keys()).items()
+    }
+
+    missing = [i for i, _ in versions if i not in blobs]
+    if missing:
+        # import here, the serializers import the models of this app
+        from app.serializers.template_scenario import TemplateScenarioSerializer
+
+        start = perf_counter()
+        renderer = JSONRenderer()
+        new = {}
+        for template in template_scenario_queryset().filter(id__in=missing):
+            blob = renderer.render(TemplateScenarioSerializer(template).data)
+            blobs[template.id] = blob
+            # keyed by the version read together with the content
+            new[template_json_key(template.id, template.version)] = blob
+        cache.set_many(new, TEMPLATE_JSON_TIMEOUT)
+        logging.info(
+            f"Serializing {len(missing)} template scenarios took {perf_counter() - start} seconds"
+        )
+
+    return [blobs[i] for i, _ in versions if i in blobs]
+
+
+def template_etag(versions: Iterable[Tuple[int, int]]) -> str:
+    """ETag of the templates with the given (id, version)."""
+    digest = hashlib.sha1(
+        ",".join(f"{i}-{v}" for i, v in versions).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+# The version of a template is increased by every change of its content (questions
+# see app/cache/question_collection.py), so cached JSON is never served stale.
+
+
+@receiver(post_save, sender=TemplateScenario)
+def template_changed(sender, instance, created, **kwargs):
+    if not created:
+        TemplateScenario.bump_version(id=instance.id)
+
+
+@receiver([post_save, post_delete], sender=ManagementGoal)
+@receiver([post_save, post_delete], sender=ScoreCard)
+@receiver([post_save, post_delete], sender=SimulationFragment)
+@receiver([post_save, post_delete], sender=ModelSelection)
+@receiver([post_save, post_delete], sender=Event)
+def component_changed(sender, instance, **kwargs):
+    TemplateScenario.bump_version(id=instance.template_scenario_id)
+
+
+@receiver([post_save, post_delete], sender=SimulationEnd)
+@receiver([post_save, post_delete], sender=Action)
+def fragment_child_changed(sender, instance, **kwargs):
+    TemplateScenario.bump_version(simulation_fragments=instance.simulation_fragment_id)
+
+
+@receiver([post_save, post_delete], sender=EventEffect)
+def effect_changed(sender, instance, **kwargs):
+    TemplateScenario.bump_version(events=instance.event_id)
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from collections import Counter
+
+
+class ConnectionMetrics:
+    """Counts the database connections opened and closed by this worker and the time
+    spent waiting for new connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._max_connect_ms = 0.0
+
+    def connected(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self._stats["connects"] += 1
+            self._stats["connect_ms"] += ms
+            self._max_connect_ms = max(self._max_connect_ms, ms)
+
+    def closed(self, age: float):
+        with self._lock:
+            self._stats["closes"] += 1
+            self._stats["age_s"] += age
+
+    def health_check_failed(self):
+        with self._lock:
+            self._stats["health_check_failures"] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            connects = self._stats["connects"]
+            closes = self._stats["closes"]
+            return {
+                "pid": os.getpid(),
+                "open": connects - closes,
+                "connects": connects,
+                "closes": closes,
+                "health_check_failures": self._stats["health_check_failures"],
+                "avg_connect_ms": self._stats["connect_ms"] / connects if connects else 0.0,
+                "max_connect_ms": self._max_connect_ms,
+                # average lifetime of a closed connection, low values mean churn
+                "avg_age_s": self._stats["age_s"] / closes if closes else 0.0,
+            }
+
+
+connection_metrics = ConnectionMetrics()
+
+
+class ConnectionMetricsMixin:
+    """Mixin for a DatabaseWrapper of a Django database backend that reports to
+    connection_metrics."""
+
+    _connected_at = None
+
+    def get_new_connection(self, conn_params):
+        start = time.perf_counter()
+        conn = super().get_new_connection(conn_params)
+        connection_metrics.connected(time.perf_counter() - start)
+        self._connected_at = time.monotonic()
+        return conn
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            if self._connected_at is not None:
+                connection_metrics.closed(time.monotonic() - self._connected_at)
+                self._connected_at = None
+
+    def close_if_health_check_failed(self):
+        connection = self.connection
+        super().close_if_health_check_failed()
+        if connection is not None and self.connection is None:
+            connection_metrics.health_check_failed()
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from pymongo import MongoClient, monitoring
+
+from config import Configuration, get_config
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Counts the events of the connection pools of a MongoClient."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def pool_created(self, event):
+        self._count("pools_created")
+
+    def pool_cleared(self, event):
+        self._count("pools_cleared")
+
+    def pool_closed(self, event):
+        self._count("pools_closed")
+
+    def connection_created(self, event):
+        self._count("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._count("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._count("check_out_failures")
+
+    def connection_checked_out(self, event):
+        self._count("checked_out")
+
+    def connection_checked_in(self, event):
+        self._count("checked_in")
+
+
+def create_mongo_client(config: Configuration, listener=None) -> MongoClient:
+    """Creates a client with the pool settings and timeouts of the configuration. The
+    client connects on first use, not when it is created."""
+    return MongoClient(
+        host=config.mongo_host,
+        port=config.mongo_port,
+        username=config.mongo_user,
+        password=config.mongo_pass,
+        maxPoolSize=config.mongo_max_pool_size,
+        minPoolSize=config.mongo_min_pool_size,
+        maxIdleTimeMS=config.mongo_max_idle_time_ms,
+        waitQueueTimeoutMS=config.mongo_wait_queue_timeout_ms,
+        connectTimeoutMS=config.mongo_connect_timeout_ms,
+        socketTimeoutMS=config.mongo_socket_timeout_ms,
+        serverSelectionTimeoutMS=config.mongo_server_selection_timeout_ms,
+        event_listeners=[listener] if listener is not None else [],
+        connect=False,
+    )
+
+
+class MongoClientManager:
+    """Holds one MongoClient per process, created on first use and shared by all
+    threads. A client must not be used across fork, so a forked process creates its
+    own client. The factory can be replaced, e.g. by mongomock in tests."""
+
+    def __init__(
+        self,
+        factory: Callable[[Configuration, PoolMetricsListener], MongoClient] = create_mongo_client,
+        config: Optional[Configuration] = None,
+    ):
+        self.factory = factory
+        self._config = config
+        self._lock = threading.Lock()
+        self._client: Optional[MongoClient] = None
+        self._pid = None
+        self._listener = PoolMetricsListener()
+        self._clients_created = 0
+
+    @property
+    def config(self) -> Configuration:
+        if self._config is None:
+            self._config = get_config()
+        return self._config
+
+    def get_client(self) -> MongoClient:
+        client = self._client
+        if client is not None and self._pid == os.getpid():
+            return client
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                # a client inherited from the parent process is dropped, not closed,
+                # as its sockets are still used by the parent
+                self._client = self.factory(self.config, self._listener)
+                self._pid = os.getpid()
+                self._clients_created += 1
+            return self._client
+
+    def get_database(self):
+        return self.get_client()[self.config.mongo_name]
+
+    def get_collection(self, name: str):
+        return self.get_database()[name]
+
+    def reset(self):
+        """Closes the client of this process, the next use creates a new one."""
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+
+    def metrics(self, ping: bool = True) -> dict:
+        """Returns the pool counters of this process. With ping, the server is pinged
+        and the round trip time (or the error) is included."""
+        data = {"pid": os.getpid()}
+        if ping:
+            start = time.perf_counter()
+            try:
+                self.get_client().admin.command("ping")
+                data["healthy"] = True
+                data["ping_ms"] = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                logging.warning(f"Ping to MongoDB failed: {e}")
+                data["healthy"] = False
+                data["error"] = str(e)
+        data["clients_created"] = self._clients_created
+        data["initialized"] = self._client is not None and self._pid == os.getpid()
+        with self._listener._lock:
+            data.update(self._listener.stats)
+        return data
+
+
+mongo_clients = MongoClientManager()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=mongo_clients._after_fork)
+
+
+def get_template_collection():
+    """Returns the collection of the scenario templates of the studio."""
+    return mongo_clients.get_collection("scenario_templates")
@@ -0,0 +1,7 @@
+from django.db.backends.mysql import base
+
+from app.db.metrics import ConnectionMetricsMixin
+
+
+class DatabaseWrapper(ConnectionMetricsMixin, base.DatabaseWrapper):
+    """The MySQL backend of Django, reporting connection metrics."""
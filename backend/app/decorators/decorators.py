@@ -1,5 +1,8 @@
+from contextlib import ExitStack
+
 from app.models.course import Course
 from app.models.template_scenario import TemplateScenario
+from app.src.util.admission_util import AdmissionRejected, get_admission_controller
 from custom_user.models import User
 from rest_framework import status
 from rest_framework.response import Response
@@ -89,3 +92,38 @@ def has_access_to_scenario(field_name: str = None, template_id_in_request_data:
 
         return wrapper_func
     return decorator
+
+
+def admission_controlled(view_class):
+    """
+    Runs a heavy view only when the admission controller of the worker admits the
+    request, otherwise responds with 503 (worker is full) or 429 (user has too many
+    requests running) and a Retry-After header. A streamed response keeps its slot
+    until the stream is closed.
+    """
+    def wrapper_func(self, request, *args, **kwargs):
+        controller = get_admission_controller()
+        if controller is None:
+            return view_class(self, request, *args, **kwargs)
+        with ExitStack() as admission:
+            try:
+                admission.enter_context(controller.admit(request.user.id))
+            except AdmissionRejected as e:
+                return Response(
+                    {
+                        "status": "error",
+                        "error-message": "Too many simulation requests, please try again shortly.",
+                    },
+                    status=status.HTTP_429_TOO_MANY_REQUESTS
+                    if e.reason == "user"
+                    else status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={"Retry-After": str(e.retry_after)},
+                )
+            response = view_class(self, request, *args, **kwargs)
+            if getattr(response, "streaming", False):
+                # the server closes the response when the stream has ended or the
+                # client has gone away
+                response._resource_closers.append(admission.pop_all().close)
+            return response
+
+    return wrapper_func
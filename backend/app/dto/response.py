@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 
@@ -22,6 +22,9 @@ class AnswerDTO(BaseModel):
     label: str
     points: int
 
+    class Config:
+        allow_mutation = False
+
 
 class QuestionDTO(BaseModel):
     id: int
@@ -30,12 +33,18 @@ class QuestionDTO(BaseModel):
     multi: bool
     answers: List[AnswerDTO]
 
+    class Config:
+        allow_mutation = False
+
 
 class QuestionCollectionDTO(BaseModel):
     id: int
     index: int  # todo philip: delete index (currently here for developing)
     questions: List[QuestionDTO]
 
+    class Config:
+        allow_mutation = False
+
 
 class ScenarioStateDTO(BaseModel):
     component_counter: int
@@ -136,3 +145,47 @@ class EventResponse(ScenarioResponse):
     type: str = "EVENT"
     event_text: str
     effects: List[EffectsDto]
+
+
+class ForecastBandDTO(BaseModel):
+    mean: float
+    percentiles: Dict[str, float]
+
+
+class ForecastResponse(BaseModel):
+    """
+    Outcome of a workpack forecast. Every band describes the distribution of one
+    value after the workpack over all simulated replicas.
+    """
+
+    type: str = "FORECAST"
+    replicas: int
+    cost: ForecastBandDTO
+    days: ForecastBandDTO
+    tasks_done: ForecastBandDTO
+    bugs: ForecastBandDTO
+
+
+class MembersDeltaDTO(BaseModel):
+    added: List[MemberDTO] = []
+    removed: List[int] = []
+    # id of the member and only the values that changed
+    changed: List[dict] = []
+
+
+class DeltaResponse(BaseModel):
+    """
+    Changes of a step response compared to the response the client has seen last
+    (base_version). Only values that changed are sent, a full response can always
+    be requested by omitting the state version.
+    """
+
+    type: str
+    delta: bool = True
+    state_version: int
+    base_version: int
+    # changed top level values, for objects only their changed values
+    changed: dict = {}
+    # removed top level keys and removed values of objects as "object.key"
+    removed: List[str] = []
+    members: MembersDeltaDTO = MembersDeltaDTO()
@@ -54,3 +54,20 @@ class RequestParamException(BaseException):
 
     def __init__(self, type):
         super().__init__(f"Query param {type} is not valid.")
+
+
+class TemplateValidationException(BaseException):
+    """Raised when a template scenario from the studio cannot be published because a
+    component is not valid."""
+
+
+# Raised by a step that cannot be simulated. They derive from BaseException, so
+# "except Exception" does not catch them.
+STEP_EXCEPTIONS = (
+    SimulationException,
+    RequestTypeException,
+    RequestActionException,
+    RequestMembersException,
+    RequestTypeMismatchException,
+    TooManyMeetingsException,
+)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from app.db.mongo import get_template_collection
+from app.src.util.studio_util import (
+    backfill_template_summaries,
+    ensure_template_indexes,
+)
+
+
+class Command(BaseCommand):
+    help = "Creates the indexes of the studio templates and stores missing summaries."
+
+    def handle(self, *args, **options):
+        collection = get_template_collection()
+        ensure_template_indexes(collection)
+        updated = backfill_template_summaries(collection)
+        self.stdout.write(f"Studio templates ready, {updated} summaries added.")
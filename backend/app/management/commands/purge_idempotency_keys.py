@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app.models.idempotency_key import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Deletes the expired idempotency keys of step requests (see IdempotencyKey)."
+
+    def handle(self, *args, **options):
+        deleted = IdempotencyKey.purge()
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys.")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.src.jobs import run_next_job
+
+
+class Command(BaseCommand):
+    help = "Runs queued step jobs (see StepJob). Several workers can run at once."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Stop when no job is queued."
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=0.5, help="Seconds to wait for new jobs."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = run_next_job()
+            if job is not None:
+                self.stdout.write(f"Step job {job.id}: {job.status}")
+            elif options["once"]:
+                return
+            else:
+                time.sleep(options["sleep"])
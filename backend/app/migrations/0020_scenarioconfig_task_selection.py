@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_alter_course_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scenarioconfig',
+            name='task_selection',
+            field=models.TextField(default='random'),
+        ),
+    ]
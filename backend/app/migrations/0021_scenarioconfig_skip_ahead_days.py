@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_scenarioconfig_task_selection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scenarioconfig',
+            name='skip_ahead_days',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_scenarioconfig_skip_ahead_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='templatescenario',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
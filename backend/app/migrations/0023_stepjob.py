@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 12:05
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_templatescenario_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StepJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step_counter', models.IntegerField()),
+                ('request', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.TextField(default='queued', max_length=16)),
+                ('response', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('user_scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='step_jobs', to='app.userscenario')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='stepjob',
+            constraint=models.UniqueConstraint(fields=('user_scenario', 'step_counter'), name='unique_step_job'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+def reset_task_selection(apps, schema_editor):
+    # the configs got "random" as default of 0020, they keep the order of the
+    # simulation before the selection policies
+    ScenarioConfig = apps.get_model("app", "ScenarioConfig")
+    ScenarioConfig.objects.filter(task_selection="random").update(task_selection="any")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scenarioconfig',
+            name='task_selection',
+            field=models.TextField(default='any'),
+        ),
+        migrations.RunPython(reset_task_selection, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_alter_scenarioconfig_task_selection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stepjob',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
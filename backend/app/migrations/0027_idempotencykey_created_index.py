@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0026_stepjob_lease_until'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idempotencykey',
+            index=models.Index(fields=['created'], name='app_idempot_created_1906e6_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from app.models.user_scenario import UserScenario
+from config import get_config
+
+
+class IdempotencyKey(models.Model):
+    """Response of a step request that was sent with an idempotency key. A retry of
+    the request with the same key gets this response again instead of running
+    another step. Keys expire after idempotency_key_ttl seconds, see purge."""
+
+    user_scenario = models.ForeignKey(
+        UserScenario, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=64)
+    # step_counter of the scenario state before the step
+    step_counter = models.IntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_scenario", "key"], name="unique_idempotency_key"
+            )
+        ]
+        indexes = [models.Index(fields=["created"])]
+
+    @staticmethod
+    def purge(**filters) -> int:
+        """Deletes the expired keys matching the filters and returns their number."""
+        expired = timezone.now() - datetime.timedelta(
+            seconds=get_config().idempotency_key_ttl
+        )
+        deleted, _ = IdempotencyKey.objects.filter(
+            created__lt=expired, **filters
+        ).delete()
+        return deleted
@@ -14,3 +14,7 @@ class ScenarioConfig(models.Model):
     train_skill_increase_rate = models.FloatField(default=0.1)
     cost_member_team_event = models.FloatField(default=500.0)
     randomness = models.TextField(default="full")  # 'full', 'semi', 'none'
+    # 'any', 'random', 'best-fit', 'hardest-first' (see TASK_SELECTION_POLICIES)
+    task_selection = models.TextField(default="any")
+    # max number of days simulated in one step, 0 simulates every day on its own
+    skip_ahead_days = models.PositiveIntegerField(default=0)
@@ -0,0 +1,37 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from app.models.user_scenario import UserScenario
+
+
+class StepJob(models.Model):
+    """A step of a scenario (a request to sim/next) that runs in the background.
+    There is at most one job per step of a scenario, so enqueuing the same step
+    twice returns the same job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    user_scenario = models.ForeignKey(
+        UserScenario, on_delete=models.CASCADE, related_name="step_jobs"
+    )
+    # step_counter of the scenario state when the job was enqueued
+    step_counter = models.IntegerField()
+    request = models.JSONField(encoder=DjangoJSONEncoder)
+    status = models.TextField(max_length=16, default=QUEUED)
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    error = models.TextField(default="", blank=True)
+    # a running job whose lease has expired was left by a worker that died, it is
+    # claimed again by the next worker (see run_job)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_scenario", "step_counter"], name="unique_step_job"
+            )
+        ]
@@ -1,6 +1,9 @@
+import copy
 import logging
+import random
 import time
-from typing import Set, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Set, Tuple
 from django.db import models
 from django.db.models import QuerySet
 
@@ -108,10 +111,23 @@ class CachedTasks:
         logging.info(f"Getting Tasks took {time.perf_counter() - start} seconds")
         # todo raise if no scenario exists
 
+    def fork(self) -> "CachedTasks":
+        """Returns a copy of these tasks that can be changed without changing the
+        original tasks. Only the field values are copied, the database is not
+        touched."""
+        fork = copy.copy(self)
+        fork.tasks = {copy.copy(t) for t in self.tasks}
+        return fork
+
     def todo(self) -> QuerySet:
         """Returns all tasks that are not yet done."""
         return set(filter(lambda t: not t.done, self.tasks))
 
+    def todo_pools(self, rng=random) -> "TodoPools":
+        """Returns all tasks that are not yet done, grouped by difficulty. Random
+        draws from the pools use rng."""
+        return TodoPools(self.tasks, rng)
+
     def done(self) -> Set[Task]:
         """Returns all tasks that are done, but not yet tested. Includes tasks with and
         without bug"""
@@ -185,3 +201,127 @@ class CachedTasks:
             ],
         )
         logging.warning(f"Saving tasks took {time.perf_counter() - start} seconds")
+
+
+DIFFICULTIES = (1, 2, 3)
+
+
+class TodoPools:
+    """Tasks that are not yet done, kept in one pool per difficulty. Tasks are
+    drawn with one of the selection policies in TASK_SELECTION_POLICIES. A drawn
+    task is removed from its pool, but its state is not changed.
+    """
+
+    def __init__(self, tasks, rng=random):
+        self.rng = rng
+        # the same set as CachedTasks.todo(), pop_any takes the tasks in its order
+        self.todo: Set[Task] = set(filter(lambda t: not t.done, tasks))
+        self.pools: Dict[int, List[Task]] = {d: [] for d in DIFFICULTIES}
+        # index of every task in its pool, so that any task is removed in O(1)
+        self.positions: Dict[Task, int] = {}
+        for t in tasks:
+            if not t.done:
+                pool = self.pools.setdefault(t.difficulty, [])
+                self.positions[t] = len(pool)
+                pool.append(t)
+        self.size = len(self.todo)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def pop(self, order: Tuple[int, ...]) -> Task:
+        """Returns a task of the first difficulty in order that has tasks left.
+        Falls back to any other difficulty if none of them has tasks left."""
+        for d in order:
+            pool = self.pools.get(d)
+            if pool:
+                return self._take(pool[-1])
+        for pool in self.pools.values():
+            if pool:
+                return self._take(pool[-1])
+        raise KeyError("pop from empty TodoPools")
+
+    def pop_any(self) -> Task:
+        """Returns the next task of the todo set, the task the simulation took
+        before there were selection policies. Does not draw a random number."""
+        t = self.todo.pop()
+        self._remove(t)
+        self.size -= 1
+        return t
+
+    def pop_random(self) -> Task:
+        """Returns a uniformly drawn task of any difficulty."""
+        if not self.size:
+            raise KeyError("pop from empty TodoPools")
+        r = self.rng.randrange(self.size)
+        for pool in self.pools.values():
+            if r < len(pool):
+                return self._take(pool[r])
+            r -= len(pool)
+
+    def _remove(self, t: Task) -> None:
+        """Removes the task from its pool: the last task of the pool takes its
+        place, so nothing is shifted."""
+        pool = self.pools[t.difficulty]
+        i = self.positions.pop(t)
+        last = pool.pop()
+        if last is not t:
+            pool[i] = last
+            self.positions[last] = i
+
+    def _take(self, t: Task) -> Task:
+        self._remove(t)
+        self.todo.discard(t)
+        self.size -= 1
+        return t
+
+
+HARDEST_FIRST = tuple(sorted(DIFFICULTIES, reverse=True))
+
+
+@lru_cache(maxsize=None)
+def best_fit_order(development_quality: int) -> Tuple[int, ...]:
+    """Returns the difficulties ordered by how well they fit the development
+    quality of a skill type (see Member.solve_task). Results are cached, so the
+    order is only computed once per development quality."""
+    return tuple(
+        sorted(DIFFICULTIES, key=lambda d: (abs(development_quality - (d / 3) * 100), -d))
+    )
+
+
+def select_any(pools: TodoPools, member) -> Task:
+    return pools.pop_any()
+
+
+def select_random(pools: TodoPools, member) -> Task:
+    return pools.pop_random()
+
+
+def select_best_fit(pools: TodoPools, member) -> Task:
+    return pools.pop(best_fit_order(member.skill_type.development_quality))
+
+
+def select_hardest_first(pools: TodoPools, member) -> Task:
+    return pools.pop(HARDEST_FIRST)
+
+
+TASK_SELECTION_POLICIES: Dict[str, Callable[[TodoPools, object], Task]] = {
+    "any": select_any,
+    "random": select_random,
+    "best-fit": select_best_fit,
+    "hardest-first": select_hardest_first,
+}
+
+
+def get_task_selection_policy(config) -> Callable[[TodoPools, object], Task]:
+    """Returns the selection policy of the scenario config. Unknown names fall
+    back to the "any" policy. Without randomness, no task is drawn at random."""
+    policy = TASK_SELECTION_POLICIES.get(config.task_selection)
+    if policy is None:
+        logging.warning(
+            f"Unknown task selection policy '{config.task_selection}', using 'any'."
+        )
+        return select_any
+    if policy is select_random and config.randomness == "none":
+        return select_any
+    return policy
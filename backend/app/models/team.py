@@ -11,7 +11,7 @@ from django.core.validators import MaxValueValidator, MinValueValidator, MaxLeng
 
 from app.dto.request import Workpack
 from app.dto.response import TeamStatsDTO
-from app.models.task import CachedTasks, Task
+from app.models.task import CachedTasks, Task, get_task_selection_policy
 from app.models.user_scenario import UserScenario
 from app.src.util.util import probability
 
@@ -84,36 +84,55 @@ class Team(models.Model):
         )
 
     # increases familiarity with the project for each member
-    def meeting(self, session: CachedScenario, work_hours) -> int:
-        solved_tasks = session.tasks.solved()
+    def meeting(self, session: CachedScenario, work_hours, meetings=1) -> int:
+        """Holds the given number of meetings at once. No tasks are solved
+        between the meetings of a day, so the result of all meetings is computed
+        in a single pass over the team. Returns the remaining work hours."""
+        if meetings <= 0:
+            return work_hours
+
+        solved_tasks = len(session.tasks.solved())
+        tasks_in_meeting = session.scenario.config.done_tasks_per_meeting
         for member in session.members:
-            tasks_in_meeting = session.scenario.config.done_tasks_per_meeting
-
-            member.familiar_tasks = min(
-                member.familiar_tasks + tasks_in_meeting, len(solved_tasks)
-            )
+            # same as applying min(familiar_tasks + tasks_in_meeting, solved_tasks)
+            # once per meeting
+            if tasks_in_meeting < 0:
+                member.familiar_tasks = min(
+                    member.familiar_tasks + tasks_in_meeting, solved_tasks
+                ) + (meetings - 1) * tasks_in_meeting
+            else:
+                member.familiar_tasks = min(
+                    member.familiar_tasks + meetings * tasks_in_meeting, solved_tasks
+                )
             # increase familiarity of member
-            member.calculate_familiarity(len(solved_tasks))
+            member.calculate_familiarity(solved_tasks)
 
-        return work_hours - 1
+        return work_hours - meetings
 
     def training(
-        self, session: CachedScenario, work_hours, mean_real_throughput
+        self, session: CachedScenario, work_hours, mean_real_throughput, trainings=1
     ) -> None:
-
+        """Holds the given number of training hours at once in a single pass over
+        the team. Since xp only grows while the member is below the mean real
+        throughput, the training stops having an effect on a member after the
+        first hour without improvement."""
+        train_skill_increase_rate = session.scenario.config.train_skill_increase_rate
         for member in session.members:
-            delta = mean_real_throughput - (
-                member.skill_type.throughput * (1 + member.xp)
-            )
-            if delta > 0:
-                xp = (delta * session.scenario.config.train_skill_increase_rate) / (
-                    1 + member.xp
-                ) ** 2
-                member.xp += xp
-
-                member.motivation = min(1, member.motivation + 0.1)
-
-        work_hours -= 1
+            throughput = member.skill_type.throughput
+            member_xp = member.xp
+            motivation = member.motivation
+            for _ in range(trainings):
+                delta = mean_real_throughput - (throughput * (1 + member_xp))
+                if delta <= 0:
+                    break
+                xp = (delta * train_skill_increase_rate) / (1 + member_xp) ** 2
+                member_xp += xp
+
+                motivation = min(1, motivation + 0.1)
+            member.xp = member_xp
+            member.motivation = motivation
+
+        work_hours -= trainings
 
     # ein tag
     def work(
@@ -129,17 +148,12 @@ class Team(models.Model):
         # logging.debug(f"staff cost: {staff_cost}")
         session.scenario.state.cost += staff_cost
 
-        # Every 5th day, the stress is reduces by the weekend reduction
-        # (5 because we only count workdays)
-        if session.scenario.state.day % 5 == 0:
-            for member in session.members:
-                member.stress = max(
-                    0, member.stress - session.scenario.config.stress_weekend_reduction
-                )
+        self.weekend_stress_reduction(session, session.scenario.state.day)
 
         # 1. meeting
-        for _ in range(workpack_status.meetings_per_day[current_day]):
-            remaining_work_hours = self.meeting(session, remaining_work_hours)
+        remaining_work_hours = self.meeting(
+            session, remaining_work_hours, workpack_status.meetings_per_day[current_day]
+        )
 
         # 2. training
         remaining_trainings_today = workpack_status.remaining_trainings
@@ -159,23 +173,20 @@ class Team(models.Model):
                     for member in session.members
                 ]
             )
-            for _ in range(remaining_trainings_today):
-                self.training(
-                    session, remaining_work_hours, mean_real_throughput_of_team,
-                )
-
-        # If the member has to work overtime hours the extra stress is added
-        # This also works for the negative case
-        for member in session.members:
-            member.stress = min(
-                1,
-                workpack.overtime * session.scenario.config.stress_overtime_increase
-                + member.stress,
+            self.training(
+                session,
+                remaining_work_hours,
+                mean_real_throughput_of_team,
+                remaining_trainings_today,
             )
 
+        self.overtime_stress(session, workpack)
+
         # 3. task work
         # start = time.perf_counter()
-        self.task_work(session, remaining_work_hours, workpack)
+        self.task_work(
+            session, remaining_work_hours, workpack, workpack_status.tasks_to_do
+        )
         # logging.warn(f"Task work took {time.perf_counter() - start} secs")
 
     # def work(workpack)
@@ -187,8 +198,15 @@ class Team(models.Model):
     # 3. ab hier geht um tasks
     # self.task_work()
 
-    def task_work(self, session: CachedScenario, hours: int, workpack: Workpack):
+    def task_work(
+        self, session: CachedScenario, hours: int, workpack: Workpack, tasks_to_do=None
+    ):
+        """Lets the members work on tasks for the given hours. tasks_to_do are the
+        todo pools of the step (see WorkpackStatus), they are built if not given."""
         tasks = session.tasks
+        if tasks_to_do is None:
+            tasks_to_do = tasks.todo_pools(session.rng)
+        select_task = get_task_selection_policy(session.scenario.config)
         for m in session.members:
             n, poisson_value = m.n_tasks(hours, session)
             session.scenario.state.poisson_sum += poisson_value
@@ -205,23 +223,139 @@ class Team(models.Model):
                     t: Task = tasks_to_fix.pop()
                     t.bug = False
                     n -= 1
-            tasks_to_do = tasks.todo()
-            while n and len(tasks_to_do):
-                t: Task = tasks_to_do.pop()
-                t.done = True
-                error_increase = m.solve_task(t)
-                t.bug = probability(
-                    (m.skill_type.error_rate + m.stress - error_increase) / 3
+            self.solve_tasks(m, n, tasks_to_do, select_task, session.rng)
+
+    def solve_tasks(self, m: Member, n: int, tasks_to_do, select_task, rng) -> None:
+        """Lets member m solve up to n tasks drawn from the todo pools. Bugs and
+        wrong specifications are drawn with rng."""
+        while n and len(tasks_to_do):
+            t: Task = select_task(tasks_to_do, m)
+            t.done = True
+            error_increase = m.solve_task(t)
+            t.bug = probability(
+                (m.skill_type.error_rate + m.stress - error_increase) / 3, rng
+            )
+            t.correct_specification = probability(self.management_skill, rng)
+            t.unit_tested = False
+            t.integration_tested = False
+            m.familiar_tasks += 1
+            if t.bug:
+                m.stress = min(
+                    (1, m.stress + self.user_scenario.config.stress_error_increase)
+                )
+            n -= 1
+
+    def work_days(
+        self, session: CachedScenario, workpack: Workpack, days: int, tasks_to_do=None
+    ):
+        """Simulates several days without meetings, training, unit tests and bug
+        fixes in one step (skip-ahead mode, see ScenarioConfig.skip_ahead_days).
+        The stress of the members on every day of the window follows from the
+        weekend reduction and the overtime in closed form (see stress_drift). The
+        tasks of a member are drawn with one Poisson value with the summed mean of
+        all days, which is split into days with a multinomial draw, so every day is
+        rounded like in the day loop. The familiarity of each day is projected from
+        the tasks expected on the days before, the motivation is the one at the
+        start of the window. The tasks of the window are solved at once."""
+        NORMAL_WORK_HOUR_DAY: int = 8
+        hours = NORMAL_WORK_HOUR_DAY + workpack.overtime
+        config = session.scenario.config
+        state = session.scenario.state
+        members = session.members
+        state.cost += days * sum([m.skill_type.cost_per_day for m in members])
+
+        shift, lower, upper = self.stress_drift(
+            state.day,
+            days,
+            config.stress_weekend_reduction,
+            workpack.overtime * config.stress_overtime_increase,
+        )
+        team_efficiency = self.efficiency(session)
+        stress = [np.minimum(upper, np.maximum(lower, m.stress + shift)) for m in members]
+
+        def poisson_means(familiarity):
+            return [
+                hours
+                * ((m.efficiency_at(s, f, np.minimum) + team_efficiency) / 2)
+                * (m.skill_type.throughput + m.xp)
+                for m, s, f in zip(members, stress, familiarity)
+            ]
+
+        # the familiarity of each day follows from the tasks expected on the days
+        # before, like the day loop updates it after every day
+        expected = [
+            np.cumsum(mu[:-1]) * 0.2
+            for mu in poisson_means([m.familiarity for m in members])
+        ]
+        solved_before = len(session.tasks.solved()) + sum(expected)
+        familiarity = [
+            np.concatenate(
+                (
+                    [m.familiarity],
+                    np.where(
+                        solved_before > 0,
+                        np.minimum(1, (m.familiar_tasks + e) / np.maximum(solved_before, 1)),
+                        m.familiarity,
+                    ),
+                )
+            )
+            for m, e in zip(members, expected)
+        ]
+
+        solved = []
+        for m, s, mu in zip(members, stress, poisson_means(familiarity)):
+            n, poisson_value = m.n_tasks_window(mu, session)
+            state.poisson_sum += poisson_value
+            state.poison_counter += days
+            m.stress = float(s[-1])
+            solved.append((m, n))
+
+        if tasks_to_do is None:
+            tasks_to_do = session.tasks.todo_pools(session.rng)
+        select_task = get_task_selection_policy(config)
+        for m, n in solved:
+            self.solve_tasks(m, n, tasks_to_do, select_task, session.rng)
+
+    @staticmethod
+    def stress_drift(first_day: int, days: int, weekend_reduction: float, overtime_increase: float):
+        """Returns the stress of a member on each of the days from first_day on as
+        arrays (shift, lower, upper): the stress on day d is the start stress plus
+        shift[d], clamped to [lower[d], upper[d]]. Each day is the clamped shift of
+        weekend_stress_reduction and overtime_stress, and clamped shifts compose to
+        a clamped shift, so the drift is the same for all members."""
+        shift, lower, upper = 0.0, -np.inf, np.inf
+        result = np.empty((3, days))
+        for d in range(days):
+            if (first_day + d) % 5 == 0:
+                # min(1, max(0, x - reduction) + increase)
+                b, l, h = overtime_increase - weekend_reduction, overtime_increase, 1
+            else:
+                # min(1, x + increase)
+                b, l, h = overtime_increase, -np.inf, 1
+            shift += b
+            lower = min(h, max(l, lower + b))
+            upper = min(h, max(l, upper + b))
+            result[:, d] = shift, lower, upper
+        return result
+
+    def weekend_stress_reduction(self, session: CachedScenario, day: int) -> None:
+        # Every 5th day, the stress is reduces by the weekend reduction
+        # (5 because we only count workdays)
+        if day % 5 == 0:
+            for member in session.members:
+                member.stress = max(
+                    0, member.stress - session.scenario.config.stress_weekend_reduction
                 )
-                t.correct_specification = probability(self.management_skill)
-                t.unit_tested = False
-                t.integration_tested = False
-                m.familiar_tasks += 1
-                if t.bug:
-                    m.stress = min(
-                        (1, m.stress + self.user_scenario.config.stress_error_increase)
-                    )
-                n -= 1
+
+    def overtime_stress(self, session: CachedScenario, workpack: Workpack) -> None:
+        # If the member has to work overtime hours the extra stress is added
+        # This also works for the negative case
+        for member in session.members:
+            member.stress = min(
+                1,
+                workpack.overtime * session.scenario.config.stress_overtime_increase
+                + member.stress,
+            )
 
     # 3. unit tests (poisson zahl z.B. *1.3, unit test könnte schneller gehen als task machen)
     # alle tasks aus db holen die unit tested werden müssen (TaskStatus.done() (sind alle tasks die done sind und jetzt unit tested werden können)
@@ -326,18 +460,26 @@ class Member(models.Model):
     @property
     def efficiency(self) -> float:
         """Returns the efficiency of the member"""
+        return self.efficiency_at(self.stress)
+
+    def efficiency_at(self, stress, familiarity=None, minimum=min):
+        """Returns the efficiency of the member at the given stress level (and
+        familiarity, by default the current one). With minimum=np.minimum, stress
+        and familiarity can be arrays."""
         m_ids = set()
 
         def st(s):
             return 1 - (abs(s - 0.2))  # 0.2 is the ideal stress level
 
-        sum_val = (self.familiarity + self.motivation + st(self.stress)) / 3
+        if familiarity is None:
+            familiarity = self.familiarity
+        sum_val = (familiarity + self.motivation + st(stress)) / 3
 
         for m in self.team.members.all():
             m_ids.add(m.id)
 
         if len(m_ids) > 3:
-            return min(sum_val * 1.1, 1)
+            return minimum(sum_val * 1.1, 1)
         else:
             return sum_val
 
@@ -350,22 +492,45 @@ class Member(models.Model):
         Returns the number of tasks that the member can do in the given hours.
         As a second variable it also returns the poisson value it created.
         """
-        mu = (
-            hours
-            * ((self.efficiency + self.team.efficiency(session)) / 2)
-            * (self.skill_type.throughput + self.xp)
-        )
+        mu = self.poisson_mean(hours, session)
 
         # varying degrees of randomness (none=no randomness, semi=some randomness, full=full randomness)
         if session.scenario.config.randomness == "none":
             return int(mu * 0.2), 0
 
-        poisson = np.random.poisson(mu)
+        poisson = session.np_rng.poisson(mu)
         if session.scenario.config.randomness == "semi":
             return int(np.mean((poisson, mu)) * 0.2), poisson
 
         return int(poisson * 0.2), poisson
 
+    def n_tasks_window(self, mu: np.ndarray, session):
+        """Like n_tasks for several days with the poisson means mu of each day.
+        Returns the number of tasks and the summed poisson value. The poisson
+        values of the days are the split of one poisson value with the summed
+        mean, which has the same distribution as one poisson value per day."""
+        if session.scenario.config.randomness == "none":
+            return int(np.floor(mu * 0.2).sum()), 0
+
+        total = mu.sum()
+        poisson = session.np_rng.poisson(total)
+        per_day = (
+            session.np_rng.multinomial(poisson, mu / total)
+            if total > 0
+            else np.zeros(len(mu), dtype=int)
+        )
+        if session.scenario.config.randomness == "semi":
+            per_day = (per_day + mu) / 2
+        return int(np.floor(per_day * 0.2).sum()), int(poisson)
+
+    def poisson_mean(self, hours: int, session) -> float:
+        """Returns the expected poisson value of the member for the given hours."""
+        return (
+            hours
+            * ((self.efficiency + self.team.efficiency(session)) / 2)
+            * (self.skill_type.throughput + self.xp)
+        )
+
     def solve_task(self, task: Task) -> float:
         """Returns the a likelihood of the member doing making a bug caused by lack of
         development skill. Also adjusts the member's motivation according to the task's
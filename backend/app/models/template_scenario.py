@@ -20,6 +20,29 @@ class TemplateScenario(models.Model):
     name = models.TextField(default="default_scenario_name")
     story = models.TextField(default="", max_length=65536, blank=True)
     studio_template_id = models.TextField(default="")
+    # increased whenever the content of the template changes, see bump_version
+    version = models.PositiveIntegerField(default=0)
     # questions: List[Questions] -> ForeignKey Reference in Questions Model
     # simulation = Simulation -> ForeignKey Reference in Simulation Model
     # events = Event -> FK in Event Model
+
+    def save(self, *args, **kwargs):
+        # saving an instance that was loaded before the last bump_version must not
+        # reset the version, so it is only written when the template is created
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "version"
+            ]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def bump_version(**filters) -> None:
+        """Increases the version of all templates matching the filters. Does nothing
+        if a filter value is None (e.g. for a question without collection)."""
+        if None in filters.values():
+            return
+        TemplateScenario.objects.filter(**filters).update(
+            version=models.F("version") + 1
+        )
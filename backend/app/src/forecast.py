@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+from django.core.exceptions import ObjectDoesNotExist
+
+from app.dto.response import ForecastBandDTO, ForecastResponse
+from app.exceptions import RequestActionException, SimulationException
+from app.models.team import Member, SkillType
+from app.src.simulation import simulate
+from app.src.util.executor_util import get_process_pool
+from config import get_config
+
+# This prevents circular imports, but allows type hinting.
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.cache.scenario import CachedScenario
+
+
+FORECAST_PERCENTILES = (10, 50, 90)
+FORECAST_METRICS = ("cost", "days", "tasks_done", "bugs")
+
+
+def forecast(
+    session: CachedScenario, req, replicas: int = 20, seed: Optional[int] = None
+) -> ForecastResponse:
+    """Simulates the workpack of a SIMULATION request several times on forks of the
+    session and returns percentile bands of the outcomes. Neither the session nor
+    the database is changed."""
+    if req.actions is None:
+        raise RequestActionException()
+
+    start = time.perf_counter()
+    base = session.fork()
+    if req.members:
+        change_members(base, req.members)
+        req = req.copy(update={"members": []})
+
+    seeds = np.random.SeedSequence(seed).generate_state(replicas).tolist()
+    workers = get_config().forecast_workers
+    if workers and workers > 1 and replicas > 1:
+        chunks = [seeds[i::workers] for i in range(workers)]
+        results = get_process_pool("forecast", workers).map(
+            simulate_replicas, [base] * workers, [req] * workers, chunks
+        )
+        outcomes = [outcome for result in results for outcome in result]
+    else:
+        outcomes = simulate_replicas(base, req, seeds)
+    logging.info(
+        f"Forecast with {replicas} replicas took {time.perf_counter() - start} seconds"
+    )
+
+    outcomes = np.array(outcomes, dtype=float)
+    bands = {
+        metric: ForecastBandDTO(
+            mean=float(outcomes[:, i].mean()),
+            percentiles={
+                f"p{p}": float(v)
+                for p, v in zip(
+                    FORECAST_PERCENTILES,
+                    np.percentile(outcomes[:, i], FORECAST_PERCENTILES),
+                )
+            },
+        )
+        for i, metric in enumerate(FORECAST_METRICS)
+    }
+    return ForecastResponse(replicas=replicas, **bands)
+
+
+def simulate_replicas(session: CachedScenario, req, seeds: List[int]) -> List[tuple]:
+    """Simulates the request once per seed, each time on a new fork of the session
+    with its own random number generators seeded with the seed. The global random
+    state is neither used nor changed. Returns one (cost, days, tasks done, bugs)
+    tuple per seed."""
+    outcomes = []
+    for s in seeds:
+        fork = session.fork()
+        fork.rng = random.Random(s)
+        fork.np_rng = np.random.default_rng(s)
+        simulate(req, fork)
+        outcomes.append(
+            (
+                fork.scenario.state.cost,
+                fork.scenario.state.day,
+                len(fork.tasks.solved()),
+                len(fork.tasks.bug()),
+            )
+        )
+    return outcomes
+
+
+def change_members(session: CachedScenario, member_change) -> None:
+    """Adds or removes members like simulate does, but only in memory. Should only
+    be used on a forked session."""
+    members = list(session.members)
+    new_ids = itertools.count(-1, -1)
+    for m in member_change:
+        try:
+            s = SkillType.objects.get(name=m.skill_type)
+        except ObjectDoesNotExist:
+            msg = f"SkillType {m.skill_type} does not exist."
+            logging.error(msg)
+            raise SimulationException(msg)
+        if m.change > 0:
+            for _ in range(m.change):
+                # new members are never saved, the negative id only keeps them
+                # apart when the team is counted (see Member.efficiency)
+                members.append(Member(id=next(new_ids), skill_type=s))
+        else:
+            for _ in range(abs(m.change)):
+                to_remove = next(
+                    (x for x in members if x.skill_type_id == s.id), None
+                )
+                if to_remove is None:
+                    msg = f"Cannot remove {m.change} members of type {s.name}."
+                    logging.error(msg)
+                    raise SimulationException(msg)
+                members.remove(to_remove)
+    session.set_members(members)
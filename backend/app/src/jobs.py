@@ -0,0 +1,121 @@
+import datetime
+import logging
+import time
+from typing import Optional
+
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from app.cache.scenario import CachedScenario
+from app.dto.response import ScenarioResponse
+from app.exceptions import STEP_EXCEPTIONS, SimulationException, RequestTypeException
+from app.models.step_job import StepJob
+from app.models.user_scenario import UserScenario
+from app.src.simulation import continue_simulation
+from app.src.util.executor_util import get_process_pool
+from app.src.util.scenario_util import create_request_model
+from app.src.util.user_scenario_util import lock_scenario_state
+from config import get_config
+
+
+def enqueue_step(scenario: UserScenario, data: dict) -> StepJob:
+    """Enqueues the request as job for the current step of the scenario. If there
+    already is a job for this step, it is returned instead, only a failed job is
+    enqueued again with the new request."""
+    job, created = StepJob.objects.get_or_create(
+        user_scenario=scenario,
+        step_counter=scenario.state.step_counter,
+        defaults={"request": data},
+    )
+    if not created:
+        retried = StepJob.objects.filter(id=job.id, status=StepJob.FAILED).update(
+            status=StepJob.QUEUED, request=data, response=None, error="", lease_until=None
+        )
+        if not retried:
+            return job
+        job.refresh_from_db()
+
+    workers = get_config().step_job_workers
+    if workers:
+        # without workers jobs stay queued until run_step_jobs picks them up
+        transaction.on_commit(
+            lambda: get_process_pool("step-jobs", workers).submit(run_job, job.id)
+        )
+    return job
+
+
+class LeaseLostException(Exception):
+    """The job was claimed by another worker while it was running."""
+
+
+def claimable_jobs():
+    """Returns the jobs a worker can claim: queued jobs and running jobs whose
+    lease has expired."""
+    return StepJob.objects.filter(
+        Q(status=StepJob.QUEUED)
+        | Q(status=StepJob.RUNNING, lease_until__lt=timezone.now())
+    )
+
+
+def run_job(job_id: int) -> Optional[StepJob]:
+    """Runs a queued job (or a running job whose worker died) and stores its
+    response. The worker claims the job with a lease and only stores the step if
+    it still owns the lease, so a step is never stored twice. Does nothing if the
+    job cannot be claimed."""
+    # job workers live long, drop connections that are too old or broken
+    close_old_connections()
+    lease = timezone.now() + datetime.timedelta(seconds=get_config().step_job_lease)
+    claimed = claimable_jobs().filter(id=job_id).update(
+        status=StepJob.RUNNING, lease_until=lease
+    )
+    if not claimed:
+        return None
+
+    job = StepJob.objects.get(id=job_id)
+    owned = StepJob.objects.filter(id=job_id, status=StepJob.RUNNING, lease_until=lease)
+    start = time.perf_counter()
+    try:
+        req = create_request_model({**job.request, "scenario_id": job.user_scenario_id})
+        if req is None:
+            raise RequestTypeException()
+
+        with transaction.atomic():
+            state = lock_scenario_state(job.user_scenario_id)
+            if state.step_counter != job.step_counter:
+                raise SimulationException(
+                    f"Scenario is at step {state.step_counter}, job was enqueued for step {job.step_counter}."
+                )
+            session = CachedScenario(scenario_id=job.user_scenario_id)
+            response = continue_simulation(session, req)
+            if not isinstance(response, ScenarioResponse):
+                raise SimulationException("Could not create response for this step.")
+            session.save()
+            job.response = response.dict()
+            job.status = StepJob.DONE
+            job.error = ""
+            # rolls the step back if another worker has claimed the job meanwhile
+            if not owned.update(
+                status=job.status, response=job.response, error="", lease_until=None
+            ):
+                raise LeaseLostException()
+    except LeaseLostException:
+        logging.warning(f"Step job {job.id} was claimed by another worker.")
+        job.refresh_from_db()
+    except (Exception, *STEP_EXCEPTIONS) as e:
+        logging.error(e, exc_info=True)
+        job.status = StepJob.FAILED
+        job.response = None
+        job.error = str(e)
+        owned.update(status=job.status, response=None, error=job.error, lease_until=None)
+    logging.info(f"Step job {job.id} took {time.perf_counter() - start} seconds")
+    return job
+
+
+def run_next_job() -> Optional[StepJob]:
+    """Runs the oldest claimable job. Returns None if there is none."""
+    for job_id in claimable_jobs().order_by("id").values_list("id", flat=True)[:10]:
+        job = run_job(job_id)
+        if job is not None:
+            return job
+    return None
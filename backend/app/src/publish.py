@@ -0,0 +1,264 @@
+import logging
+import time
+from typing import List
+
+from django.db import transaction
+
+from app.exceptions import TemplateValidationException
+from app.models.action import Action
+from app.models.answer import Answer
+from app.models.event import Event, EventEffect
+from app.models.management_goal import ManagementGoal
+from app.models.model_selection import ModelSelection
+from app.models.question import Question
+from app.models.question_collection import QuestionCollection
+from app.models.score_card import ScoreCard
+from app.models.simulation_end import SimulationEnd
+from app.models.simulation_fragment import SimulationFragment
+from app.models.template_scenario import TemplateScenario
+
+VALUED_EFFECT_TYPES = ["budget", "duration", "stress", "motivation", "familiarity"]
+
+
+class TemplateGraph:
+    """All objects of a template scenario built from a studio template, not saved
+    yet. Children reference their parent objects, the ids are filled in when the
+    graph is saved."""
+
+    def __init__(self):
+        self.scenario = TemplateScenario()
+        self.management_goal: ManagementGoal = None
+        self.score_card = ScoreCard(template_scenario=self.scenario)
+        self.question_collections: List[QuestionCollection] = []
+        self.questions: List[Question] = []
+        self.answers: List[Answer] = []
+        self.fragments: List[SimulationFragment] = []
+        self.simulation_ends: List[SimulationEnd] = []
+        self.actions: List[Action] = []
+        self.model_selections: List[ModelSelection] = []
+        self.events: List[Event] = []
+        self.effects: List[EventEffect] = []
+
+
+def build_template_graph(components: list, studio_template_id: str) -> TemplateGraph:
+    """Builds the objects of a template scenario from the components of a studio
+    template. Raises TemplateValidationException if a component is not valid."""
+    builders = {
+        "BASE": build_base,
+        "QUESTIONS": build_questions,
+        "FRAGMENT": build_fragment,
+        "MODELSELECTION": build_model_selection,
+        "EVENT": build_event,
+    }
+    graph = TemplateGraph()
+    graph.scenario.studio_template_id = studio_template_id
+    i = 0
+    for n, component in enumerate(components):
+        builder = builders.get(component.get("type", "not-found"))
+        if builder is None:
+            raise TemplateValidationException(
+                f"Invalid component type {component.get('type')}"
+            )
+        try:
+            i = builder(component, graph, i)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise TemplateValidationException(
+                f"Component {n} ({component.get('type')}) is not valid: {e.__class__.__name__} {e}"
+            )
+
+    if graph.management_goal is None:
+        raise TemplateValidationException("Template has no BASE component.")
+    if graph.fragments:
+        max(graph.fragments, key=lambda f: f.index).last = True
+    return graph
+
+
+def build_base(data, graph: TemplateGraph, i):
+    scenario = graph.scenario
+    scenario.name = data.get("template_name")
+    scenario.story = data.get("text", "")
+    graph.management_goal = ManagementGoal(
+        budget=data.get("budget"),
+        duration=data.get("duration"),
+        easy_tasks=int(data.get("easy_tasks")),
+        medium_tasks=int(data.get("medium_tasks")),
+        hard_tasks=int(data.get("hard_tasks")),
+        tasks_predecessor_p=0.3,  # TODO: this should be set by the creator in studio
+        template_scenario=scenario,
+    )
+    return i
+
+
+def build_questions(data, graph: TemplateGraph, i):
+    qc = QuestionCollection(index=i, template_scenario=graph.scenario, text=data["text"])
+    graph.question_collections.append(qc)
+    for qi, question_data in enumerate(data.get("questions", [])):
+        q = Question(
+            question_index=qi,
+            question_collection=qc,
+            text=question_data.get("text", ""),
+            multi=question_data.get("type") == "MULTI",
+            explanation=question_data.get("explanation", ""),
+        )
+        graph.questions.append(q)
+        for answer_data in question_data.get("answers"):
+            graph.answers.append(
+                Answer(
+                    label=answer_data.get("label"),
+                    points=int(answer_data.get("points")),
+                    question=q,
+                )
+            )
+    return i + 1
+
+
+def build_fragment(data, graph: TemplateGraph, i):
+    fragment = SimulationFragment(
+        index=i, text=data.get("text", ""), template_scenario=graph.scenario
+    )
+    graph.fragments.append(fragment)
+
+    simend_data = data.get("simulation_end")
+    graph.simulation_ends.append(
+        SimulationEnd(
+            limit=simend_data.get("limit"),
+            type=simend_data.get("type"),
+            limit_type=simend_data.get("limit_type"),
+            simulation_fragment=fragment,
+        )
+    )
+    for action_data in data.get("actions"):
+        graph.actions.append(
+            Action(
+                title=action_data.get("action"),
+                lower_limit=action_data.get("lower_limit"),
+                upper_limit=action_data.get("upper_limit"),
+                simulation_fragment=fragment,
+            )
+        )
+    return i + 1
+
+
+def build_model_selection(data, graph: TemplateGraph, i):
+    graph.model_selections.append(
+        ModelSelection(
+            index=i,
+            text=data.get("text", ""),
+            waterfall="Waterfall" in data.get("models"),
+            kanban="Kanban" in data.get("models"),
+            scrum="Scrum" in data.get("models"),
+            template_scenario=graph.scenario,
+        )
+    )
+    return i + 1
+
+
+def _float_or_zero(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _int_or_zero(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_event(data, graph: TemplateGraph, i):
+    event = Event(
+        template_scenario=graph.scenario,
+        text=data["text"],
+        trigger_type=data["trigger_type"],
+        trigger_comparator=data["trigger_comparator"],
+        trigger_value=_float_or_zero(data["trigger_value"]),
+    )
+    graph.events.append(event)
+    for effect_type in VALUED_EFFECT_TYPES:
+        graph.effects.append(
+            EventEffect(
+                event=event,
+                type=effect_type,
+                value=_float_or_zero(data[effect_type]),
+                easy_tasks=0,
+                medium_tasks=0,
+                hard_tasks=0,
+            )
+        )
+    graph.effects.append(
+        EventEffect(
+            event=event,
+            type="tasks",
+            value=0,
+            easy_tasks=_int_or_zero(data.get("easy_tasks")),
+            medium_tasks=_int_or_zero(data.get("medium_tasks")),
+            hard_tasks=_int_or_zero(data.get("hard_tasks")),
+        )
+    )
+    return i + 1
+
+
+def bulk_create_with_ids(model, objs: list, **filters) -> list:
+    """Inserts the objects with one query and makes sure they have their ids, so
+    their children can reference them. Backends that do not return the ids of
+    inserted rows (MySQL) get them with a second query: the filters must match
+    exactly the inserted rows, which get increasing ids in order of insertion."""
+    if not objs:
+        return objs
+    model.objects.bulk_create(objs)
+    if objs[0].pk is None:
+        ids = list(
+            model.objects.filter(**filters).order_by("pk").values_list("pk", flat=True)
+        )
+        if len(ids) != len(objs):
+            raise RuntimeError(
+                f"Expected {len(objs)} new {model.__name__} rows, found {len(ids)}."
+            )
+        for obj, pk in zip(objs, ids):
+            obj.pk = pk
+    return objs
+
+
+def save_template_graph(graph: TemplateGraph) -> TemplateScenario:
+    """Saves all objects of the graph in one transaction, with one query per model.
+    Nothing is saved if any query fails."""
+    start = time.perf_counter()
+    scenario = graph.scenario
+    with transaction.atomic():
+        scenario.save()
+        graph.management_goal.save()
+        graph.score_card.save()  # TODO: this should be set by the creator in studio
+
+        bulk_create_with_ids(
+            QuestionCollection, graph.question_collections, template_scenario=scenario
+        )
+        bulk_create_with_ids(
+            Question,
+            graph.questions,
+            question_collection__template_scenario=scenario,
+        )
+        Answer.objects.bulk_create(graph.answers)
+
+        bulk_create_with_ids(
+            SimulationFragment, graph.fragments, template_scenario=scenario
+        )
+        SimulationEnd.objects.bulk_create(graph.simulation_ends)
+        Action.objects.bulk_create(graph.actions)
+
+        ModelSelection.objects.bulk_create(graph.model_selections)
+
+        bulk_create_with_ids(Event, graph.events, template_scenario=scenario)
+        EventEffect.objects.bulk_create(graph.effects)
+
+        # bulk_create sends no post_save signals, the saved management goal and score
+        # card do, so the version of the template (see
+        # app/cache/question_collection.py) of the new template is set here
+        scenario.version = 1
+        TemplateScenario.objects.filter(id=scenario.id).update(version=scenario.version)
+
+    logging.info(
+        f"Publishing template scenario {scenario.id} took {time.perf_counter() - start} seconds"
+    )
+    return scenario
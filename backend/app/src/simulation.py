@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import List
+from typing import List, Optional, Tuple
 
 from app.dto.response import (
     ModelSelectionResponse,
@@ -88,6 +88,9 @@ def simulate(req, session: CachedScenario) -> None:
     if req.members and req.members != []:
         # Add or remove members from the team
         member_change = req.members
+        # keep the members of the session in sync, the session can be used for
+        # further steps (see continue_simulation_batch)
+        session.members = list(session.members)
         for m in member_change:
             try:
                 s = SkillType.objects.get(name=m.skill_type)
@@ -100,13 +103,15 @@ def simulate(req, session: CachedScenario) -> None:
                     new_member = Member(
                         skill_type=s, team=session.scenario.team)
                     new_member.save()
+                    session.members.append(new_member)
             else:
-                list_of_members = Member.objects.filter(
-                    team=session.scenario.team, skill_type=s
-                )
+                list_of_members = [
+                    x for x in session.members if x.skill_type_id == s.id
+                ]
                 try:
                     for i in range(abs(m.change)):
-                        m_to_delete: Member = list_of_members[0]
+                        m_to_delete: Member = list_of_members[i]
+                        session.members.remove(m_to_delete)
                         m_to_delete.delete()
                 except IndexError:
                     msg = f"Cannot remove {m.change} members of type {s.name}."
@@ -124,7 +129,8 @@ def simulate(req, session: CachedScenario) -> None:
         days = days - 1
         # integration test will be at the end of the week
 
-    workpack_status = WorkpackStatus(days, workpack)
+    workpack_status = WorkpackStatus(
+        days, workpack, session.tasks.todo_pools(session.rng))
 
 
 
@@ -134,11 +140,34 @@ def simulate(req, session: CachedScenario) -> None:
     if len(session.members) > 0:
         # for schleife für tage (kleinste simulation ist stunde, jeder tag ist 8 stunden) (falls team event muss ein tag abgezogen werden)
         # scenario.team.work(workpack) (ein tag simuliert)
-        for day in range(0, days):
-            session.scenario.team.work(session, workpack, workpack_status, day)
-            session.scenario.state.day += 1
+        day = 0
+        while day < days:
+            window = workpack_status.skip_ahead_window(
+                session, workpack, day, days)
+            if window > 1:
+                # skip-ahead mode: simulate several days in one step
+                session.scenario.team.work_days(
+                    session, workpack, window, workpack_status.tasks_to_do)
+            else:
+                session.scenario.team.work(
+                    session, workpack, workpack_status, day)
+            session.scenario.state.day += window
+            day += window
+            solved_tasks = len(session.tasks.solved())
             for member in session.members:
-                member.calculate_familiarity(len(session.tasks.solved()))
+                member.calculate_familiarity(solved_tasks)
+            if session.progress is not None:
+                session.progress.append(
+                    {
+                        "day": session.scenario.state.day,
+                        "cost": float(session.scenario.state.cost),
+                        "tasks_done": solved_tasks,
+                        "stress": float(session.scenario.team.stress(session.members)),
+                        "motivation": float(
+                            session.scenario.team.motivation(session.members)
+                        ),
+                    }
+                )
         logging.warning(
             f"Team work took {time.perf_counter() - start} seconds")
     else:
@@ -176,7 +205,8 @@ def continue_simulation(session: CachedScenario, req) -> ScenarioResponse:
     :param req: Object with request data
 
     """
-    # response that gets returned at the end
+    # response that gets returned at the end. Responses are assembled from plain
+    # dicts with construct(), the payloads are not validated again in every step.
     scenario_response = None
 
     # 1. Process the request information
@@ -206,7 +236,7 @@ def continue_simulation(session: CachedScenario, req) -> ScenarioResponse:
     # check if this event already happened (bool for every event in db -> set 'happened' to true if event happened)
     event = event_triggered(session)
     if isinstance(event, Event):
-        scenario_response = EventResponse(
+        scenario_response = EventResponse.construct(
             # todo philip: don't know which one frontend wants to use, can delete one of the two text fields later
             event_text=event.text,
             text=event.text,
@@ -240,7 +270,7 @@ def continue_simulation(session: CachedScenario, req) -> ScenarioResponse:
     # 5. Check with which component the simulation continues
     # 5.1 Check if next component is a Simulation Component
     elif isinstance(next_component, SimulationFragment):
-        scenario_response = SimulationResponse(
+        scenario_response = SimulationResponse.construct(
             management=session.scenario.get_management_goal_dto(),
             actions=get_actions_from_fragment(next_component),
             tasks=get_tasks_status(session),
@@ -251,7 +281,7 @@ def continue_simulation(session: CachedScenario, req) -> ScenarioResponse:
         )
     # 5.2 Check if next component is a Question Component
     elif isinstance(next_component, QuestionCollection):
-        scenario_response = QuestionResponse(
+        scenario_response = QuestionResponse.construct(
             management=session.scenario.get_management_goal_dto(),
             question_collection=get_question_collection(session.scenario),
             state=get_scenario_state_dto(session.scenario),
@@ -262,7 +292,7 @@ def continue_simulation(session: CachedScenario, req) -> ScenarioResponse:
         )
     # 5.3 Check if next component is a Model Selection
     elif isinstance(next_component, ModelSelection):
-        scenario_response = ModelSelectionResponse(
+        scenario_response = ModelSelectionResponse.construct(
             management=session.scenario.get_management_goal_dto(),
             tasks=get_tasks_status(session),
             state=get_scenario_state_dto(session.scenario),
@@ -279,6 +309,32 @@ def continue_simulation(session: CachedScenario, req) -> ScenarioResponse:
     return complete_scenario_step(session, req, scenario_response)
 
 
+def continue_simulation_batch(
+    session: CachedScenario, reqs: list
+) -> Tuple[List[ScenarioResponse], Optional[str]]:
+    """Continues the simulation with several requests in order, like calling
+    continue_simulation for each of them. A request is only processed if it fits
+    the response of the previous request (e.g. a SIMULATION request after a
+    SIMULATION response, an EVENT request after an EVENT response), so the batch
+    stops at events, questions or the end of the scenario the requests were not
+    made for. Returns the responses of all processed requests and the reason why
+    the batch was stopped (None if all requests were processed)."""
+    responses = []
+    for i, req in enumerate(reqs):
+        if responses:
+            # the result of the scenario can also be an error Response
+            previous_type = getattr(responses[-1], "type", "RESULT")
+            if previous_type == "RESULT":
+                return responses, f"Scenario ended before request {i}."
+            if previous_type != req.type:
+                return (
+                    responses,
+                    f"Request {i} has type {req.type}, but scenario continues with {previous_type}.",
+                )
+        responses.append(continue_simulation(session, req))
+    return responses, None
+
+
 def complete_scenario_step(session: CachedScenario, req, scenario_response):
     # write_history(session.scenario, req, scenario_response.type)
 
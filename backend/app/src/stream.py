@@ -0,0 +1,89 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Iterator
+
+from django.db import connection, transaction
+
+from app.cache.scenario import CachedScenario
+from app.dto.response import ScenarioResponse
+from app.exceptions import SimulationException
+from app.src.simulation import continue_simulation
+from app.src.util.user_scenario_util import lock_scenario_state
+
+# number of day snapshots kept if the client reads slower than the team works
+PROGRESS_BUFFER_SIZE = 256
+
+
+def stream_step(session: CachedScenario, req) -> Iterator[str]:
+    """Runs the step in a thread and yields server-sent events: one 'day' event per
+    simulated day while the step runs, then one 'response' event with the step
+    response (or an 'error' event). The days are passed from the simulation to the
+    stream through a ring buffer on the session."""
+    done, result = start_step(session, req)
+    while True:
+        finished = done.wait(0.05)
+        while session.progress:
+            yield sse("day", session.progress.popleft())
+        if finished:
+            break
+    yield result_event(result)
+
+
+async def astream_step(session: CachedScenario, req) -> AsyncIterator[str]:
+    """Like stream_step for the ASGI application: the ring buffer is polled on the
+    event loop, so no thread waits for the step while it runs."""
+    done, result = start_step(session, req)
+    while True:
+        finished = done.is_set()
+        while session.progress:
+            yield sse("day", session.progress.popleft())
+        if finished:
+            break
+        await asyncio.sleep(0.05)
+    yield result_event(result)
+
+
+def start_step(session: CachedScenario, req):
+    """Starts the step in a thread. Returns an event that is set when the step is
+    done and the dict that then holds its 'response' or 'error'."""
+    session.progress = deque(maxlen=PROGRESS_BUFFER_SIZE)
+    done = threading.Event()
+    result = {}
+
+    def run():
+        try:
+            with transaction.atomic():
+                # the session was loaded before the lock, so it must not have
+                # changed in the meantime
+                state = lock_scenario_state(session.scenario.id)
+                if state.step_counter != session.scenario.state.step_counter:
+                    raise SimulationException(
+                        "Scenario was changed by another request, please try again."
+                    )
+                response = continue_simulation(session, req)
+                if not isinstance(response, ScenarioResponse):
+                    raise ValueError("Could not create response for this step.")
+                session.save()
+            result["response"] = response.dict()
+        except BaseException as e:
+            logging.error(e, exc_info=True)
+            result["error"] = str(e)
+        finally:
+            connection.close()
+            done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return done, result
+
+
+def result_event(result: dict) -> str:
+    if "error" in result:
+        return sse("error", {"status": "error", "error-message": result["error"]})
+    return sse("response", result["response"])
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
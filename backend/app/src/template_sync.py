@@ -0,0 +1,298 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from django.db import transaction
+
+from app.models.action import Action
+from app.models.answer import Answer
+from app.models.event import Event, EventEffect
+from app.models.management_goal import ManagementGoal
+from app.models.model_selection import ModelSelection
+from app.models.question import Question
+from app.models.question_collection import QuestionCollection
+from app.models.score_card import ScoreCard
+from app.models.simulation_end import SimulationEnd
+from app.models.simulation_fragment import SimulationFragment
+from app.models.template_scenario import TemplateScenario
+from app.src.publish import bulk_create_with_ids
+
+# fields of each model that are written from the nested data of a template, see
+# TemplateScenarioSerializer (foreign keys in the data are ignored)
+SCENARIO_FIELDS = ("name", "story", "studio_template_id")
+MANAGEMENT_GOAL_FIELDS = (
+    "budget",
+    "duration",
+    "easy_tasks",
+    "medium_tasks",
+    "hard_tasks",
+    "tasks_predecessor_p",
+)
+SCORE_CARD_FIELDS = (
+    "budget_limit",
+    "time_limit",
+    "quality_limit",
+    "budget_p",
+    "time_p",
+    "quality_k",
+)
+QUESTION_COLLECTION_FIELDS = ("index", "text")
+QUESTION_FIELDS = ("question_index", "text", "multi", "explanation")
+ANSWER_FIELDS = ("label", "points")
+FRAGMENT_FIELDS = ("index", "text")
+SIMULATION_END_FIELDS = ("limit", "type", "limit_type")
+ACTION_FIELDS = ("title", "lower_limit", "upper_limit")
+MODEL_SELECTION_FIELDS = ("index", "text", "waterfall", "kanban", "scrum")
+EVENT_FIELDS = ("text", "trigger_type", "trigger_value", "trigger_comparator")
+EFFECT_FIELDS = ("type", "value", "easy_tasks", "medium_tasks", "hard_tasks")
+
+
+class TemplateChanges:
+    """The rows to create, update and delete per model, applied with one query per
+    model and kind of change."""
+
+    def __init__(self):
+        self.create: Dict[type, list] = defaultdict(list)
+        self.update: Dict[type, list] = defaultdict(list)
+        self.update_fields: Dict[type, set] = defaultdict(set)
+        self.delete: Dict[type, list] = defaultdict(list)
+        # highest id of the existing rows, new rows get higher ids
+        self.max_pk: Dict[type, int] = defaultdict(int)
+
+    def sync(self, model, existing: dict, incoming: dict, fields, **parent) -> list:
+        """Matches the incoming data with the existing objects by key. Matched objects
+        are updated if any field changed, unmatched data is created and unmatched
+        objects are deleted. Returns (object, data) for every incoming item."""
+        result = []
+        for obj in existing.values():
+            self.max_pk[model] = max(self.max_pk[model], obj.pk)
+        for key, data in incoming.items():
+            values = {f: data[f] for f in fields if f in data}
+            obj = existing.pop(key, None)
+            if obj is None:
+                obj = model(**parent, **values)
+                self.create[model].append(obj)
+            else:
+                self.set(obj, values)
+            result.append((obj, data))
+        self.delete[model].extend(existing.values())
+        return result
+
+    def set(self, obj, values: dict):
+        changed = [f for f, v in values.items() if getattr(obj, f) != v]
+        if changed:
+            for f in changed:
+                setattr(obj, f, values[f])
+            if obj.pk is not None:
+                self.update[type(obj)].append(obj)
+                self.update_fields[type(obj)].update(changed)
+
+    def __bool__(self):
+        return any(self.create.values()) or any(self.update.values()) or any(
+            self.delete.values()
+        )
+
+
+def _by_position(objects) -> dict:
+    return dict(enumerate(sorted(objects, key=lambda o: o.pk)))
+
+
+def sync_template_scenario(scenario: TemplateScenario, data: dict) -> TemplateScenario:
+    """Changes the template scenario and all its components to match the (validated)
+    nested data of TemplateScenarioSerializer. Components are matched by index,
+    questions by question index and all other children by position, so unchanged
+    rows keep their ids and are not written. Components missing in the data are left
+    as they are (partial update), components missing in a given list are deleted.
+    A new (unsaved) scenario is created."""
+    start = time.perf_counter()
+    changes = TemplateChanges()
+    with transaction.atomic():
+        if scenario.pk is None:
+            for f in SCENARIO_FIELDS:
+                if f in data:
+                    setattr(scenario, f, data[f])
+            scenario.save()
+        else:
+            # edits of the same template are applied one after another
+            scenario = TemplateScenario.objects.select_for_update().get(pk=scenario.pk)
+            changes.set(scenario, {f: data[f] for f in SCENARIO_FIELDS if f in data})
+        version = scenario.version
+
+        _sync_one_to_one(
+            changes, scenario, ManagementGoal, "management_goal", data, MANAGEMENT_GOAL_FIELDS
+        )
+        _sync_one_to_one(
+            changes, scenario, ScoreCard, "score_card", data, SCORE_CARD_FIELDS
+        )
+
+        new_ids = {}
+        if "question_collections" in data:
+            _sync_question_collections(changes, scenario, data["question_collections"])
+            new_ids[QuestionCollection] = dict(template_scenario=scenario)
+            new_ids[Question] = dict(question_collection__template_scenario=scenario)
+        if "simulation_fragments" in data:
+            _sync_fragments(changes, scenario, data["simulation_fragments"])
+            new_ids[SimulationFragment] = dict(template_scenario=scenario)
+        if "model_selections" in data:
+            changes.sync(
+                ModelSelection,
+                {m.index: m for m in scenario.model_selections.all()},
+                {m["index"]: m for m in data["model_selections"]},
+                MODEL_SELECTION_FIELDS,
+                template_scenario=scenario,
+            )
+        if "events" in data:
+            _sync_events(changes, scenario, data["events"])
+            new_ids[Event] = dict(template_scenario=scenario)
+
+        _apply(changes, new_ids)
+
+        # bulk updates and creates send no signals, deletes send one per row, so the
+        # version of the template (see app/cache/question_collection.py) is set
+        # here, once per sync. The row is locked, no other bump can be lost.
+        if changes:
+            TemplateScenario.objects.filter(id=scenario.id).update(version=version + 1)
+            scenario.version = version + 1
+
+    logging.info(
+        f"Syncing template scenario {scenario.id} took {time.perf_counter() - start} seconds"
+    )
+    return scenario
+
+
+def _sync_one_to_one(changes, scenario, model, name, data, fields):
+    if name not in data:
+        return
+    values = {f: data[name][f] for f in fields if f in data[name]}
+    obj = model.objects.filter(template_scenario=scenario).first()
+    if obj is None:
+        changes.create[model].append(model(template_scenario=scenario, **values))
+    else:
+        changes.set(obj, values)
+
+
+def _sync_question_collections(changes, scenario, collections_data):
+    existing = list(
+        QuestionCollection.objects.filter(template_scenario=scenario).prefetch_related(
+            "questions__answers"
+        )
+    )
+    questions = {qc.index: {q.question_index: q for q in qc.questions.all()} for qc in existing}
+    answers = {
+        (qc.index, q.question_index): _by_position(q.answers.all())
+        for qc in existing
+        for q in qc.questions.all()
+    }
+    for qc, qc_data in changes.sync(
+        QuestionCollection,
+        {qc.index: qc for qc in existing},
+        {qc["index"]: qc for qc in collections_data},
+        QUESTION_COLLECTION_FIELDS,
+        template_scenario=scenario,
+    ):
+        for q, q_data in changes.sync(
+            Question,
+            questions.get(qc_data["index"], {}) if qc.pk else {},
+            {q["question_index"]: q for q in qc_data.get("questions", [])},
+            QUESTION_FIELDS,
+            question_collection=qc,
+        ):
+            changes.sync(
+                Answer,
+                answers.get((qc_data["index"], q_data["question_index"]), {}) if q.pk else {},
+                dict(enumerate(q_data.get("answers", []))),
+                ANSWER_FIELDS,
+                question=q,
+            )
+
+
+def _sync_fragments(changes, scenario, fragments_data):
+    existing = list(
+        SimulationFragment.objects.filter(template_scenario=scenario)
+        .select_related("simulation_end")
+        .prefetch_related("actions")
+    )
+    for fragment, f_data in changes.sync(
+        SimulationFragment,
+        {f.index: f for f in existing},
+        {f["index"]: f for f in fragments_data},
+        FRAGMENT_FIELDS,
+        template_scenario=scenario,
+    ):
+        end = getattr(fragment, "simulation_end", None) if fragment.pk else None
+        if "simulation_end" in f_data:
+            values = {
+                f: f_data["simulation_end"][f]
+                for f in SIMULATION_END_FIELDS
+                if f in f_data["simulation_end"]
+            }
+            if end is None:
+                changes.create[SimulationEnd].append(
+                    SimulationEnd(simulation_fragment=fragment, **values)
+                )
+            else:
+                changes.set(end, values)
+        changes.sync(
+            Action,
+            _by_position(fragment.actions.all()) if fragment.pk else {},
+            dict(enumerate(f_data.get("actions", []))),
+            ACTION_FIELDS,
+            simulation_fragment=fragment,
+        )
+
+
+def _sync_events(changes, scenario, events_data):
+    existing = Event.objects.filter(template_scenario=scenario).prefetch_related("effects")
+    for event, e_data in changes.sync(
+        Event,
+        _by_position(existing),
+        dict(enumerate(events_data)),
+        EVENT_FIELDS,
+        template_scenario=scenario,
+    ):
+        changes.sync(
+            EventEffect,
+            _by_position(event.effects.all()) if event.pk else {},
+            dict(enumerate(e_data.get("effects", []))),
+            EFFECT_FIELDS,
+            event=event,
+        )
+
+
+# parents are created before their children
+CREATE_ORDER: List[type] = [
+    ManagementGoal,
+    ScoreCard,
+    QuestionCollection,
+    Question,
+    Answer,
+    SimulationFragment,
+    SimulationEnd,
+    Action,
+    ModelSelection,
+    Event,
+    EventEffect,
+]
+
+
+def _apply(changes: TemplateChanges, new_ids: dict):
+    """Deletes, updates and creates the changed rows, one query per model and kind
+    of change. Children of deleted rows are deleted by the database cascade."""
+    for model, objs in changes.delete.items():
+        if objs:
+            model.objects.filter(pk__in=[o.pk for o in objs]).delete()
+    for model, objs in changes.update.items():
+        if objs:
+            model.objects.bulk_update(objs, sorted(changes.update_fields[model]))
+    for model in CREATE_ORDER:
+        objs = changes.create.get(model)
+        if not objs:
+            continue
+        if model in new_ids:
+            # children reference the new rows, so their ids are needed
+            bulk_create_with_ids(
+                model, objs, pk__gt=changes.max_pk[model], **new_ids[model]
+            )
+        else:
+            model.objects.bulk_create(objs)
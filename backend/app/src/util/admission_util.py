@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+from config import get_config
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted before its deadline. A reason of
+    "user" means the user has too many requests running, "capacity" means the
+    worker is full."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected ({reason}), retry after {retry_after}s.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounds the heavy requests running at the same time in this worker, in total
+    and per user. A request that cannot run right away waits in a short queue until
+    a slot is free or its deadline has passed. Counters are kept per worker."""
+
+    def __init__(
+        self,
+        max_requests: int,
+        max_user_requests: int,
+        max_queue: int,
+        timeout: float,
+    ):
+        self.max_requests = max_requests
+        self.max_user_requests = max_user_requests
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._running = 0
+        self._running_by_user = Counter()
+        self._queued = 0
+        # moving average of the time a request holds its slot, for Retry-After
+        self._avg_duration = 0.0
+        self._stats = Counter()
+        self._max_queued = 0
+
+    def _can_run(self, user_id) -> bool:
+        return (
+            self._running < self.max_requests
+            and self._running_by_user[user_id] < self.max_user_requests
+        )
+
+    def _retry_after(self) -> int:
+        waiting = self._queued + 1
+        return max(1, math.ceil(self._avg_duration * waiting / self.max_requests))
+
+    def _reject(self, reason: str):
+        self._stats[f"rejected_{reason}"] += 1
+        raise AdmissionRejected(reason, self._retry_after())
+
+    @contextmanager
+    def admit(self, user_id):
+        """Runs the body once the request is admitted. Raises AdmissionRejected if
+        the queue is full or the request could not be admitted in time."""
+        with self._condition:
+            if not self._can_run(user_id):
+                if self._queued >= self.max_queue:
+                    self._reject("capacity")
+                self._queued += 1
+                self._max_queued = max(self._max_queued, self._queued)
+                start = time.monotonic()
+                deadline = start + self.timeout
+                try:
+                    while not self._can_run(user_id):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._reject(
+                                "user"
+                                if self._running_by_user[user_id]
+                                >= self.max_user_requests
+                                else "capacity"
+                            )
+                        self._condition.wait(remaining)
+                finally:
+                    self._queued -= 1
+                self._stats["queued"] += 1
+                self._stats["wait_ms"] += int((time.monotonic() - start) * 1000)
+            self._running += 1
+            self._running_by_user[user_id] += 1
+            self._stats["admitted"] += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            with self._condition:
+                self._running -= 1
+                self._running_by_user[user_id] -= 1
+                if not self._running_by_user[user_id]:
+                    del self._running_by_user[user_id]
+                self._avg_duration = 0.9 * self._avg_duration + 0.1 * duration
+                self._condition.notify_all()
+
+    def metrics(self) -> dict:
+        with self._condition:
+            return {
+                "max_requests": self.max_requests,
+                "max_user_requests": self.max_user_requests,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queued,
+                "admitted": self._stats["admitted"],
+                "queued": self._stats["queued"],
+                "queue_wait_ms": self._stats["wait_ms"],
+                "rejected_capacity": self._stats["rejected_capacity"],
+                "rejected_user": self._stats["rejected_user"],
+                "avg_duration_ms": int(self._avg_duration * 1000),
+            }
+
+
+_controller: Optional[AdmissionController] = None
+_configured = False
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Returns the admission controller of this worker, None if admission control
+    is disabled (ADMISSION_MAX_REQUESTS=0)."""
+    global _controller, _configured
+    if not _configured:
+        with _controller_lock:
+            if not _configured:
+                config = get_config()
+                if config.admission_max_requests:
+                    _controller = AdmissionController(
+                        max_requests=config.admission_max_requests,
+                        max_user_requests=config.admission_max_user_requests
+                        or config.admission_max_requests,
+                        max_queue=config.admission_max_queue,
+                        timeout=config.admission_timeout,
+                    )
+                _configured = True
+    return _controller
@@ -0,0 +1,81 @@
+from typing import Optional
+
+from django.core.cache import cache
+
+from app.dto.response import DeltaResponse, MembersDeltaDTO
+
+# how long the last response of a scenario is kept to compute deltas against
+SNAPSHOT_TIMEOUT = 60 * 60
+
+
+def snapshot_key(scenario_id: int) -> str:
+    return f"step-snapshot-{scenario_id}"
+
+
+def encode_step_response(
+    scenario_id: int, payload: dict, version: int, base_version: Optional[int] = None
+) -> dict:
+    """Returns the step response for a client that uses delta responses. If the
+    client has seen the last response of the scenario (base_version), only the
+    changes to that response are returned, otherwise the full response. In both
+    cases the response is remembered for the next step."""
+    previous = cache.get(snapshot_key(scenario_id))
+    cache.set(snapshot_key(scenario_id), (version, payload), SNAPSHOT_TIMEOUT)
+
+    if (
+        base_version is not None
+        and previous is not None
+        and previous[0] == base_version
+        and payload.get("type") != "RESULT"
+    ):
+        return diff_responses(previous[1], payload, base_version, version).dict()
+    return {**payload, "delta": False, "state_version": version}
+
+
+def diff_responses(
+    old: dict, new: dict, base_version: int, version: int
+) -> DeltaResponse:
+    """Returns the changes from the old to the new response. Values removed from
+    an object are listed in removed by their path, e.g. "state.day"."""
+    changed = {}
+    removed = [key for key in old if key not in new]
+    for key, value in new.items():
+        if key == "members" or old.get(key) == value:
+            continue
+        if isinstance(value, dict) and isinstance(old.get(key), dict):
+            before = old[key]
+            values = {k: v for k, v in value.items() if k not in before or before[k] != v}
+            if values:
+                changed[key] = values
+            removed += [f"{key}.{k}" for k in before if k not in value]
+        else:
+            changed[key] = value
+
+    return DeltaResponse.construct(
+        type=new["type"],
+        state_version=version,
+        base_version=base_version,
+        changed=changed,
+        removed=removed,
+        members=diff_members(old.get("members", []), new.get("members", [])),
+    )
+
+
+def diff_members(old: list, new: list) -> MembersDeltaDTO:
+    """Returns the members that were added, removed or changed, matched by id."""
+    old_by_id = {m["id"]: m for m in old}
+    new_ids = {m["id"] for m in new}
+    added, changed = [], []
+    for m in new:
+        before = old_by_id.get(m["id"])
+        if before is None:
+            added.append(m)
+        elif before != m:
+            changed.append(
+                {"id": m["id"], **{k: v for k, v in m.items() if before.get(k) != v}}
+            )
+    return MembersDeltaDTO.construct(
+        added=added,
+        removed=[id for id in old_by_id if id not in new_ids],
+        changed=changed,
+    )
@@ -0,0 +1,21 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+import django
+
+_executors: Dict[str, ProcessPoolExecutor] = {}
+
+
+def get_process_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    """Returns the process pool with the given name. The pool is created on first
+    use and kept for the lifetime of the process. Workers are spawned (not forked),
+    so they never share database connections with the web worker, and set up
+    Django before they run anything."""
+    if name not in _executors:
+        _executors[name] = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        )
+    return _executors[name]
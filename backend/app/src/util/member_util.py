@@ -1,10 +1,20 @@
 from typing import List
 
-from app.dto.response import MemberDTO
 from app.models.team import Member
-from app.serializers.team import MemberSerializer
 
 
-def get_member_report(members) -> List[MemberDTO]:
-    serializer = MemberSerializer(members, many=True)
-    return [MemberDTO(**m) for m in serializer.data]
+def get_member_report(members) -> List[dict]:
+    """Returns the report of all members as plain dicts (see MemberDTO). The dicts
+    are built directly from the members, so no serializer and no validation is
+    needed in every step."""
+    return [
+        {
+            "id": m.id,
+            "motivation": float(m.motivation),
+            "familiarity": float(m.familiarity),
+            "stress": float(m.stress),
+            "xp": float(m.xp),
+            "skill_type": {"id": m.skill_type_id, "name": m.skill_type.name},
+        }
+        for m in members
+    ]
@@ -0,0 +1,151 @@
+import base64
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import status
+from rest_framework.response import Response
+
+from app.exceptions import RequestParamException
+
+# largest page of the list endpoints, also the page size if only <after> is given
+MAX_LIMIT = 1000
+
+
+def encode_cursor(pk) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": pk}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"]
+    except Exception:
+        raise RequestParamException("<after>")
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        raise RequestParamException("<after>")
+    return pk
+
+
+def parse_fields(value: Optional[str], available: Iterable[str]) -> Optional[List[str]]:
+    """Returns the fields of the query parameter <fields> (comma separated), None if
+    it is not given. Raises RequestParamException for unknown fields."""
+    if value is None:
+        return None
+    fields = [f.strip() for f in value.split(",") if f.strip()]
+    if not fields or any(f not in available for f in fields):
+        raise RequestParamException("<fields>")
+    return fields
+
+
+def parse_limit(value: Optional[str], max_limit: int = MAX_LIMIT) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise RequestParamException("<limit>")
+    if not 0 < limit <= max_limit:
+        raise RequestParamException("<limit>")
+    return limit
+
+
+def _columns(model, serializer, fields: List[str]) -> List[str]:
+    """Returns the model fields read by the given serializer fields, for only()."""
+    columns = [model._meta.pk.name]
+    for name in fields:
+        source = serializer.fields[name].source
+        try:
+            field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            continue
+        # reverse relations and many to many fields have no column
+        if field.concrete and not field.many_to_many:
+            columns.append(field.name)
+    return columns
+
+
+def paginate(
+    request,
+    queryset,
+    serializer_class,
+    select_related: Dict[str, str] = None,
+    prefetch_related: Dict[str, object] = None,
+    default_fields: Optional[List[str]] = None,
+    max_limit: int = MAX_LIMIT,
+) -> Tuple[list, Optional[str]]:
+    """Returns one page of the serialized objects ordered by id and the cursor of the
+    next page (None on the last page). Query parameters:
+    <limit>: size of the page, at most max_limit
+    <after>: cursor of the page, the objects after the last object of the previous page
+             (pages of max_limit objects if no limit is given)
+    Without <limit> and <after> all objects are returned in one page, like before the
+    list endpoints were paginated, since existing clients do not follow cursors.
+    <fields>: comma separated fields of the serializer, only these are read and returned
+    Related objects are only loaded (with the given select_related/prefetch_related
+    lookups per serializer field) if their field is returned."""
+    params = request.query_params
+    available = serializer_class().fields
+    fields = parse_fields(params.get("fields"), available) or default_fields
+    limit = parse_limit(params.get("limit"), max_limit)
+    if limit is None and params.get("after") is not None:
+        limit = max_limit
+
+    selected = set(fields if fields is not None else available)
+    joined = [
+        lookup for name, lookup in (select_related or {}).items() if name in selected
+    ]
+    if fields is not None:
+        # related objects joined with select_related must not be deferred
+        queryset = queryset.only(
+            *_columns(queryset.model, serializer_class(), fields), *joined
+        )
+    if joined:
+        queryset = queryset.select_related(*joined)
+    for name, lookup in (prefetch_related or {}).items():
+        if name in selected:
+            queryset = queryset.prefetch_related(lookup)
+
+    queryset = queryset.order_by("pk")
+    if params.get("after") is not None:
+        queryset = queryset.filter(pk__gt=decode_cursor(params["after"]))
+
+    next_cursor = None
+    page = list(queryset if limit is None else queryset[: limit + 1])
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].pk)
+
+    serializer = serializer_class(page, many=True)
+    if fields is not None:
+        for name in set(serializer.child.fields) - set(fields):
+            serializer.child.fields.pop(name)
+    return serializer.data, next_cursor
+
+
+def paginated_response(
+    request,
+    queryset,
+    serializer_class,
+    body: Callable[[list, Optional[str]], object] = None,
+    **kwargs,
+) -> Response:
+    """Response with one page of the objects (see paginate). The body is built from
+    the data and the next cursor, by default {status, data, next}. The next page is
+    also linked in the Link header."""
+    try:
+        data, next_cursor = paginate(request, queryset, serializer_class, **kwargs)
+    except RequestParamException as e:
+        return Response(
+            {"status": "error", "data": str(e)}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if body is None:
+        content = {"status": "success", "data": data, "next": next_cursor}
+    else:
+        content = body(data, next_cursor)
+    response = Response(content, status=status.HTTP_200_OK)
+    if next_cursor is not None:
+        params = request.query_params.copy()
+        params["after"] = next_cursor
+        response["Link"] = f'<{request.path}?{params.urlencode()}>; rel="next"'
+    return response
@@ -1,38 +1,31 @@
 import logging
+from app.cache.question_collection import get_compiled_questions
 from app.cache.scenario import CachedScenario
-
 from app.dto.response import QuestionCollectionDTO
-from app.models.answer import Answer
 from app.models.question_collection import QuestionCollection
-from app.serializers.question_collection import QuestionCollectionSerializer
-
-
-def get_question_collection(scenario):
-    question_collections = QuestionCollection.objects.get(
-        template_scenario_id=scenario.template_id,
-        index=scenario.state.component_counter,
-    )
-    serializer = QuestionCollectionSerializer(question_collections)
 
-    # sort questions in question_collection by index of question
-    data = serializer.data
-    sorted_list = sorted(
-        data.get("questions"), key=lambda x: x.get("question_index"), reverse=False
-    )
-    data.update(questions=sorted_list)
 
-    return QuestionCollectionDTO(**data)
+def get_question_collection(scenario) -> QuestionCollectionDTO:
+    """Returns the current question collection of the scenario with its questions
+    sorted by index. The collection is taken from the compiled questions of the
+    template, so no query is needed once they are compiled."""
+    collections = get_compiled_questions(scenario.template).collections
+    try:
+        return collections[scenario.state.component_counter]
+    except KeyError:
+        raise QuestionCollection.DoesNotExist(
+            f"No question collection with index {scenario.state.component_counter}"
+        )
 
 
 def handle_question_answers(req, session: CachedScenario):
-    """Adds points to the user scenario for each question answer."""
+    """Adds points to the user scenario for each question answer. Only answers of
+    the scenario's template are counted."""
     try:
+        points = get_compiled_questions(session.scenario.template).points
         for q in req.question_collection.questions:
-            selected_answers = Answer.objects.filter(
-                id__in=[a.id for a in q.answers if a.answer]
-            )
             session.scenario.question_points += sum(
-                [a.points for a in selected_answers]
+                points.get(a.id, 0) for a in q.answers if a.answer
             )
 
             if session.scenario.question_points < 0:
@@ -39,6 +39,12 @@ def create_correct_request_model(request) -> ScenarioRequest:
     Creates object of the right request model, depending on the request type.
     (If type of request is QUESTION -> will create QuestionRequest object.)
     """
+    return create_request_model(request.data)
+
+
+def create_request_model(data: dict) -> ScenarioRequest:
+    """Creates object of the right request model from the request data, depending
+    on the request type. Returns None if the type is unknown."""
     request_types = {
         "SIMULATION": SimulationRequest,
         "QUESTION": QuestionRequest,
@@ -48,8 +54,8 @@ def create_correct_request_model(request) -> ScenarioRequest:
         "EVENT": EventRequest,
     }
     for key, value in request_types.items():
-        if request.data.get("type") == key:
-            a = value(**request.data)
+        if data.get("type") == key:
+            a = value(**data)
             logging.info(a)
             return a
 
@@ -3,7 +3,7 @@ from app.models.score_card import ScoreCard
 from app.models.task import CachedTasks
 from app.models.management_goal import ManagementGoal
 from app.models.user_scenario import UserScenario
-from app.models.answer import Answer
+from app.cache.question_collection import get_compiled_questions
 
 
 def calc_scores(scenario: UserScenario, tasks: CachedTasks) -> dict:
@@ -21,19 +21,9 @@ def calc_scores(scenario: UserScenario, tasks: CachedTasks) -> dict:
         scenario.state.cost, goal.budget, score.budget_limit, score.budget_p
     )
 
-    total_positive_points = 0
-
-    template_scenario = scenario.template
-
-    if hasattr(template_scenario, 'question_collections'):
-        question_collections = template_scenario.question_collections.all()
-        for question_collection in question_collections:
-            questions = question_collection.questions.all()
-            for question in questions:
-                answers = Answer.objects.filter(question=question)
-                for answer in answers:
-                    if answer.points > 0:
-                        total_positive_points += answer.points
+    total_positive_points = sum(
+        p for p in get_compiled_questions(scenario.template).points.values() if p > 0
+    )
 
     return {
         "quality_score": quality_score,
@@ -9,7 +9,7 @@ from app.models.event import Event
 from app.models.model_selection import ModelSelection
 from app.models.question_collection import QuestionCollection
 from app.models.simulation_fragment import SimulationFragment
-from app.models.task import Task
+from app.models.task import Task, TodoPools
 from app.models.team import Member
 from app.models.user_scenario import EventStatus
 from history.models.result import Result
@@ -142,10 +142,13 @@ def end_of_simulation(session: CachedScenario) -> bool:
 class WorkpackStatus:
     remaining_trainings: int = 0
 
-    def __init__(self, days, workpack):
+    def __init__(self, days, workpack, tasks_to_do: TodoPools = None):
         self.meetings_per_day = []
         self.calculate_meetings_per_day(days, workpack)
         self.remaining_trainings = workpack.training
+        # tasks only leave the todo pools when they are solved during the step, so
+        # the pools are built once per step
+        self.tasks_to_do = tasks_to_do
 
     def calculate_meetings_per_day(self, days, workpack):
         meetings_per_day_without_modulo = math.floor(workpack.meetings / days)
@@ -157,6 +160,32 @@ class WorkpackStatus:
             else:
                 self.meetings_per_day.append(meetings_per_day_without_modulo)
 
+    def skip_ahead_window(self, session: CachedScenario, workpack, current_day, days) -> int:
+        """Returns the number of days from current_day on that can be simulated in
+        one step by Team.work_days. The window ends at the next meeting and is
+        only opened once all trainings are done and if the workpack contains no
+        unit tests or bug fixes, since those change the member state or depend on
+        tasks done on the same day. Events and fragment end conditions are only
+        evaluated between steps, so they cannot trigger inside a window.
+        Returns 1 if the day has to be simulated on its own."""
+        max_days = session.scenario.config.skip_ahead_days
+        if (
+            max_days < 2
+            or workpack.unittest
+            or workpack.bugfix
+            or self.remaining_trainings > 0
+        ):
+            return 1
+
+        window = 0
+        while (
+            window < max_days
+            and current_day + window < days
+            and self.meetings_per_day[current_day + window] == 0
+        ):
+            window += 1
+        return max(window, 1)
+
     # def set_remaining_trainings(self, remaining_trainings_today, remaining_work_hours):
     #     if remaining_trainings_today > remaining_work_hours:
     #         self.remaining_trainings = remaining_trainings_today - remaining_work_hours
@@ -0,0 +1,39 @@
+from typing import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_END = object()
+
+
+def is_asgi_request(request) -> bool:
+    """Returns True if the (Django or DRF) request is served by the ASGI
+    application. Django reads synchronous iterators of a StreamingHttpResponse
+    completely before it sends anything under ASGI, and asynchronous iterators
+    completely under WSGI, so streamed responses must match the server."""
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+async def iterate_in_thread(content: Iterable) -> AsyncIterator:
+    """Yields the chunks of a synchronous iterator, each read in the sync thread of
+    the request, so only one chunk is in memory at a time."""
+    iterator = iter(content)
+    read = sync_to_async(next)
+    try:
+        while True:
+            chunk = await read(iterator, _END)
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        # e.g. the client has gone away, the iterator cleans up in its thread
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+def streaming_content(request, content: Iterator):
+    """Returns the content of a StreamingHttpResponse that is sent chunk by chunk
+    by the server of the request (see is_asgi_request)."""
+    if is_asgi_request(request):
+        return iterate_in_thread(content)
+    return content
@@ -0,0 +1,120 @@
+import base64
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from app.exceptions import RequestParamException
+
+# Studio templates are stored as {"scenario": [components]}. Every write also stores
+# a summary of the template next to it, so listings only read small documents.
+SUMMARY_PROJECTION = {"name": 1, "updated": 1, "component_counts": 1}
+
+# sort field of the listing: default direction
+SORT_FIELDS = {"updated": DESCENDING, "name": ASCENDING}
+
+TEMPLATE_INDEXES = [
+    ([("updated", DESCENDING), ("_id", DESCENDING)], "updated_id"),
+    ([("name", ASCENDING), ("_id", ASCENDING)], "name_id"),
+]
+
+
+def template_summary(scenario: list) -> dict:
+    """Returns the summary fields of a template stored with the template."""
+    name = next(
+        (c.get("template_name") for c in scenario if c.get("type") == "BASE"), None
+    )
+    return {
+        "name": name or "",
+        "updated": datetime.now(timezone.utc),
+        "component_counts": dict(Counter(c.get("type", "") for c in scenario)),
+    }
+
+
+def template_document(scenario: list) -> dict:
+    return {"scenario": scenario, **template_summary(scenario)}
+
+
+def ensure_template_indexes(collection):
+    """Creates the indexes of the listing. Does nothing for indexes that exist."""
+    for keys, name in TEMPLATE_INDEXES:
+        collection.create_index(keys, name=name)
+
+
+def backfill_template_summaries(collection) -> int:
+    """Stores the summary of every template that was saved without one. Returns the
+    number of updated templates."""
+    updated = 0
+    for document in collection.find({"updated": {"$exists": False}}, {"scenario": 1}):
+        summary = template_summary(document.get("scenario") or [])
+        # the time of the last change is unknown, the creation time is used instead
+        summary["updated"] = document["_id"].generation_time
+        collection.update_one({"_id": document["_id"]}, {"$set": summary})
+        updated += 1
+    return updated
+
+
+def encode_cursor(value, object_id: ObjectId) -> str:
+    if isinstance(value, datetime):
+        value = {"$date": value.isoformat()}
+    raw = json.dumps({"v": value, "id": str(object_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[object, ObjectId]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = data["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["$date"])
+        return value, ObjectId(data["id"])
+    except Exception:
+        raise RequestParamException("<after>")
+
+
+def list_templates(
+    collection,
+    sort: str = "updated",
+    descending: Optional[bool] = None,
+    limit: int = 100,
+    after: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Returns one page of template summaries sorted by the given field (ties are
+    sorted by id) and the cursor of the next page, None on the last page. The page
+    after a cursor is found with the index of the sort field, however many
+    templates come before it."""
+    if sort not in SORT_FIELDS:
+        raise RequestParamException("<sort>")
+    direction = SORT_FIELDS[sort]
+    if descending is not None:
+        direction = DESCENDING if descending else ASCENDING
+
+    query = {}
+    if after is not None:
+        value, object_id = decode_cursor(after)
+        op = "$lt" if direction == DESCENDING else "$gt"
+        query = {"$or": [{sort: {op: value}}, {sort: value, "_id": {op: object_id}}]}
+
+    documents = list(
+        collection.find(query, SUMMARY_PROJECTION)
+        .sort([(sort, direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last.get(sort), last["_id"])
+
+    return [
+        {
+            "id": str(d["_id"]),
+            "name": d.get("name"),
+            "updated": d.get("updated"),
+            "component_counts": d.get("component_counts", {}),
+        }
+        for d in documents
+    ], next_cursor
@@ -1,19 +1,31 @@
 from typing import Dict
 from app.cache.scenario import CachedScenario
 from app.models.task import Task, TaskStatus
-from app.dto.response import TasksStatusDTO
 
 
-def get_tasks_status(session: CachedScenario) -> TasksStatusDTO:
-    """Returns a TaskStatusDTO for a current scenario with all data allowed to be seen
-    by team/user."""
-    return TasksStatusDTO(
-        tasks_todo=len(session.tasks.todo()),
-        tasks_done=len(session.tasks.done()),
-        tasks_unit_tested=len(session.tasks.unit_tested()),
-        tasks_integration_tested=len(session.tasks.integration_tested()),
-        tasks_bug=len(session.tasks.bug()),
-    )
+def get_tasks_status(session: CachedScenario) -> dict:
+    """Returns the tasks status (see TasksStatusDTO) for a current scenario with all
+    data allowed to be seen by team/user. All tasks are counted in a single pass."""
+    todo = done = unit_tested = integration_tested = bug = 0
+    for t in session.tasks.tasks:
+        if t.integration_tested:
+            integration_tested += 1
+        if not t.done:
+            todo += 1
+        elif t.unit_tested:
+            if t.bug:
+                bug += 1
+            elif not t.integration_tested:
+                unit_tested += 1
+        elif not t.integration_tested:
+            done += 1
+    return {
+        "tasks_todo": todo,
+        "tasks_done": done,
+        "tasks_unit_tested": unit_tested,
+        "tasks_integration_tested": integration_tested,
+        "tasks_bug": bug,
+    }
 
 
 def get_tasks_status_detailed(scenario_id: int) -> Dict[str, int]:
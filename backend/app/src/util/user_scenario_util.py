@@ -1,10 +1,19 @@
-from app.dto.response import ScenarioStateDTO
-from app.models.user_scenario import UserScenario
-from app.serializers.user_scenario import ScenarioStateSerializer
+from typing import Optional
 
+from app.models.user_scenario import ScenarioState, UserScenario
 
-def get_scenario_state_dto(scenario: UserScenario) -> ScenarioStateDTO:
-    return ScenarioStateDTO(**ScenarioStateSerializer(scenario.state).data)
+
+def get_scenario_state_dto(scenario: UserScenario) -> dict:
+    """Returns the state of the scenario as plain dict (see ScenarioStateDTO)."""
+    state = scenario.state
+    return {
+        "component_counter": state.component_counter,
+        "step_counter": state.step_counter,
+        "day": int(state.day),
+        "cost": float(state.cost),
+        "budget": state.budget,
+        "total_tasks": state.total_tasks,
+    }
 
 
 def increase_scenario_component_counter(scenario, increase_by=1):
@@ -15,3 +24,16 @@ def increase_scenario_component_counter(scenario, increase_by=1):
 def increase_scenario_step_counter(scenario, increase_by=1):
     scenario.state.step_counter = scenario.state.step_counter + increase_by
     scenario.state.save()
+
+
+def lock_scenario_state(scenario_id) -> Optional[ScenarioState]:
+    """Locks the state of the scenario until the end of the current transaction, so
+    steps of the same scenario run one after another instead of overwriting each
+    other. Must be called inside transaction.atomic before the scenario is loaded.
+    Returns None if the scenario does not exist."""
+    try:
+        return ScenarioState.objects.select_for_update().get(
+            user_scenario_id=scenario_id
+        )
+    except (ScenarioState.DoesNotExist, ValueError, TypeError):
+        return None
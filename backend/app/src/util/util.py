@@ -1,10 +1,11 @@
 import random
 
 
-def probability(p: float) -> int:
+def probability(p: float, rng=random) -> int:
     """
     Returns True with a probability of p and False with probability of 1-p.
     :param p: probability of getting True.
+    :param rng: random number generator, the global one by default.
     :return: bool
     """
-    return True if random.random() < p else False
+    return True if rng.random() < p else False
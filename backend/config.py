@@ -21,6 +21,11 @@ class Configuration(BaseSettings):
     database_port: Optional[str]
     database_user: str
     database_pass: str
+    # seconds a database connection is reused by later requests, 0 closes it at the
+    # end of each request
+    database_conn_max_age: Optional[int] = 300
+    database_conn_health_checks: Optional[bool] = True
+    database_connect_timeout: Optional[int] = 5
     mongo_name: str
     mongo_host: str = Field(..., env='MONGO_HOST')
     mongo_port: int
@@ -28,24 +33,48 @@ class Configuration(BaseSettings):
     mongo_pass: str
     server: Optional[int] = 0
     logging_level: Optional[str] = "INFO"
+    # number of processes running forecast replicas, 0 runs them in the web worker
+    forecast_workers: Optional[int] = 0
+    # number of processes running step jobs, 0 leaves them to run_step_jobs
+    step_job_workers: Optional[int] = 0
+    # seconds a worker owns a running step job, a job that is still running after
+    # its lease is run again by another worker
+    step_job_lease: Optional[int] = 300
+    # seconds the response of a step with an idempotency key is kept for retries
+    idempotency_key_ttl: Optional[int] = 86400
+    # number of threads running the async views when served through ASGI
+    async_workers: Optional[int] = 8
+    # heavy simulation requests running at once per worker (0 disables the limit)
+    # and per user, requests over the limit wait up to admission_timeout seconds
+    admission_max_requests: Optional[int] = 8
+    admission_max_user_requests: Optional[int] = 2
+    admission_max_queue: Optional[int] = 32
+    admission_timeout: Optional[float] = 2.0
+
+    # pool settings and timeouts of the MongoDB client (see app/db/mongo.py)
+    mongo_max_pool_size: Optional[int] = 50
+    mongo_min_pool_size: Optional[int] = 0
+    mongo_max_idle_time_ms: Optional[int] = 300000
+    mongo_wait_queue_timeout_ms: Optional[int] = 5000
+    mongo_connect_timeout_ms: Optional[int] = 5000
+    mongo_socket_timeout_ms: Optional[int] = 30000
+    mongo_server_selection_timeout_ms: Optional[int] = 5000
 
     def get_mongo_client(self) -> MongoClient:
-        config = Configuration()
-        client = MongoClient(
-            host=config.mongo_host,
-            port=config.mongo_port,
-            username=config.mongo_user,
-            password=config.mongo_pass)
-        return client
+        """Returns the MongoClient shared by all threads of the process."""
+        from app.db.mongo import mongo_clients
+
+        return mongo_clients.get_client()
 
     def get_mongodb(self):
-        config = Configuration()
-        client = self.get_mongo_client()
-        return client[config.mongo_name]
+        from app.db.mongo import mongo_clients
+
+        return mongo_clients.get_database()
 
     def get_mongo_db_scenario_template_collection(self):
-        mongodb = self.get_mongodb()
-        return mongodb["scenario_templates"]
+        from app.db.mongo import get_template_collection
+
+        return get_template_collection()
 
 
 def get_config() -> Configuration:
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class HistoryConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "history"
+
+    def ready(self):
+        # connects the receivers that keep the course leaderboards and statistics
+        # up to date
+        import history.util.leaderboard  # noqa: F401
+        import history.util.statistics  # noqa: F401
@@ -0,0 +1,86 @@
+# Generated by Django 4.2 on 2026-10-19 15:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from itertools import groupby
+
+
+def fill_leaderboards(apps, schema_editor):
+    """Creates the leaderboard entries of the results written so far."""
+    Result = apps.get_model("history", "Result")
+    LeaderboardEntry = apps.get_model("history", "LeaderboardEntry")
+    Course = apps.get_model("app", "Course")
+
+    courses = {}
+    for course in Course.objects.prefetch_related("users", "scenarios"):
+        for user in course.users.all():
+            for template in course.scenarios.all():
+                courses.setdefault((template.id, user.id), []).append(course.id)
+
+    rows = (
+        Result.objects.filter(
+            user_scenario__template__isnull=False, user_scenario__user__isnull=False
+        )
+        .order_by(
+            "user_scenario__template_id",
+            "user_scenario__user_id",
+            "-total_score",
+            "timestamp",
+            "id",
+        )
+        .values_list(
+            "user_scenario__template_id",
+            "user_scenario__user_id",
+            "id",
+            "total_score",
+            "timestamp",
+        )
+    )
+    entries = []
+    for key, group in groupby(rows.iterator(), key=lambda row: row[:2]):
+        group = list(group)
+        template_id, user_id, result_id, score, timestamp = group[0]
+        for course_id in [0, *courses.get(key, [])]:
+            entries.append(
+                LeaderboardEntry(
+                    template_scenario_id=template_id,
+                    course_id=course_id,
+                    user_id=user_id,
+                    best_score=score,
+                    result_id=result_id,
+                    achieved=timestamp,
+                    tries=len(group),
+                )
+            )
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_idempotencykey'),
+        ('history', '0005_result_randomness'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_scenario_id', models.PositiveIntegerField()),
+                ('course_id', models.PositiveIntegerField(default=0)),
+                ('best_score', models.PositiveSmallIntegerField(default=0)),
+                ('achieved', models.DateTimeField(blank=True, null=True)),
+                ('tries', models.PositiveIntegerField(default=0)),
+                ('result', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='history.result')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['template_scenario_id', 'course_id', '-best_score', 'achieved'], name='leaderboard_rank')],
+                'constraints': [models.UniqueConstraint(fields=('template_scenario_id', 'course_id', 'user'), name='unique_leaderboard_entry')],
+            },
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2 on 2026-10-19 15:27
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from history.util.sketch import QuantileSketch
+
+METRICS = {
+    "score": "total_score",
+    "cost": "total_cost",
+    "duration": "total_days",
+    "quality": "quality_score",
+}
+
+
+def fill_result_statistics(apps, schema_editor):
+    """Creates the statistics of the results written so far."""
+    Result = apps.get_model("history", "Result")
+    ResultStatistics = apps.get_model("history", "ResultStatistics")
+    Course = apps.get_model("app", "Course")
+
+    courses = {}
+    for course in Course.objects.prefetch_related("users", "scenarios"):
+        for user in course.users.all():
+            for template in course.scenarios.all():
+                courses.setdefault((template.id, user.id), []).append(course.id)
+
+    stats = {}
+    results = Result.objects.filter(user_scenario__template__isnull=False).values(
+        "user_scenario__template_id", "user_scenario__user_id", "timestamp", *METRICS.values()
+    )
+    for result in results.iterator():
+        template_id = result["user_scenario__template_id"]
+        day = timezone.localdate(result["timestamp"])
+        for course_id in [0, *courses.get((template_id, result["user_scenario__user_id"]), [])]:
+            entry = stats.setdefault(
+                (template_id, course_id, day),
+                [0, {metric: QuantileSketch() for metric in METRICS}],
+            )
+            entry[0] += 1
+            for metric, field in METRICS.items():
+                entry[1][metric].add(result[field])
+
+    ResultStatistics.objects.bulk_create(
+        [
+            ResultStatistics(
+                template_scenario_id=template_id,
+                course_id=course_id,
+                day=day,
+                count=count,
+                sketches={metric: s.to_dict() for metric, s in sketches.items()},
+            )
+            for (template_id, course_id, day), (count, sketches) in stats.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('history', '0006_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_scenario_id', models.PositiveIntegerField()),
+                ('course_id', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('sketches', models.JSONField(default=dict)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('template_scenario_id', 'course_id', 'day'), name='unique_result_statistics')],
+            },
+        ),
+        migrations.RunPython(fill_result_statistics, migrations.RunPython.noop),
+    ]
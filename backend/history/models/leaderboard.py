@@ -0,0 +1,42 @@
+from django.db import models
+
+from custom_user.models import User
+from history.models.result import Result
+
+# course id of the leaderboard of all users of a template scenario
+GLOBAL_BOARD = 0
+
+
+class LeaderboardEntry(models.Model):
+    """Best result of a user in a template scenario. Every user has one entry in the
+    global leaderboard of the template and one in the leaderboard of every course of
+    the user that contains the template. Entries are updated when a result is written
+    (see history/util/leaderboard.py)."""
+
+    template_scenario_id = models.PositiveIntegerField()
+    # GLOBAL_BOARD for the leaderboard of all users
+    course_id = models.PositiveIntegerField(default=GLOBAL_BOARD)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+
+    best_score = models.PositiveSmallIntegerField(default=0)
+    # result with the best score, the first one if the score was reached more than once
+    result = models.ForeignKey(
+        Result, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    achieved = models.DateTimeField(null=True, blank=True)
+    tries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["template_scenario_id", "course_id", "user"],
+                name="unique_leaderboard_entry",
+            )
+        ]
+        indexes = [
+            # top entries and ranks of one leaderboard are read from this index
+            models.Index(
+                fields=["template_scenario_id", "course_id", "-best_score", "achieved"],
+                name="leaderboard_rank",
+            )
+        ]
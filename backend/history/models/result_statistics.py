@@ -0,0 +1,36 @@
+from django.db import models
+
+from history.models.leaderboard import GLOBAL_BOARD
+
+# metric of the statistics: field of Result
+STATISTICS_METRICS = {
+    "score": "total_score",
+    "cost": "total_cost",
+    "duration": "total_days",
+    "quality": "quality_score",
+}
+
+
+class ResultStatistics(models.Model):
+    """Quantile sketches (see history/util/sketch.py) of the metrics of the results of
+    a template scenario written on one day, for all users and per course of the
+    users. The statistics of any range of days are the merged sketches of the days.
+    Updated when a result is written and rebuilt for a course when its users or
+    templates change (see history/util/statistics.py)."""
+
+    template_scenario_id = models.PositiveIntegerField()
+    # GLOBAL_BOARD for the results of all users
+    course_id = models.PositiveIntegerField(default=GLOBAL_BOARD)
+    day = models.DateField()
+
+    count = models.PositiveIntegerField(default=0)
+    # metric: sketch as dict
+    sketches = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["template_scenario_id", "course_id", "day"],
+                name="unique_result_statistics",
+            )
+        ]
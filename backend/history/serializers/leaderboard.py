@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from history.models.leaderboard import LeaderboardEntry
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="user.username", read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ["username", "best_score", "tries", "achieved", "result"]
@@ -0,0 +1,292 @@
+import csv
+import datetime
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from history.models.history import History
+from history.models.question import HistoryQuestion
+from history.models.result import Result
+
+# rows read from the database per query, the export holds one chunk in memory
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# column: type, see _arrow_type
+RESULT_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "int"),
+    ("template_scenario_id", "int"),
+    ("template_scenario_name", "str"),
+    ("user_scenario_id", "int"),
+    ("username", "str"),
+    ("total_score", "int"),
+    ("timestamp", "datetime"),
+    ("total_steps", "int"),
+    ("total_days", "int"),
+    ("total_cost", "float"),
+    ("tasks_accepted", "int"),
+    ("tasks_rejected", "int"),
+    ("tasks_todo", "int"),
+    ("tasks_done", "int"),
+    ("tasks_unit_tested", "int"),
+    ("tasks_integration_tested", "int"),
+    ("tasks_bug_discovered", "int"),
+    ("tasks_bug_undiscovered", "int"),
+    ("tasks_done_wrong_specification", "int"),
+    ("quality_score", "int"),
+    ("time_score", "int"),
+    ("budget_score", "int"),
+    ("question_score", "int"),
+    ("avg_poisson_value", "float"),
+    ("model", "str"),
+    ("time_played", "int"),
+    ("randomness", "str"),
+]
+
+HISTORY_FIELDS: List[Tuple[str, str]] = [
+    ("id", "int"),
+    ("user_scenario_id", "int"),
+    ("request_type", "str"),
+    ("response_type", "str"),
+    ("timestamp", "datetime"),
+    ("model", "str"),
+    ("component_counter", "int"),
+    ("step_counter", "int"),
+    ("day", "int"),
+    ("cost", "float"),
+    ("tasks_todo", "int"),
+    ("tasks_done", "int"),
+    ("tasks_unit_tested", "int"),
+    ("tasks_integration_tested", "int"),
+    ("tasks_bug_discovered", "int"),
+    ("tasks_bug_undiscovered", "int"),
+    ("tasks_done_wrong_specification", "int"),
+    ("question_collection_id", "int"),
+    ("bugfix", "bool"),
+    ("unittest", "bool"),
+    ("integrationtest", "bool"),
+    ("meetings", "int"),
+    ("teamevent", "int"),
+    ("salary", "int"),
+    ("overtime", "int"),
+    ("days", "int"),
+]
+
+# the members and answers of a history entry are flattened into a fixed set of
+# columns: their number, averages and the complete lists as JSON
+HISTORY_COLUMNS: List[Tuple[str, str]] = [
+    *HISTORY_FIELDS,
+    ("username", "str"),
+    ("template_scenario_id", "int"),
+    ("member_count", "int"),
+    ("avg_motivation", "float"),
+    ("avg_stress", "float"),
+    ("avg_xp", "float"),
+    ("members", "str"),
+    ("answers_selected", "int"),
+    ("answers", "str"),
+]
+
+
+def filter_exports(
+    queryset,
+    template_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
+    """Filters results or history entries by the template and the date (both
+    including, in the current time zone). With a course, only entries of users of
+    the course in templates of the course are kept."""
+    if template_id is not None:
+        queryset = queryset.filter(user_scenario__template_id=template_id)
+    if course_id is not None:
+        queryset = queryset.filter(user_scenario__user__course__id=course_id).filter(
+            user_scenario__template__course__id=course_id
+        )
+    # the days are compared as bounds of the timestamp, __date would need the time
+    # zone tables of MySQL and cannot use an index
+    if date_from is not None:
+        queryset = queryset.filter(timestamp__gte=start_of_day(date_from))
+    if date_to is not None:
+        queryset = queryset.filter(
+            timestamp__lt=start_of_day(date_to + datetime.timedelta(days=1))
+        )
+    return queryset
+
+
+def start_of_day(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def iterate_chunks(queryset, chunk_size: Optional[int] = None) -> Iterator[list]:
+    """Yields the objects of the queryset in chunks (default: EXPORT_CHUNK_SIZE)
+    ordered by id. Every chunk is read with its own query after the id of the
+    previous chunk, so only one chunk is in memory, also with database drivers that
+    fetch whole results (MySQL)."""
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    last = None
+    while True:
+        chunk = queryset.order_by("pk")
+        if last is not None:
+            chunk = chunk.filter(pk__gt=last)
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1].pk
+
+
+def result_rows(results) -> Iterator[list]:
+    columns = [name for name, _ in RESULT_COLUMNS]
+    for chunk in iterate_chunks(results.only(*columns)):
+        yield [[getattr(r, c) for c in columns] for r in chunk]
+
+
+def _average(values: list) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+def history_rows(history) -> Iterator[list]:
+    history = history.select_related("user_scenario__user").prefetch_related(
+        "members",
+        Prefetch("questions", queryset=HistoryQuestion.objects.prefetch_related("answers")),
+    )
+    for chunk in iterate_chunks(history):
+        rows = []
+        for h in chunk:
+            members = list(h.members.all())
+            answers = [
+                {
+                    "question": q.question_id,
+                    "answer": a.answer_id,
+                    "selected": a.answer_selection,
+                }
+                for q in h.questions.all()
+                for a in q.answers.all()
+            ]
+            user = h.user_scenario.user
+            rows.append(
+                [getattr(h, name) for name, _ in HISTORY_FIELDS]
+                + [
+                    user.username if user else None,
+                    h.user_scenario.template_id,
+                    len(members),
+                    _average([m.motivation for m in members]),
+                    _average([m.stress for m in members]),
+                    _average([m.xp for m in members]),
+                    json.dumps(
+                        [
+                            {
+                                "member": m.member_id,
+                                "skill_type": m.skill_type_name,
+                                "motivation": m.motivation,
+                                "stress": m.stress,
+                                "xp": m.xp,
+                            }
+                            for m in members
+                        ]
+                    ),
+                    sum(a["selected"] for a in answers),
+                    json.dumps(answers),
+                ]
+            )
+        yield rows
+
+
+class _Echo:
+    """File-like object that returns what is written instead of keeping it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(columns: List[Tuple[str, str]], chunks: Iterable[list]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in columns])
+    for rows in chunks:
+        yield "".join(writer.writerow(row) for row in rows)
+
+
+class _Sink:
+    """Write-only file that keeps what is written until it is taken."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def _arrow_type(pa, name: str):
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "str": pa.string(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }[name]
+
+
+def stream_parquet(columns: List[Tuple[str, str]], chunks: Iterable[list]) -> Iterator[bytes]:
+    """Writes every chunk as a row group of a Parquet file and yields the bytes of the
+    file as they are written."""
+    # pyarrow is only needed for Parquet exports, it is imported on first use
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, _arrow_type(pa, t)) for name, t in columns])
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks:
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array([row[i] for row in rows], type=schema.field(i).type)
+                        for i in range(len(columns))
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.take()
+    yield sink.take()
+
+
+STREAMS = {"csv": stream_csv, "parquet": stream_parquet}
+
+
+def export_results(file_format: str, **filters) -> Iterator:
+    """Returns the chunks of the export file of the filtered results."""
+    rows = result_rows(filter_exports(Result.objects.all(), **filters))
+    return STREAMS[file_format](RESULT_COLUMNS, rows)
+
+
+def export_history(file_format: str, **filters) -> Iterator:
+    """Returns the chunks of the export file of the filtered history entries."""
+    rows = history_rows(filter_exports(History.objects.all(), **filters))
+    return STREAMS[file_format](HISTORY_COLUMNS, rows)
@@ -0,0 +1,217 @@
+import logging
+from itertools import groupby
+from typing import Iterable, List, Optional, Tuple
+
+from django.db.models import F, Q
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from app.models.course import Course
+from app.models.template_scenario import TemplateScenario
+from history.models.leaderboard import GLOBAL_BOARD, LeaderboardEntry
+from history.models.result import Result
+
+
+def get_boards(user_id: int, template_id: int) -> List[int]:
+    """Returns the leaderboards a result of the user in the template counts for."""
+    return [
+        GLOBAL_BOARD,
+        *Course.objects.filter(users=user_id, scenarios=template_id).values_list(
+            "id", flat=True
+        ),
+    ]
+
+
+def update_leaderboards(result: Result):
+    """Adds a new result to the leaderboards of its template. Every query changes the
+    entries of one user with a single statement and the best score only increases,
+    so results can be written concurrently, also by the same user."""
+    template_id = result.user_scenario.template_id
+    user_id = result.user_scenario.user_id
+    if template_id is None or user_id is None:
+        return
+
+    boards = get_boards(user_id, template_id)
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                template_scenario_id=template_id, course_id=board, user_id=user_id
+            )
+            for board in boards
+        ],
+        ignore_conflicts=True,
+    )
+    entries = LeaderboardEntry.objects.filter(
+        template_scenario_id=template_id, user_id=user_id, course_id__in=boards
+    )
+    entries.update(tries=F("tries") + 1)
+    entries.filter(
+        Q(best_score__lt=result.total_score) | Q(achieved__isnull=True)
+    ).update(best_score=result.total_score, result=result, achieved=result.timestamp)
+    logging.info(f"Updated {len(boards)} leaderboards with result {result.id}")
+
+
+def best_results(results) -> Iterable[Tuple[int, int, int, int, object, int]]:
+    """Yields (template id, user id, result id, score, timestamp, tries) of the best
+    result of every user in every template of the given results."""
+    rows = (
+        results.filter(
+            user_scenario__template__isnull=False, user_scenario__user__isnull=False
+        )
+        .order_by(
+            "user_scenario__template_id",
+            "user_scenario__user_id",
+            "-total_score",
+            "timestamp",
+            "id",
+        )
+        .values_list(
+            "user_scenario__template_id",
+            "user_scenario__user_id",
+            "id",
+            "total_score",
+            "timestamp",
+        )
+    )
+    for _, group in groupby(rows.iterator(), key=lambda row: row[:2]):
+        group = list(group)
+        yield (*group[0], len(group))
+
+
+def add_course_entries(course_id: int, user_ids=None, template_ids=None) -> int:
+    """Creates the course leaderboard entries of the given users (default: all users
+    of the course) in the given templates (default: all templates of the course)
+    from their results. Returns the number of entries."""
+    if user_ids is None:
+        user_ids = Course.users.through.objects.filter(course_id=course_id).values(
+            "user_id"
+        )
+    if template_ids is None:
+        template_ids = Course.scenarios.through.objects.filter(
+            course_id=course_id
+        ).values("templatescenario_id")
+    entries = [
+        LeaderboardEntry(
+            template_scenario_id=template_id,
+            course_id=course_id,
+            user_id=user_id,
+            best_score=score,
+            result_id=result_id,
+            achieved=timestamp,
+            tries=tries,
+        )
+        for template_id, user_id, result_id, score, timestamp, tries in best_results(
+            Result.objects.filter(
+                user_scenario__user_id__in=user_ids,
+                user_scenario__template_id__in=template_ids,
+            )
+        )
+    ]
+    # entries written by a concurrent result are up to date already
+    LeaderboardEntry.objects.bulk_create(entries, ignore_conflicts=True, batch_size=500)
+    return len(entries)
+
+
+def remove_course_entries(course_id: int, user_ids=None, template_ids=None):
+    entries = LeaderboardEntry.objects.filter(course_id=course_id)
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    if template_ids is not None:
+        entries = entries.filter(template_scenario_id__in=template_ids)
+    entries.delete()
+
+
+def get_leaderboard(
+    template_id: int, course_id: int = GLOBAL_BOARD, limit: int = 10
+) -> List[Tuple[int, LeaderboardEntry]]:
+    """Returns the top entries of a leaderboard with their rank. Users with the same
+    score share a rank and are sorted by who reached it first."""
+    entries = (
+        LeaderboardEntry.objects.filter(
+            template_scenario_id=template_id, course_id=course_id
+        )
+        .select_related("user")
+        .order_by("-best_score", "achieved", "id")[:limit]
+    )
+    ranked = []
+    for i, entry in enumerate(entries):
+        if ranked and ranked[-1][1].best_score == entry.best_score:
+            ranked.append((ranked[-1][0], entry))
+        else:
+            ranked.append((i + 1, entry))
+    return ranked
+
+
+def get_rank(
+    template_id: int, user_id: int, course_id: int = GLOBAL_BOARD
+) -> Optional[Tuple[int, LeaderboardEntry]]:
+    """Returns the rank and the entry of a user, None if the user has no result. The
+    rank is counted on the index of the leaderboard, so it reads every entry with a
+    better score (O(rank), not O(log n))."""
+    board = LeaderboardEntry.objects.filter(
+        template_scenario_id=template_id, course_id=course_id
+    )
+    entry = board.filter(user_id=user_id).select_related("user").first()
+    if entry is None:
+        return None
+    return board.filter(best_score__gt=entry.best_score).count() + 1, entry
+
+
+def count_entries(template_id: int, course_id: int = GLOBAL_BOARD) -> int:
+    return LeaderboardEntry.objects.filter(
+        template_scenario_id=template_id, course_id=course_id
+    ).count()
+
+
+# The course leaderboards follow the users and scenarios of the course.
+
+
+def _course_changes(instance, reverse: bool, pk_set) -> List[Tuple[int, list]]:
+    """Returns (course id, changed ids) of an m2m change of Course."""
+    if reverse:
+        return [(course_id, [instance.pk]) for course_id in pk_set]
+    return [(instance.pk, list(pk_set))]
+
+
+@receiver(m2m_changed, sender=Course.users.through)
+def course_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        for course_id, user_ids in _course_changes(instance, reverse, pk_set):
+            add_course_entries(course_id, user_ids=user_ids)
+    elif action == "post_remove":
+        for course_id, user_ids in _course_changes(instance, reverse, pk_set):
+            remove_course_entries(course_id, user_ids=user_ids)
+    elif action == "pre_clear":
+        if reverse:
+            LeaderboardEntry.objects.filter(user_id=instance.pk).exclude(
+                course_id=GLOBAL_BOARD
+            ).delete()
+        else:
+            remove_course_entries(instance.pk)
+
+
+@receiver(m2m_changed, sender=Course.scenarios.through)
+def course_scenarios_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        for course_id, template_ids in _course_changes(instance, reverse, pk_set):
+            add_course_entries(course_id, template_ids=template_ids)
+    elif action == "post_remove":
+        for course_id, template_ids in _course_changes(instance, reverse, pk_set):
+            remove_course_entries(course_id, template_ids=template_ids)
+    elif action == "pre_clear":
+        if reverse:
+            LeaderboardEntry.objects.filter(template_scenario_id=instance.pk).exclude(
+                course_id=GLOBAL_BOARD
+            ).delete()
+        else:
+            remove_course_entries(instance.pk)
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    remove_course_entries(instance.id)
+
+
+@receiver(post_delete, sender=TemplateScenario)
+def template_deleted(sender, instance, **kwargs):
+    LeaderboardEntry.objects.filter(template_scenario_id=instance.id).delete()
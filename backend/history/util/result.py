@@ -2,6 +2,7 @@ import logging
 import math
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from rest_framework.response import Response
 from app.cache.scenario import CachedScenario
 
@@ -19,6 +20,8 @@ from app.src.util.task_util import (
 )
 from app.src.util.user_scenario_util import get_scenario_state_dto
 from history.models.result import Result
+from history.util.leaderboard import update_leaderboards
+from history.util.statistics import update_result_statistics
 
 from datetime import datetime, timezone
 
@@ -86,6 +89,17 @@ def write_result_entry(scenario: UserScenario):
         randomness=scenario.config.randomness,
     )
     logging.info(f"Created result entry for scenario {scenario.id}")
+    for update in (update_leaderboards, update_result_statistics):
+        try:
+            # a savepoint, so that a failed update does not break the transaction
+            # of the step that writes the result
+            with transaction.atomic():
+                update(result)
+        except Exception as e:
+            # the result is written, the aggregates can be rebuilt from it
+            logging.error(
+                f"{e.__class__.__name__} occurred in {update.__name__} with result {result.id}: {e}"
+            )
     return result
 
 
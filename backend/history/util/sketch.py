@@ -0,0 +1,130 @@
+import math
+from typing import Dict, List, Optional
+
+# maximal relative error of the quantiles of a sketch
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """Streaming quantile sketch with logarithmic buckets (DDSketch). Every value is
+    counted in the bucket of its logarithm, so each quantile is returned with a
+    relative error of at most the relative accuracy. The size of a sketch depends on
+    the range of the values, not on their number, and two sketches are merged by
+    adding up their buckets. Values are expected to be positive, negative values are
+    counted as 0."""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Relative accuracy {relative_accuracy} is not in (0, 1).")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # the value with the same relative distance to both bounds of the bucket
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        value = max(float(value), 0.0)
+        if value == 0:
+            self.zero_count += count
+        else:
+            key = self._key(value)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches with different relative accuracy cannot be merged.")
+        if not other.count:
+            return
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def _values(self):
+        """Yields (representative value, count) in increasing order."""
+        if self.zero_count:
+            yield 0.0, self.zero_count
+        for key in sorted(self.buckets):
+            yield min(max(self._value(key), self.min), self.max), self.buckets[key]
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile {q} is not in [0, 1].")
+        if not self.count:
+            return None
+        # the extremes are known exactly
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, n in self._values():
+            seen += n
+            if seen > rank:
+                return value
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def histogram(self, bins: int = 10) -> List[dict]:
+        """Returns the counts of equal width bins between the minimum and the
+        maximum. Each bucket of the sketch is counted in the bin of its value."""
+        if not self.count:
+            return []
+        width = (self.max - self.min) / bins
+        counts = [0] * bins
+        for value, n in self._values():
+            i = int((value - self.min) / width) if width else 0
+            counts[min(max(i, 0), bins - 1)] += n
+        return [
+            {
+                "lower": self.min + i * width,
+                "upper": self.min + (i + 1) * width if i < bins - 1 else self.max,
+                "count": n,
+            }
+            for i, n in enumerate(counts)
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "accuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "zero": self.zero_count,
+            # JSON object keys are strings
+            "buckets": {str(key): n for key, n in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data.get("accuracy", DEFAULT_RELATIVE_ACCURACY))
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        sketch.zero_count = data.get("zero", 0)
+        sketch.buckets = {int(key): n for key, n in data.get("buckets", {}).items()}
+        return sketch
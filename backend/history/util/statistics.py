@@ -0,0 +1,259 @@
+import datetime
+import logging
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from app.models.course import Course
+from app.models.template_scenario import TemplateScenario
+from history.models.leaderboard import GLOBAL_BOARD
+from history.models.result import Result
+from history.models.result_statistics import STATISTICS_METRICS, ResultStatistics
+from history.util.leaderboard import get_boards
+from history.util.sketch import QuantileSketch
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95, 99)
+
+
+def update_result_statistics(result: Result):
+    """Adds a new result to the statistics of its template and day, for all users and
+    for every course of the user that contains the template. The rows are locked
+    while their sketches are changed, concurrent results wait for each other."""
+    template_id = result.user_scenario.template_id
+    user_id = result.user_scenario.user_id
+    if template_id is None:
+        return
+    boards = get_boards(user_id, template_id) if user_id is not None else [GLOBAL_BOARD]
+    day = timezone.localdate(result.timestamp)
+
+    with transaction.atomic():
+        ResultStatistics.objects.bulk_create(
+            [
+                ResultStatistics(template_scenario_id=template_id, course_id=board, day=day)
+                for board in boards
+            ],
+            ignore_conflicts=True,
+        )
+        rows = ResultStatistics.objects.select_for_update().filter(
+            template_scenario_id=template_id, course_id__in=boards, day=day
+        )
+        for row in rows:
+            for metric, field in STATISTICS_METRICS.items():
+                sketch = (
+                    QuantileSketch.from_dict(row.sketches[metric])
+                    if metric in row.sketches
+                    else QuantileSketch()
+                )
+                sketch.add(getattr(result, field))
+                row.sketches[metric] = sketch.to_dict()
+            row.count += 1
+        ResultStatistics.objects.bulk_update(rows, ["count", "sketches"])
+    logging.info(f"Updated {len(boards)} result statistics with result {result.id}")
+
+
+def _course_statistics(
+    course_id: int, users=None, template_ids=None
+) -> Dict[tuple, ResultStatistics]:
+    """Returns the unsaved statistics of a course by (template, day), computed from
+    the results of the given users (default: all users of the course) in the given
+    templates (default: all templates of the course)."""
+    if users is None:
+        users = Course.users.through.objects.filter(course_id=course_id).values("user_id")
+    templates = Course.scenarios.through.objects.filter(course_id=course_id).values(
+        "templatescenario_id"
+    )
+    if template_ids is not None:
+        templates = templates.filter(templatescenario_id__in=template_ids)
+    results = Result.objects.filter(
+        user_scenario__user_id__in=users, user_scenario__template_id__in=templates
+    ).values_list("user_scenario__template_id", "timestamp", *STATISTICS_METRICS.values())
+
+    rows: Dict[tuple, ResultStatistics] = {}
+    sketches: Dict[tuple, Dict[str, QuantileSketch]] = {}
+    for template_id, timestamp, *values in results.iterator():
+        key = (template_id, timezone.localdate(timestamp))
+        if key not in rows:
+            rows[key] = ResultStatistics(
+                template_scenario_id=template_id, course_id=course_id, day=key[1]
+            )
+            sketches[key] = {metric: QuantileSketch() for metric in STATISTICS_METRICS}
+        rows[key].count += 1
+        for metric, value in zip(STATISTICS_METRICS, values):
+            sketches[key][metric].add(value)
+    for key, row in rows.items():
+        row.sketches = {metric: s.to_dict() for metric, s in sketches[key].items()}
+    return rows
+
+
+def rebuild_course_statistics(course_id: int, template_ids=None) -> int:
+    """Computes the statistics of a course (in the given templates, default: all
+    templates of the course) again from the results of the users of the course.
+    Sketches cannot be subtracted, so the statistics of a course are rebuilt when
+    users are removed or templates change. Returns the number of rows."""
+    rows = _course_statistics(course_id, template_ids=template_ids)
+    with transaction.atomic():
+        remove_course_statistics(course_id, template_ids)
+        ResultStatistics.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def add_course_users(course_id: int, user_ids) -> int:
+    """Merges the results of users that were added to a course into the statistics
+    of the course, only the results of the new users are read. The rows are locked
+    like in update_result_statistics. Returns the number of changed rows."""
+    added = _course_statistics(course_id, users=list(user_ids))
+    if not added:
+        return 0
+
+    with transaction.atomic():
+        ResultStatistics.objects.bulk_create(
+            [
+                ResultStatistics(template_scenario_id=template_id, course_id=course_id, day=day)
+                for template_id, day in added
+            ],
+            ignore_conflicts=True,
+        )
+        rows = [
+            row
+            for row in ResultStatistics.objects.select_for_update().filter(
+                course_id=course_id,
+                template_scenario_id__in={template_id for template_id, _ in added},
+                day__in={day for _, day in added},
+            )
+            if (row.template_scenario_id, row.day) in added
+        ]
+        for row in rows:
+            new = added[(row.template_scenario_id, row.day)]
+            for metric in STATISTICS_METRICS:
+                sketch = (
+                    QuantileSketch.from_dict(row.sketches[metric])
+                    if metric in row.sketches
+                    else QuantileSketch()
+                )
+                sketch.merge(QuantileSketch.from_dict(new.sketches[metric]))
+                row.sketches[metric] = sketch.to_dict()
+            row.count += new.count
+        ResultStatistics.objects.bulk_update(rows, ["count", "sketches"])
+    return len(rows)
+
+
+def remove_course_statistics(course_id: int, template_ids=None):
+    rows = ResultStatistics.objects.filter(course_id=course_id)
+    if template_ids is not None:
+        rows = rows.filter(template_scenario_id__in=template_ids)
+    rows.delete()
+
+
+def get_sketches(
+    template_id: int,
+    course_id: int = GLOBAL_BOARD,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Dict[str, QuantileSketch]:
+    """Returns the merged sketches of the days in the range (both including)."""
+    rows = ResultStatistics.objects.filter(
+        template_scenario_id=template_id, course_id=course_id
+    )
+    if date_from is not None:
+        rows = rows.filter(day__gte=date_from)
+    if date_to is not None:
+        rows = rows.filter(day__lte=date_to)
+
+    sketches = {metric: QuantileSketch() for metric in STATISTICS_METRICS}
+    for data in rows.values_list("sketches", flat=True):
+        for metric, sketch in data.items():
+            if metric in sketches:
+                sketches[metric].merge(QuantileSketch.from_dict(sketch))
+    return sketches
+
+
+def summarize(sketch: QuantileSketch, bins: int = 10) -> dict:
+    return {
+        "count": sketch.count,
+        "mean": sketch.mean,
+        "min": sketch.min,
+        "max": sketch.max,
+        "percentiles": {f"p{p}": sketch.quantile(p / 100) for p in PERCENTILES},
+        "histogram": sketch.histogram(bins),
+    }
+
+
+def get_result_statistics(
+    template_id: int,
+    course_id: int = GLOBAL_BOARD,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    bins: int = 10,
+) -> dict:
+    """Returns the distribution of every metric of the results of a template. Reads
+    one row per day of the range, however many results there are."""
+    sketches = get_sketches(template_id, course_id, date_from, date_to)
+    return {metric: summarize(sketch, bins) for metric, sketch in sketches.items()}
+
+
+# The course statistics follow the users and scenarios of the course, like the
+# course leaderboards (see history/util/leaderboard.py).
+
+
+def _changed_courses(instance, reverse: bool, pk_set) -> list:
+    return list(pk_set) if reverse else [instance.pk]
+
+
+@receiver(m2m_changed, sender=Course.users.through)
+def course_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        # pk_set only holds the users or courses that were not related before
+        if reverse:
+            for course_id in pk_set:
+                add_course_users(course_id, [instance.pk])
+        else:
+            add_course_users(instance.pk, pk_set)
+    elif action == "post_remove":
+        for course_id in _changed_courses(instance, reverse, pk_set):
+            rebuild_course_statistics(course_id)
+    elif action == "pre_clear":
+        # the courses of a user are only known before they are cleared
+        instance._statistics_courses = (
+            list(instance.course_set.values_list("id", flat=True))
+            if reverse
+            else [instance.pk]
+        )
+    elif action == "post_clear":
+        for course_id in getattr(instance, "_statistics_courses", []):
+            rebuild_course_statistics(course_id)
+
+
+@receiver(m2m_changed, sender=Course.scenarios.through)
+def course_scenarios_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_add":
+        if reverse:
+            for course_id in pk_set:
+                rebuild_course_statistics(course_id, template_ids=[instance.pk])
+        else:
+            rebuild_course_statistics(instance.pk, template_ids=list(pk_set))
+    elif action == "post_remove":
+        if reverse:
+            for course_id in pk_set:
+                remove_course_statistics(course_id, template_ids=[instance.pk])
+        else:
+            remove_course_statistics(instance.pk, template_ids=list(pk_set))
+    elif action == "pre_clear":
+        if reverse:
+            ResultStatistics.objects.filter(template_scenario_id=instance.pk).exclude(
+                course_id=GLOBAL_BOARD
+            ).delete()
+        else:
+            remove_course_statistics(instance.pk)
+
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    remove_course_statistics(instance.id)
+
+
+@receiver(post_delete, sender=TemplateScenario)
+def template_deleted(sender, instance, **kwargs):
+    ResultStatistics.objects.filter(template_scenario_id=instance.id).delete()
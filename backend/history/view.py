@@ -3,18 +3,27 @@ import logging
 
 from django.core.exceptions import ObjectDoesNotExist
 from app.exceptions import RequestParamException
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from app.decorators.decorators import allowed_roles
+from app.decorators.decorators import allowed_roles, has_access_to_scenario
+from app.src.util.pagination_util import paginated_response
+from app.src.util.streaming_util import streaming_content
+from app.models.course import Course
 from app.models.user_scenario import UserScenario
 
 from history.models.result import Result
 from history.serializers.history import HistorySerializer
 from history.models.history import History
 from history.serializers.result import ResultSerializer
+from history.serializers.leaderboard import LeaderboardEntrySerializer
+from history.models.leaderboard import GLOBAL_BOARD
+from history.util.leaderboard import count_entries, get_leaderboard, get_rank
+from history.util.export import EXPORT_FORMATS, export_history, export_results
+from history.util.statistics import get_result_statistics
 from app.models.template_scenario import TemplateScenario
 
 import datetime
@@ -111,8 +120,6 @@ class ResultsView(APIView):
             if template_id < 1:
                 raise ObjectDoesNotExist()
 
-            results: Result = []
-
             if date_str is None:
                 results = fetch_results_by_scenario_id(template_id)
             else:
@@ -120,11 +127,7 @@ class ResultsView(APIView):
                 results = fetch_results_by_scenario_id_and_date(
                     template_id, date_str)
 
-            data = ResultSerializer(results, many=True).data
-
-            return Response(
-                data={"status": "success", "data": data}, status=status.HTTP_200_OK,
-            )
+            return paginated_response(request, results, ResultSerializer)
         except RequestParamException as e:
             msg = f"Date {date_str} is not valid. Only ISO date format is accepted, eg. {datetime.date.today().isoformat()}"
             return Response(
@@ -145,18 +148,188 @@ class ResultsView(APIView):
             )
 
 
-def is_date_valid(date_str: str):
+class ResultStatisticsView(APIView):
+    permission_classes = (IsAuthenticated,)
+    max_bins = 100
+
+    @allowed_roles(["staff"])
+    def get(self, request):
+        """
+        Get the distribution (mean, percentiles, histogram) of the score, cost,
+        duration and quality of the results of a template scenario. Optional query
+        parameters: <from> and <to> (ISO dates), <course> and <bins>.
+        """
+        params = request.query_params
+        try:
+            template_id = int(params.get("template_scenario_id"))
+            course_id = int(params.get("course", GLOBAL_BOARD))
+            bins = int(params.get("bins", 10))
+            if template_id < 1 or course_id < 0 or not 0 < bins <= self.max_bins:
+                raise ValueError()
+            date_from = parse_date(params.get("from"), "from")
+            date_to = parse_date(params.get("to"), "to")
+        except (TypeError, ValueError):
+            msg = f"Query parameters <template_scenario_id>, <course> and <bins> (at most {self.max_bins}) must be positive numbers"
+            return Response(
+                data={"status": "error", "data": msg},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except RequestParamException as e:
+            return Response(
+                data={"status": "error", "data": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = get_result_statistics(template_id, course_id, date_from, date_to, bins)
+        return Response(
+            data={"status": "success", "data": data}, status=status.HTTP_200_OK,
+        )
+
+
+class ExportView(APIView):
+    """
+    Streams an export file of the entries, read from the database in chunks. Query
+    parameters: <filetype> (csv or parquet, default csv) and the optional filters
+    <template_scenario_id>, <course>, <from> and <to> (ISO dates).
+    """
+
+    permission_classes = (IsAuthenticated,)
+    name = None
+    export = None
+
+    @allowed_roles(["admin"])
+    def get(self, request):
+        params = request.query_params
+        file_format = params.get("filetype", "csv")
+        try:
+            if file_format not in EXPORT_FORMATS:
+                raise RequestParamException("<filetype>")
+            filters = dict(
+                template_id=parse_id(params.get("template_scenario_id"), "<template_scenario_id>"),
+                course_id=parse_id(params.get("course"), "<course>"),
+                date_from=parse_date(params.get("from"), "from"),
+                date_to=parse_date(params.get("to"), "to"),
+            )
+        except RequestParamException as e:
+            return Response(
+                data={"status": "error", "data": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        content_type, extension = EXPORT_FORMATS[file_format]
+        response = StreamingHttpResponse(
+            streaming_content(request, self.export(file_format, **filters)),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.name}-{datetime.date.today().isoformat()}.{extension}"'
+        )
+        return response
+
+
+class ResultExportView(ExportView):
+    name = "results"
+    export = staticmethod(export_results)
+
+
+class HistoryExportView(ExportView):
+    name = "history"
+    export = staticmethod(export_history)
+
+
+class LeaderboardView(APIView):
+    permission_classes = (IsAuthenticated,)
+    max_limit = 100
+
+    @allowed_roles(["all"])
+    @has_access_to_scenario("template_id", False)
+    def get(self, request, template_id: int):
+        """
+        Get the top entries of the leaderboard of a template scenario and the rank of
+        the user. With the query parameter <course> the leaderboard of the course is
+        returned. Students can only see the leaderboards of their courses.
+        """
+        user = request.user
+        try:
+            course_id = int(request.query_params.get("course", GLOBAL_BOARD))
+            limit = int(request.query_params.get("limit", 10))
+            if course_id < 0:
+                raise RequestParamException("<course>")
+            if not 0 < limit <= self.max_limit:
+                raise RequestParamException("<limit>")
+        except (ValueError, RequestParamException):
+            return Response(
+                data={
+                    "status": "error",
+                    "data": f"Query parameter <course> must be a course id and <limit> between 1 and {self.max_limit}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not (user.admin or user.staff or user.creator):
+            if (
+                course_id == GLOBAL_BOARD
+                or not Course.objects.filter(
+                    id=course_id, users=user, scenarios=template_id
+                ).exists()
+            ):
+                msg = f"User {user.username} is not allowed to access leaderboard {template_id} of course {course_id}"
+                logging.info(msg)
+                return Response(
+                    dict(status="error", data=msg), status=status.HTTP_403_FORBIDDEN
+                )
+
+        entries = [
+            {"rank": rank, **LeaderboardEntrySerializer(entry).data}
+            for rank, entry in get_leaderboard(template_id, course_id, limit)
+        ]
+        me = get_rank(template_id, user.id, course_id)
+        return Response(
+            data={
+                "status": "success",
+                "data": {
+                    "entries": entries,
+                    "me": {"rank": me[0], **LeaderboardEntrySerializer(me[1]).data}
+                    if me
+                    else None,
+                    "total": count_entries(template_id, course_id),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+def is_date_valid(date_str: str, name: str = "from"):
     try:
         datetime.date.fromisoformat(date_str)
     except:
-        raise RequestParamException('from')
+        raise RequestParamException(name)
+
+
+def parse_id(value: str, name: str):
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        raise RequestParamException(name)
+    if value < 1:
+        raise RequestParamException(name)
+    return value
+
+
+def parse_date(date_str: str, name: str):
+    if date_str is None:
+        return None
+    is_date_valid(date_str, name)
+    return datetime.date.fromisoformat(date_str)
 
 
 def fetch_results_by_scenario_id_and_date(scenario_id: int, date_str: str):
 
     # cant make result in the future
     if datetime.date.fromisoformat(date_str) > datetime.date.today():
-        return []
+        return Result.objects.none()
 
     return Result.objects.filter(
         template_scenario_id=scenario_id).filter(timestamp__gte=date_str)
@@ -12,10 +12,12 @@ from app.models.user_scenario import ScenarioState, UserScenario
 from app.src.simulation import simulate
 from app.dto.request import SimulationRequest, Workpack
 from simulation_framework.wrappers import FastSecenario, FastTasks
+from simulation_framework.ensemble import EnsembleParameters, EnsembleSimulation
 from userparameter.set1 import USERPARAMETERS
 
 from io import StringIO
 import boto3
+from django.db import close_old_connections
 
 bucket = "softdsim"
 
@@ -24,6 +26,8 @@ DATAPATH = "~/data"
 RUNNAME = "run1"
 NRUNS = 1_000_000
 SAVE_EVERY = 10_000
+# Number of runs simulated in lock-step, set to 0 to simulate one run at a time
+REPLICAS = 1_000
 
 Team.objects.create()
 
@@ -87,8 +91,16 @@ def set_skill_types(skill_types: List[SkillType]):
     skill_types[2].error_rate = round(random() * 0.25, 2)
 
 
+TOTAL_TASKS = 200
+TASK_DIFFICULTIES = (
+    [1] * int(TOTAL_TASKS * 0.25)
+    + [2] * int(TOTAL_TASKS * 0.5)
+    + [3] * int(TOTAL_TASKS * 0.25)
+)
+
+
 def set_tasks(u):
-    TOTAL = 200
+    TOTAL = TOTAL_TASKS
     tasks = set()
     for _ in range(int(TOTAL * 0.25)):
         tasks.add(Task(id=randint(0, 9999999999), difficulty=1, user_scenario=u))
@@ -142,15 +154,52 @@ def np_record(
     )
 
 
+def np_ensemble_record(
+    ensemble: EnsembleSimulation, workpack: Workpack, UP_n,
+) -> np.array:
+    """Returns the np_record rows of all replicas of an ensemble."""
+    p = ensemble.params
+    n = p.replicas
+    return np.column_stack(
+        [
+            p.stress_weekend_reduction,
+            p.stress_overtime_increase,
+            p.stress_error_increase,
+            p.done_tasks_per_meeting,
+            p.train_skill_increase_rate,
+            p.throughput[:, 0],
+            p.error_rate[:, 0],
+            p.throughput[:, 1],
+            p.error_rate[:, 1],
+            p.throughput[:, 2],
+            p.error_rate[:, 2],
+            np.full(n, UP_n),
+            np.full(n, workpack.days),
+            np.full(n, workpack.bugfix),
+            np.full(n, workpack.unittest),
+            np.full(n, workpack.integrationtest),
+            np.full(n, workpack.meetings),
+            np.full(n, workpack.training),
+            np.full(n, workpack.teamevent),
+            np.full(n, workpack.salary),
+            np.full(n, workpack.overtime),
+            ensemble.np_records(),
+        ]
+    )
+
+
 class NpRecord:
     def __init__(self):
         self.data = None
 
     def add(self, s: FastSecenario, *args):
+        self.add_rows(np.array([np_record(s, *args)]))
+
+    def add_rows(self, rows: np.array):
         if self.data is None:
-            self.data = np.array([np_record(s, *args)])
+            self.data = rows
         else:
-            self.data = np.vstack((self.data, np.array([np_record(s, *args)])))
+            self.data = np.vstack((self.data, rows))
 
     def clear(self):
         self.data = None
@@ -207,6 +256,53 @@ def set_scenario(scenario: UserScenario, state: ScenarioState):
     state.day = 0
 
 
+def save(rec: NpRecord, x: int):
+    print(f"{x} of {NRUNS}")
+    csv_buffer = StringIO()
+    rec.df().to_csv(csv_buffer)
+    s3_resource = boto3.resource("s3")
+    s3_resource.Object(
+        bucket, f"ID{randint(10000000,99999999)}file{int(x / SAVE_EVERY)}.csv"
+    ).put(Body=csv_buffer.getvalue())
+    rec.clear()
+    # the script runs for days, replace the connection if it is too old or broken
+    close_old_connections()
+
+
+def ensemble_parameters(replicas: int) -> EnsembleParameters:
+    """Draws a config and skill types for every replica, like set_config and
+    set_skill_types do for a single run."""
+    configs = []
+    skill_types = []
+    for _ in range(replicas):
+        config = ScenarioConfig(name="c1")
+        set_config(config)
+        configs.append(config)
+        sks = [
+            SkillType(name="s1", cost_per_day=200),
+            SkillType(name="s2", cost_per_day=350),
+            SkillType(name="s3", cost_per_day=500),
+        ]
+        set_skill_types(sks)
+        skill_types.append(sks)
+    return EnsembleParameters.from_models(configs, skill_types, TASK_DIFFICULTIES)
+
+
+def main_ensemble():
+    print("Started ensemble")
+    rec = NpRecord()
+    for x in range(REPLICAS, NRUNS + 1, REPLICAS):
+        params = ensemble_parameters(REPLICAS)
+        for n, UP in enumerate(USERPARAMETERS):
+            # same member defaults as set_members
+            ensemble = EnsembleSimulation(params, stress=0.15)
+            ensemble.simulate(UP)
+            rec.add_rows(np_ensemble_record(ensemble, UP, n))
+
+        if x % SAVE_EVERY < REPLICAS:
+            save(rec, x)
+
+
 def main():
     print("Started")
     rec = NpRecord()
@@ -227,14 +323,10 @@ def main():
             # print(f"{len(tasks.done())} \t {mean([m.efficiency for m in members])}")
 
         if x % SAVE_EVERY == 0:
-            print(f"{x} of {NRUNS}")
-            csv_buffer = StringIO()
-            rec.df().to_csv(csv_buffer)
-            s3_resource = boto3.resource("s3")
-            s3_resource.Object(
-                bucket, f"ID{randint(10000000,99999999)}file{int(x / SAVE_EVERY)}.csv"
-            ).put(Body=csv_buffer.getvalue())
-            rec.clear()
+            save(rec, x)
 
 
-main()
+if REPLICAS:
+    main_ensemble()
+else:
+    main()
@@ -0,0 +1,455 @@
+"""Lock-step simulation of many independent scenario replicas.
+
+The EnsembleSimulation mirrors app.src.simulation.simulate and Team.work, but
+keeps the state of R replicas in arrays shaped (replicas, members) and
+(replicas, tasks). Every NumPy call then works on all replicas at once instead of
+paying the Python overhead once per replica.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+from pandas import DataFrame
+
+from app.dto.request import Workpack
+from app.exceptions import TooManyMeetingsException
+
+# same difficulties as app.models.task.DIFFICULTIES
+DIFFICULTIES = (1, 2, 3)
+
+RANDOMNESS = {"none": 0, "semi": 1, "full": 2}
+# the ensemble keeps no todo set, the "any" policy draws like the random policy
+TASK_SELECTION = {"random": 0, "best-fit": 1, "hardest-first": 2, "any": 0}
+
+# Team.management_skill
+MANAGEMENT_SKILL = 0.5
+
+NORMAL_WORK_HOUR_DAY = 8
+
+RECORD_COLUMNS = ["Cost", "Day", "Eff", "Fam", "Str", "XP", "Mot", "Acc", "Rej"]
+
+
+@dataclass
+class EnsembleParameters:
+    """Parameters of an ensemble of R replicas with M members and T tasks each.
+    Config values have shape (R,), skill type values (R, M) and task
+    difficulties (R, T)."""
+
+    stress_weekend_reduction: np.ndarray
+    stress_overtime_increase: np.ndarray
+    stress_error_increase: np.ndarray
+    done_tasks_per_meeting: np.ndarray
+    train_skill_increase_rate: np.ndarray
+    cost_member_team_event: np.ndarray
+    randomness: np.ndarray  # codes of RANDOMNESS
+    task_selection: np.ndarray  # codes of TASK_SELECTION
+
+    throughput: np.ndarray
+    error_rate: np.ndarray
+    cost_per_day: np.ndarray
+    development_quality: np.ndarray
+
+    difficulty: np.ndarray
+
+    @property
+    def replicas(self) -> int:
+        return self.difficulty.shape[0]
+
+    @property
+    def members(self) -> int:
+        return self.throughput.shape[1]
+
+    @property
+    def tasks(self) -> int:
+        return self.difficulty.shape[1]
+
+    @classmethod
+    def from_models(
+        cls, configs: Sequence, skill_types: Sequence[Sequence], difficulties
+    ) -> EnsembleParameters:
+        """Creates the parameters from one ScenarioConfig per replica, the skill
+        type of every member per replica and the task difficulties, given either
+        once for all replicas or once per replica."""
+        replicas = len(configs)
+
+        def config(attr):
+            return np.array([getattr(c, attr) for c in configs], dtype=float)
+
+        def skill(attr):
+            return np.array(
+                [[getattr(s, attr) for s in team] for team in skill_types], dtype=float
+            ).reshape(replicas, -1)
+
+        difficulty = np.asarray(difficulties, dtype=int)
+        difficulty = np.broadcast_to(
+            difficulty, (replicas, difficulty.shape[-1])
+        ).copy()
+
+        return cls(
+            stress_weekend_reduction=config("stress_weekend_reduction"),
+            stress_overtime_increase=config("stress_overtime_increase"),
+            stress_error_increase=config("stress_error_increase"),
+            done_tasks_per_meeting=config("done_tasks_per_meeting"),
+            train_skill_increase_rate=config("train_skill_increase_rate"),
+            cost_member_team_event=config("cost_member_team_event"),
+            randomness=np.array([RANDOMNESS[c.randomness] for c in configs]),
+            task_selection=np.array(
+                [
+                    TASK_SELECTION.get(getattr(c, "task_selection", "any"), 0)
+                    for c in configs
+                ]
+            ),
+            throughput=skill("throughput"),
+            error_rate=skill("error_rate"),
+            cost_per_day=skill("cost_per_day"),
+            development_quality=skill("development_quality"),
+            difficulty=difficulty,
+        )
+
+
+class EnsembleSimulation:
+    """Simulates workpacks for all replicas of an ensemble in lock-step. The
+    member defaults can be scalars or arrays broadcastable to (R, M)."""
+
+    def __init__(
+        self,
+        params: EnsembleParameters,
+        seed=None,
+        xp=0.0,
+        motivation=0.75,
+        familiar_tasks=0,
+        familiarity=0.0,
+        stress=0.1,
+    ) -> None:
+        self.params = params
+        self.rng = np.random.default_rng(seed)
+
+        members = (params.replicas, params.members)
+        self.xp = np.full(members, xp, dtype=float)
+        self.motivation = np.full(members, motivation, dtype=float)
+        self.familiar_tasks = np.full(members, familiar_tasks, dtype=float)
+        self.familiarity = np.full(members, familiarity, dtype=float)
+        self.stress = np.full(members, stress, dtype=float)
+
+        tasks = (params.replicas, params.tasks)
+        self.done = np.zeros(tasks, dtype=bool)
+        self.bug = np.zeros(tasks, dtype=bool)
+        self.correct_specification = np.ones(tasks, dtype=bool)
+        self.unit_tested = np.zeros(tasks, dtype=bool)
+        self.integration_tested = np.zeros(tasks, dtype=bool)
+
+        self.cost = np.zeros(params.replicas)
+        self.day = np.zeros(params.replicas, dtype=int)
+        self.poisson_sum = np.zeros(params.replicas)
+        self.poisson_counter = np.zeros(params.replicas, dtype=int)
+
+        self._preferences = self._task_preferences()
+
+    @property
+    def members(self) -> int:
+        return self.params.members
+
+    def simulate(self, workpack: Workpack) -> None:
+        """Simulates one workpack for every replica (see simulate)."""
+        days = workpack.days
+
+        # you can not do more meetings than hours per day
+        if (workpack.meetings / days) > (NORMAL_WORK_HOUR_DAY + workpack.overtime):
+            raise TooManyMeetingsException(
+                (workpack.meetings / days), (NORMAL_WORK_HOUR_DAY + workpack.overtime)
+            )
+
+        # team event and integration test take place on the last days
+        if workpack.teamevent:
+            days = days - 1
+        if workpack.integrationtest:
+            days = days - 1
+
+        meetings_per_day = _meetings_per_day(days, workpack.meetings)
+        remaining_trainings = workpack.training
+
+        if self.members > 0:
+            for day in range(0, days):
+                remaining_trainings = self.work(
+                    workpack, meetings_per_day[day], remaining_trainings
+                )
+                self.day += 1
+                self._calculate_familiarity()
+
+        if workpack.integrationtest:
+            to_integration_test = (
+                self.done & ~self.bug & self.unit_tested & ~self.integration_tested
+            )
+            self.integration_tested |= to_integration_test & self.correct_specification
+            self.done &= ~(to_integration_test & ~self.correct_specification)
+
+        if workpack.teamevent:
+            self.cost += self.members * self.params.cost_member_team_event
+            self.day += 1
+            self.stress = self.stress * 0.5
+            self.motivation = np.minimum(self.motivation * 1.2, 1)
+
+    def work(self, workpack: Workpack, meetings: int, remaining_trainings: int) -> int:
+        """Simulates one day for every replica (see Team.work). Returns the
+        number of training hours left for the following days."""
+        p = self.params
+        remaining_work_hours = NORMAL_WORK_HOUR_DAY + workpack.overtime
+        self.cost += p.cost_per_day.sum(axis=1)
+
+        # Every 5th day, the stress is reduces by the weekend reduction
+        weekend = (self.day % 5 == 0)[:, None]
+        self.stress = np.where(
+            weekend,
+            np.maximum(0, self.stress - p.stress_weekend_reduction[:, None]),
+            self.stress,
+        )
+
+        # 1. meeting, all meetings of the day at once (see Team.meeting)
+        if meetings > 0:
+            solved = self.done.sum(axis=1)
+            tasks_in_meeting = p.done_tasks_per_meeting[:, None]
+            self.familiar_tasks = np.where(
+                tasks_in_meeting < 0,
+                np.minimum(self.familiar_tasks + tasks_in_meeting, solved[:, None])
+                + (meetings - 1) * tasks_in_meeting,
+                np.minimum(
+                    self.familiar_tasks + meetings * tasks_in_meeting, solved[:, None]
+                ),
+            )
+            self._calculate_familiarity(solved)
+            remaining_work_hours -= meetings
+
+        # 2. training
+        remaining_trainings_today = remaining_trainings
+        if remaining_trainings_today > 0:
+            if remaining_trainings_today > remaining_work_hours:
+                remaining_trainings = remaining_trainings_today - remaining_work_hours
+                remaining_trainings_today = remaining_work_hours
+            else:
+                remaining_trainings = 0
+
+            mean_real_throughput = (p.throughput * (1 + self.xp)).mean(
+                axis=1, keepdims=True
+            )
+            for _ in range(remaining_trainings_today):
+                delta = mean_real_throughput - p.throughput * (1 + self.xp)
+                improves = delta > 0
+                self.xp = np.where(
+                    improves,
+                    self.xp
+                    + (delta * p.train_skill_increase_rate[:, None])
+                    / (1 + self.xp) ** 2,
+                    self.xp,
+                )
+                self.motivation = np.where(
+                    improves, np.minimum(1, self.motivation + 0.1), self.motivation
+                )
+
+        # overtime stress, also works for the negative case
+        self.stress = np.minimum(
+            1, workpack.overtime * p.stress_overtime_increase[:, None] + self.stress
+        )
+
+        # 3. task work
+        self.task_work(remaining_work_hours, workpack)
+        return remaining_trainings
+
+    def task_work(self, hours: int, workpack: Workpack) -> None:
+        """Lets every member work on tasks, one member after the other (see
+        Team.task_work)."""
+        p = self.params
+        orders, sizes = self._todo_pools()
+        taken = np.zeros_like(sizes)
+
+        c = self.members * (self.members - 1) / 2
+        team_efficiency = 1 / (1 + (c / 20 - 0.05))
+
+        for m in range(self.members):
+            mu = (
+                hours
+                * ((self.efficiency()[:, m] + team_efficiency) / 2)
+                * (p.throughput[:, m] + self.xp[:, m])
+            )
+            n, poisson = self._n_tasks(mu)
+            self.poisson_sum += poisson
+            self.poisson_counter += 1
+
+            if workpack.unittest:
+                tasks_to_test = self.done & ~self.unit_tested & ~self.integration_tested
+                chosen = self._choose(tasks_to_test, n)
+                self.unit_tested |= chosen
+                n = n - chosen.sum(axis=1)
+            if workpack.bugfix:
+                tasks_to_fix = self.done & self.bug & self.unit_tested
+                chosen = self._choose(tasks_to_fix, n)
+                self.bug &= ~chosen
+                n = n - chosen.sum(axis=1)
+
+            self._solve_tasks(m, n, orders, sizes, taken)
+
+    def efficiency(self) -> np.ndarray:
+        """Returns Member.efficiency of all members, shape (R, M)."""
+        value = (self.familiarity + self.motivation + 1 - np.abs(self.stress - 0.2)) / 3
+        if self.members > 3:
+            return np.minimum(value * 1.1, 1)
+        return value
+
+    def accepted(self) -> np.ndarray:
+        """Returns the number of tasks accepted by the customer per replica."""
+        return (self.done & ~self.bug & self.correct_specification).sum(axis=1)
+
+    def np_records(self) -> np.ndarray:
+        """Returns one row per replica with the columns of
+        simulation_framework.record.np_record."""
+        accepted = self.accepted()
+        return np.column_stack(
+            [
+                self.cost,
+                self.day,
+                self.efficiency().mean(axis=1),
+                self.familiarity.mean(axis=1),
+                self.stress.mean(axis=1),
+                self.xp.mean(axis=1),
+                self.motivation.mean(axis=1),
+                accepted,
+                self.params.tasks - accepted,
+            ]
+        )
+
+    def df(self) -> DataFrame:
+        return DataFrame(self.np_records(), columns=RECORD_COLUMNS)
+
+    def _calculate_familiarity(self, solved: np.ndarray = None) -> None:
+        if solved is None:
+            solved = self.done.sum(axis=1)
+        solved = solved[:, None]
+        self.familiarity = np.where(
+            solved > 0, self.familiar_tasks / np.maximum(solved, 1), self.familiarity
+        )
+
+    def _n_tasks(self, mu: np.ndarray):
+        """Vectorized Member.n_tasks for one member of every replica."""
+        randomness = self.params.randomness
+        poisson = self.rng.poisson(mu)
+        n = np.where(
+            randomness == RANDOMNESS["none"],
+            mu * 0.2,
+            np.where(
+                randomness == RANDOMNESS["semi"],
+                ((poisson + mu) / 2) * 0.2,
+                poisson * 0.2,
+            ),
+        ).astype(int)
+        return n, np.where(randomness == RANDOMNESS["none"], 0, poisson)
+
+    def _choose(self, mask: np.ndarray, n: np.ndarray) -> np.ndarray:
+        """Chooses up to n uniformly drawn tasks out of mask for every replica."""
+        if not (mask.any() and (n > 0).any()):
+            return np.zeros_like(mask)
+        keys = np.where(mask, self.rng.random(mask.shape), 2.0)
+        ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+        return mask & (ranks < n[:, None])
+
+    def _todo_pools(self):
+        """Shuffles the todo tasks of every replica into one pool per difficulty
+        (see app.models.task.TodoPools). Returns the task indices of the pools,
+        shape (R, D, T), and the pool sizes, shape (R, D)."""
+        todo = ~self.done
+        keys = self.rng.random(todo.shape)
+        orders = np.empty(
+            (self.params.replicas, len(DIFFICULTIES), self.params.tasks), dtype=np.intp
+        )
+        sizes = np.empty((self.params.replicas, len(DIFFICULTIES)), dtype=int)
+        for i, d in enumerate(DIFFICULTIES):
+            in_pool = todo & (self.params.difficulty == d)
+            orders[:, i] = np.argsort(np.where(in_pool, keys, 2.0), axis=1)
+            sizes[:, i] = in_pool.sum(axis=1)
+        return orders, sizes
+
+    def _task_preferences(self) -> np.ndarray:
+        """Returns the pool order of the best-fit and hardest-first selection
+        policies for every member, shape (R, M, D)."""
+        p = self.params
+        difficulties = np.array(DIFFICULTIES, dtype=float)
+        fit = np.abs(p.development_quality[..., None] - (difficulties / 3) * 100)
+        # ties are broken in favour of the harder task, like best_fit_order
+        best_fit = np.argsort(fit - difficulties * 1e-6, axis=-1, kind="stable")
+        hardest_first = np.broadcast_to(
+            np.argsort(-difficulties, kind="stable"), best_fit.shape
+        )
+        return np.where(
+            (p.task_selection == TASK_SELECTION["best-fit"])[:, None, None],
+            best_fit,
+            hardest_first,
+        )
+
+    def _select_pools(self, rows, m, remaining) -> np.ndarray:
+        """Returns the pool every replica in rows draws its next task from."""
+        # random: a pool drawn proportional to its size is a uniformly drawn task
+        cumulative = np.cumsum(remaining, axis=1)
+        u = self.rng.random(len(rows)) * cumulative[:, -1]
+        random_pool = (u[:, None] >= cumulative).sum(axis=1)
+
+        preference = self._preferences[rows, m]
+        available = np.take_along_axis(remaining, preference, axis=1) > 0
+        ordered_pool = preference[np.arange(len(rows)), available.argmax(axis=1)]
+
+        return np.where(
+            self.params.task_selection[rows] == TASK_SELECTION["random"],
+            random_pool,
+            ordered_pool,
+        )
+
+    def _solve_tasks(self, m, n, orders, sizes, taken) -> None:
+        """Lets member m of every replica solve up to n todo tasks, one task per
+        replica at a time since stress and motivation change with every task."""
+        p = self.params
+        n = n.copy()
+        while True:
+            remaining = sizes - taken
+            rows = np.flatnonzero((n > 0) & (remaining.sum(axis=1) > 0))
+            if not len(rows):
+                return
+
+            pools = self._select_pools(rows, m, remaining[rows])
+            tasks = orders[rows, pools, taken[rows, pools]]
+            taken[rows, pools] += 1
+            self.done[rows, tasks] = True
+
+            # Member.solve_task
+            diff = p.development_quality[rows, m] - (p.difficulty[rows, tasks] / 3) * 100
+            self.motivation[rows, m] = np.minimum(
+                self.motivation[rows, m] + np.round(0.005 - ((np.abs(diff) / 100) * 0.01), 4),
+                1,
+            )
+            error_increase = np.minimum(0, diff / 100)
+
+            bug = self.rng.random(len(rows)) < (
+                (p.error_rate[rows, m] + self.stress[rows, m] - error_increase) / 3
+            )
+            self.bug[rows, tasks] = bug
+            self.correct_specification[rows, tasks] = (
+                self.rng.random(len(rows)) < MANAGEMENT_SKILL
+            )
+            self.unit_tested[rows, tasks] = False
+            self.integration_tested[rows, tasks] = False
+            self.familiar_tasks[rows, m] += 1
+            self.stress[rows, m] = np.where(
+                bug,
+                np.minimum(1, self.stress[rows, m] + p.stress_error_increase[rows]),
+                self.stress[rows, m],
+            )
+            n[rows] -= 1
+
+
+def _meetings_per_day(days: int, meetings: int) -> List[int]:
+    """Distributes the meetings over the days like WorkpackStatus."""
+    meetings_per_day_without_modulo = math.floor(meetings / days) if days else 0
+    modulo = meetings % days if days else 0
+    return [
+        meetings_per_day_without_modulo + 1 if day < modulo else meetings_per_day_without_modulo
+        for day in range(days)
+    ]
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'softDsim.settings')
+# serve the async variants of the hot endpoints (see app/api/async_endpoints.py)
+os.environ.setdefault('ROOT_URLCONF', 'softDsim.asgi_urls')
 
 application = get_asgi_application()
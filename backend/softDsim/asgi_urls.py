@@ -0,0 +1,8 @@
+"""softDsim URL Configuration for ASGI deployments, see softDsim/asgi.py."""
+from django.contrib import admin
+from django.urls import path, include
+
+urlpatterns = [
+    path("admin/", admin.site.urls),
+    path("api/", include("app.api.async_endpoints")),
+]
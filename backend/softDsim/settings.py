@@ -71,7 +71,7 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "softDsim.urls"
+ROOT_URLCONF = env("ROOT_URLCONF", default="softDsim.urls")
 
 TEMPLATES = [
     {
@@ -98,14 +98,22 @@ WSGI_APPLICATION = "softDsim.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and reused by the
+# following requests of the same thread, so every thread of a worker holds at most
+# one connection. A kept connection is checked before its first use in a request.
+# The engine is the MySQL backend of Django reporting connection metrics (see
+# app/db/metrics.py).
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "app.db.mysql",
         "NAME": configuration.database_name,
         "USER": configuration.database_user,
         "PASSWORD": configuration.database_pass,
         "HOST": configuration.database_host,
         "PORT": configuration.database_port,
+        "CONN_MAX_AGE": configuration.database_conn_max_age,
+        "CONN_HEALTH_CHECKS": configuration.database_conn_health_checks,
+        "OPTIONS": {"connect_timeout": configuration.database_connect_timeout},
     }
 }
 
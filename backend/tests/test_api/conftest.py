@@ -0,0 +1,92 @@
+import pytest
+from rest_framework.test import APIClient
+
+from app.models.answer import Answer
+from app.models.course import Course
+from app.models.management_goal import ManagementGoal
+from app.models.question import Question
+from app.models.question_collection import QuestionCollection
+from app.models.scenario import ScenarioConfig
+from app.models.score_card import ScoreCard
+from app.models.simulation_end import SimulationEnd
+from app.models.simulation_fragment import SimulationFragment
+from app.models.team import SkillType
+from app.models.template_scenario import TemplateScenario
+from app.models.user_scenario import UserScenario
+from custom_user.models import User
+from history.models.result import Result
+
+
+@pytest.fixture
+def make_user(db):
+    def make_user(username, **roles):
+        return User.objects.create_user(username=username, password="pw", **roles)
+
+    return make_user
+
+
+@pytest.fixture
+def make_result(db):
+    def make_result(user, template, score, **fields):
+        """Returns a result of a new scenario of the user in the template."""
+        scenario = UserScenario.objects.create(user=user, template=template, ended=True)
+        return Result.objects.create(user_scenario=scenario, total_score=score, **fields)
+
+    return make_result
+
+
+@pytest.fixture
+def template(db):
+    return TemplateScenario.objects.create(name="template")
+
+
+@pytest.fixture
+def client_for():
+    def client_for(user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    return client_for
+
+
+@pytest.fixture
+def simulation_template(db):
+    """Template with a simulation fragment that ends after 15 days, a question
+    collection and a last fragment."""
+    t = TemplateScenario.objects.create(name="simulation")
+    ManagementGoal.objects.create(
+        template_scenario=t, budget=100000, duration=60, easy_tasks=50, medium_tasks=50, hard_tasks=20
+    )
+    ScoreCard.objects.create(template_scenario=t)
+    f = SimulationFragment.objects.create(index=0, text="first", template_scenario=t)
+    SimulationEnd.objects.create(simulation_fragment=f, type="duration", limit="15", limit_type="ge")
+    qc = QuestionCollection.objects.create(index=1, template_scenario=t)
+    q = Question.objects.create(text="q", question_index=0, multi=False, question_collection=qc)
+    Answer.objects.create(label="yes", points=5, question=q)
+    Answer.objects.create(label="no", points=0, question=q)
+    f = SimulationFragment.objects.create(index=2, text="last", last=True, template_scenario=t)
+    SimulationEnd.objects.create(simulation_fragment=f, type="duration", limit="1000", limit_type="ge")
+    return t
+
+
+@pytest.fixture
+def scenario(make_user, client_for, simulation_template):
+    """Returns a client of a student and the id of a started scenario of the
+    student in the simulation template."""
+    user = make_user("student", student=True)
+    config = ScenarioConfig.objects.create(
+        name="config", stress_weekend_reduction=0.1, done_tasks_per_meeting=20
+    )
+    SkillType.objects.create(name="junior", cost_per_day=200, throughput=2)
+    SkillType.objects.create(name="senior", cost_per_day=500, throughput=6)
+    course = Course.objects.create(name="course")
+    course.users.add(user)
+    course.scenarios.add(simulation_template)
+    client = client_for(user)
+    r = client.post(
+        "/api/sim/start",
+        {"template-id": simulation_template.id, "config-id": config.id},
+        format="json",
+    )
+    return client, r.json()["data"]["id"]
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve
+
+from app.models.user_scenario import ScenarioState
+from custom_user.models import User
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def asgi_urls(settings):
+    settings.ROOT_URLCONF = "softDsim.asgi_urls"
+
+
+def test_hot_routes_are_async(asgi_urls):
+    for url in ["/api/sim/next", "/api/sim/start", "/api/template-overview", "/api/template-overview/1", "/api/results", "/api/result/1"]:
+        assert asyncio.iscoroutinefunction(resolve(url).func), url
+    # all other routes are the routes of softDsim.urls
+    assert not asyncio.iscoroutinefunction(resolve("/api/sim/stream").func)
+
+
+def test_async_routes_respond(scenario, asgi_urls):
+    _, scenario_id = scenario
+    client = AsyncClient()
+    client.force_login(User.objects.get(username="student"))
+
+    async def requests():
+        step = await client.post(
+            "/api/sim/next", {"scenario_id": scenario_id, "type": "START"}, content_type="application/json"
+        )
+        overviews = await asyncio.gather(*[client.get("/api/template-overview") for _ in range(3)])
+        sync_route = await client.get("/api/template-scenario")
+        return step, overviews, sync_route
+
+    step, overviews, sync_route = async_to_sync(requests)()
+
+    assert step.status_code == 200
+    assert step.json()["type"] == "SIMULATION"
+    assert ScenarioState.objects.get(user_scenario_id=scenario_id).step_counter == 1
+    assert [r.status_code for r in overviews] == [200] * 3
+    assert overviews[0].json() == overviews[1].json()
+    # students may not read the templates
+    assert sync_route.status_code == 403
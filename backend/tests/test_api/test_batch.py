@@ -0,0 +1,135 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.user_scenario import ScenarioState
+from app.src import simulation
+from app.src.simulation import continue_simulation_batch
+
+WORKPACK = {"type": "SIMULATION", "actions": {"days": 5, "meetings": 1}, "members": []}
+
+
+def _state(scenario_id):
+    return ScenarioState.objects.get(user_scenario_id=scenario_id)
+
+
+@pytest.mark.django_db
+def test_batch_runs_steps_until_the_scenario_changes(scenario):
+    client, scenario_id = scenario
+    steps = [
+        {"type": "START"},
+        {**WORKPACK, "members": [{"skill_type": "junior", "change": 3}]},
+        WORKPACK,
+        WORKPACK,
+        WORKPACK,
+        WORKPACK,
+    ]
+
+    r = client.post("/api/sim/batch", {"scenario_id": scenario_id, "steps": steps}, format="json")
+
+    assert r.status_code == 200
+    data = r.json()
+    # the fragment ends after 15 days, the scenario continues with a question
+    assert data["completed"] == 4
+    assert data["stopped"] == "Request 4 has type SIMULATION, but scenario continues with QUESTION."
+    assert [s["state"]["day"] for s in data["responses"]] == [0, 5, 10, 15]
+    assert _state(scenario_id).day == 15
+
+    r = client.post(
+        "/api/sim/batch",
+        {"scenario_id": scenario_id, "steps": [WORKPACK], "final_only": True},
+        format="json",
+    )
+    assert r.json()["completed"] == 1
+    assert len(r.json()["responses"]) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "step, message",
+    [
+        ({"type": "SIMULATION", "actions": "five days"}, "Step 1 is not a valid request"),
+        ({"type": "UNKNOWN"}, "Type of step 1 has to be one of the following"),
+        ("START", "Type of step 1 has to be one of the following"),
+    ],
+)
+def test_batch_with_invalid_step_is_rejected(scenario, step, message):
+    client, scenario_id = scenario
+
+    r = client.post(
+        "/api/sim/batch",
+        {"scenario_id": scenario_id, "steps": [{"type": "START"}, step]},
+        format="json",
+    )
+
+    assert r.status_code == 400
+    assert r.json()["error-message"].startswith(message)
+
+
+@pytest.mark.django_db
+def test_batch_stores_nothing_if_a_step_fails(scenario):
+    client, scenario_id = scenario
+    steps = [
+        {"type": "START"},
+        {**WORKPACK, "members": [{"skill_type": "junior", "change": 2}]},
+        {"type": "SIMULATION", "actions": {"days": 1, "meetings": 50}},
+    ]
+
+    r = client.post("/api/sim/batch", {"scenario_id": scenario_id, "steps": steps}, format="json")
+
+    assert r.status_code == 400
+    state = _state(scenario_id)
+    assert (state.day, state.step_counter) == (0, 0)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("steps", [[], [{"type": "START"}] * 51, {"type": "START"}])
+def test_batch_needs_one_to_max_steps(scenario, steps):
+    client, scenario_id = scenario
+
+    r = client.post("/api/sim/batch", {"scenario_id": scenario_id, "steps": steps}, format="json")
+
+    assert r.status_code == 400
+
+
+def _responses(monkeypatch, types):
+    types = iter(types)
+    monkeypatch.setattr(
+        simulation,
+        "continue_simulation",
+        lambda session, req: SimpleNamespace(type=next(types)),
+    )
+
+
+def _requests(*types):
+    return [SimpleNamespace(type=t) for t in types]
+
+
+def test_batch_processes_all_fitting_requests(monkeypatch):
+    _responses(monkeypatch, ["SIMULATION", "SIMULATION", "QUESTION"])
+
+    responses, stopped = continue_simulation_batch(None, _requests("START", "SIMULATION", "SIMULATION"))
+
+    assert [r.type for r in responses] == ["SIMULATION", "SIMULATION", "QUESTION"]
+    assert stopped is None
+
+
+def test_batch_stops_at_type_mismatch(monkeypatch):
+    _responses(monkeypatch, ["SIMULATION", "EVENT"])
+
+    responses, stopped = continue_simulation_batch(None, _requests("START", "SIMULATION", "SIMULATION"))
+
+    assert len(responses) == 2
+    assert stopped == "Request 2 has type SIMULATION, but scenario continues with EVENT."
+
+
+@pytest.mark.parametrize("result", [SimpleNamespace(type="RESULT"), SimpleNamespace()])
+def test_batch_stops_at_end_of_scenario(monkeypatch, result):
+    # the result can also be an error Response without a type
+    results = iter([SimpleNamespace(type="SIMULATION"), result])
+    monkeypatch.setattr(simulation, "continue_simulation", lambda session, req: next(results))
+
+    responses, stopped = continue_simulation_batch(None, _requests("SIMULATION", "SIMULATION", "SIMULATION"))
+
+    assert responses[-1] is result
+    assert stopped == "Scenario ended before request 2."
@@ -0,0 +1,188 @@
+import csv
+import datetime
+import io
+import json
+
+import pyarrow.parquet as pq
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.utils import timezone
+
+from app.models.answer import Answer
+from app.models.question import Question
+from app.models.team import SkillType
+from app.src.util.streaming_util import iterate_in_thread
+from history.models.history import History
+from history.models.member import HistoryMemberStatus
+from history.models.question import HistoryAnswer, HistoryQuestion
+from history.models.result import Result
+from history.util import export
+from history.util.export import (
+    HISTORY_COLUMNS,
+    RESULT_COLUMNS,
+    export_history,
+    export_results,
+    iterate_chunks,
+    start_of_day,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def results(make_user, make_result, template, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+    alice = make_user("alice")
+    return [make_result(alice, template, score, total_cost=score * 1.5) for score in (10, 20, 30, 40, 50)]
+
+
+def _csv(chunks):
+    return list(csv.DictReader(io.StringIO("".join(chunks))))
+
+
+def _parquet(chunks):
+    return pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_chunks_end_at_the_chunk_size(results):
+    sizes = [len(c) for c in iterate_chunks(Result.objects.all())]
+    assert sizes == [2, 2, 1]
+
+    Result.objects.filter(id=results[-1].id).delete()
+    sizes = [len(c) for c in iterate_chunks(Result.objects.all())]
+    assert sizes == [2, 2]
+
+
+def test_results_csv_round_trip(results):
+    rows = _csv(export_results("csv"))
+
+    assert [int(r["id"]) for r in rows] == [r.id for r in results]
+    assert list(rows[0]) == [name for name, _ in RESULT_COLUMNS]
+    assert [int(r["total_score"]) for r in rows] == [10, 20, 30, 40, 50]
+    assert float(rows[1]["total_cost"]) == 30.0
+    assert rows[0]["template_scenario_id"] == ""
+
+
+def test_results_parquet_round_trip(results):
+    file = _parquet(export_results("parquet"))
+
+    # one row group per chunk
+    assert file.metadata.num_row_groups == 3
+    table = file.read()
+    assert table.column_names == [name for name, _ in RESULT_COLUMNS]
+    assert table.column("id").to_pylist() == [r.id for r in results]
+    assert table.column("total_score").to_pylist() == [10, 20, 30, 40, 50]
+    assert table.column("timestamp").to_pylist()[0] == results[0].timestamp
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_under_asgi_is_read_chunk_by_chunk(results, make_user):
+    client = AsyncClient()
+    client.force_login(make_user("admin", admin=True))
+
+    async def download():
+        r = await client.get("/api/results/export", {"filetype": "csv"})
+        # Django would read a sync iterator completely before sending it
+        assert r.is_async
+        return [chunk async for chunk in r.streaming_content]
+
+    chunks = async_to_sync(download)()
+
+    # the header and one chunk per query
+    assert len(chunks) == 4
+    rows = _csv(c.decode() for c in chunks)
+    assert [int(r["id"]) for r in rows] == [r.id for r in results]
+
+
+def test_iterate_in_thread_reads_one_chunk_at_a_time():
+    read = []
+    closed = []
+
+    def chunks():
+        try:
+            for i in range(5):
+                read.append(i)
+                yield i
+        finally:
+            closed.append(True)
+
+    async def first_two():
+        iterator = iterate_in_thread(chunks())
+        result = [await iterator.__anext__(), await iterator.__anext__()]
+        assert read == [0, 1]
+        await iterator.aclose()
+        return result
+
+    assert async_to_sync(first_two)() == [0, 1]
+    assert closed == [True]
+
+
+def test_results_are_filtered_by_days(results):
+    today = timezone.localdate()
+    first, second = results[:2]
+    midnight = start_of_day(today)
+    Result.objects.filter(id=first.id).update(timestamp=midnight - datetime.timedelta(microseconds=1))
+    Result.objects.filter(id=second.id).update(timestamp=midnight)
+
+    rows = _csv(export_results("csv", date_from=today))
+    assert [int(r["id"]) for r in rows] == [r.id for r in results[1:]]
+    rows = _csv(export_results("csv", date_to=today - datetime.timedelta(days=1)))
+    assert [int(r["id"]) for r in rows] == [first.id]
+
+
+@pytest.fixture
+def history(make_user, make_result, simulation_template, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 1)
+    scenario = make_result(make_user("alice"), simulation_template, 0).user_scenario
+    junior = SkillType.objects.create(name="junior", cost_per_day=200, throughput=2)
+    question = Question.objects.get(question_collection__template_scenario=simulation_template)
+    yes, no = Answer.objects.filter(question=question).order_by("id")
+
+    simulation = History.objects.create(user_scenario=scenario, request_type="SIMULATION", day=5, meetings=2)
+    for i, (motivation, stress) in enumerate(((0.5, 0.2), (0.9, 0.4))):
+        HistoryMemberStatus.objects.create(
+            history=simulation, member_id=i + 1, motivation=motivation, stress=stress, xp=i,
+            skill_type=junior, skill_type_name="junior",
+        )
+    answered = History.objects.create(user_scenario=scenario, request_type="QUESTION")
+    q = HistoryQuestion.objects.create(history=answered, question=question)
+    HistoryAnswer.objects.create(question=q, answer=yes, answer_selection=True)
+    HistoryAnswer.objects.create(question=q, answer=no, answer_selection=False)
+    return scenario, simulation, answered, yes, no
+
+
+def test_history_is_flattened(history):
+    scenario, simulation, answered, yes, no = history
+
+    rows = _csv(export_history("csv", template_id=scenario.template_id))
+
+    assert list(rows[0]) == [name for name, _ in HISTORY_COLUMNS]
+    first, second = rows
+    assert (int(first["id"]), first["username"], int(first["day"])) == (simulation.id, "alice", 5)
+    assert int(first["member_count"]) == 2
+    assert float(first["avg_motivation"]) == pytest.approx(0.7)
+    assert float(first["avg_xp"]) == 0.5
+    assert [m["member"] for m in json.loads(first["members"])] == [1, 2]
+    assert json.loads(first["answers"]) == []
+
+    assert int(second["member_count"]) == 0
+    assert second["avg_stress"] == ""
+    assert int(second["answers_selected"]) == 1
+    assert json.loads(second["answers"]) == [
+        {"question": yes.question_id, "answer": yes.id, "selected": True},
+        {"question": no.question_id, "answer": no.id, "selected": False},
+    ]
+
+
+def test_history_parquet_round_trip(history):
+    scenario, simulation, answered, _, _ = history
+
+    file = _parquet(export_history("parquet"))
+
+    assert file.metadata.num_row_groups == 2
+    table = file.read()
+    assert table.column("id").to_pylist() == [simulation.id, answered.id]
+    assert table.column("member_count").to_pylist() == [2, 0]
+    assert table.column("avg_stress").to_pylist()[1] is None
+    assert table.column("answers_selected").to_pylist() == [0, 1]
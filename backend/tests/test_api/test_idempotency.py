@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from app.models.idempotency_key import IdempotencyKey
+from app.models.user_scenario import ScenarioState
+
+pytestmark = pytest.mark.django_db
+
+WORKPACK = {"type": "SIMULATION", "actions": {"days": 5}, "members": [{"skill_type": "junior", "change": 2}]}
+
+
+@pytest.fixture
+def started(scenario):
+    client, scenario_id = scenario
+    client.post("/api/sim/next", {"scenario_id": scenario_id, "type": "START"}, format="json")
+    return client, scenario_id
+
+
+def _step(client, scenario_id, key, **workpack):
+    return client.post(
+        "/api/sim/next",
+        {**WORKPACK, **workpack, "scenario_id": scenario_id},
+        format="json",
+        HTTP_IDEMPOTENCY_KEY=key,
+    )
+
+
+def _day(scenario_id):
+    return ScenarioState.objects.get(user_scenario_id=scenario_id).day
+
+
+def test_replayed_key_returns_stored_response(started):
+    client, scenario_id = started
+
+    first = _step(client, scenario_id, "k1")
+    second = _step(client, scenario_id, "k1")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["state"]["day"] == 5
+    assert _day(scenario_id) == 5
+    # the key is also read from the body
+    r = client.post("/api/sim/next", {**WORKPACK, "scenario_id": scenario_id, "idempotency_key": "k2"}, format="json")
+    assert r.json()["state"]["day"] == 10
+    assert _step(client, scenario_id, "k2").json() == r.json()
+    assert IdempotencyKey.objects.count() == 2
+
+
+def test_failed_step_stores_nothing(started):
+    client, scenario_id = started
+
+    r = _step(client, scenario_id, "k1", actions={"days": 1, "meetings": 30})
+
+    assert r.status_code >= 400
+    assert not IdempotencyKey.objects.exists()
+    assert _day(scenario_id) == 0
+    # a retry with the same key runs the step
+    assert _step(client, scenario_id, "k1").json()["state"]["day"] == 5
+    assert _step(client, scenario_id, "k" * 65).status_code == 400
+
+
+def test_expired_keys_are_purged(started):
+    client, scenario_id = started
+    _step(client, scenario_id, "old")
+    _step(client, scenario_id, "new")
+    IdempotencyKey.objects.filter(key="old").update(
+        created=timezone.now() - datetime.timedelta(days=2)
+    )
+
+    # an expired key runs the step again
+    assert _step(client, scenario_id, "old").json()["state"]["day"] == 15
+    assert IdempotencyKey.objects.count() == 2
+
+    IdempotencyKey.objects.update(created=timezone.now() - datetime.timedelta(days=2))
+    call_command("purge_idempotency_keys")
+    assert not IdempotencyKey.objects.exists()
@@ -0,0 +1,104 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from app.models.step_job import StepJob
+from app.models.user_scenario import ScenarioState
+from app.src import jobs
+from app.src.jobs import run_job, run_next_job
+
+pytestmark = pytest.mark.django_db
+
+WORKPACK = {"type": "SIMULATION", "actions": {"days": 5}, "members": [{"skill_type": "junior", "change": 2}]}
+
+
+@pytest.fixture
+def started(scenario):
+    client, scenario_id = scenario
+    client.post("/api/sim/next", {"scenario_id": scenario_id, "type": "START"}, format="json")
+    return client, scenario_id
+
+
+def _enqueue(client, scenario_id, step=WORKPACK):
+    r = client.post("/api/sim/jobs", {**step, "scenario_id": scenario_id}, format="json")
+    assert r.status_code == 202
+    return r.json()
+
+
+def _state(scenario_id):
+    return ScenarioState.objects.get(user_scenario_id=scenario_id)
+
+
+def test_job_is_claimed_and_run_once(started):
+    client, scenario_id = started
+    job = _enqueue(client, scenario_id)
+    # the same step returns the same job
+    assert _enqueue(client, scenario_id)["id"] == job["id"]
+    assert job["status"] == StepJob.QUEUED
+
+    assert run_next_job().status == StepJob.DONE
+    assert run_job(job["id"]) is None
+    assert run_next_job() is None
+
+    data = client.get(f"/api/sim/jobs/{job['id']}").json()
+    assert data["status"] == StepJob.DONE
+    assert data["response"]["state"]["day"] == 5
+    assert _state(scenario_id).day == 5
+    assert StepJob.objects.get(id=job["id"]).lease_until is None
+
+
+def test_failed_job_is_retried_with_new_request(started):
+    client, scenario_id = started
+    job = _enqueue(client, scenario_id, {"type": "SIMULATION", "actions": {"days": 1, "meetings": 50}})
+
+    failed = run_next_job()
+    assert failed.status == StepJob.FAILED
+    assert "meetings" in failed.error
+    assert _state(scenario_id).day == 0
+
+    retried = _enqueue(client, scenario_id)
+    assert (retried["id"], retried["status"]) == (job["id"], StepJob.QUEUED)
+    assert run_next_job().status == StepJob.DONE
+    assert _state(scenario_id).day == 5
+
+
+def test_job_of_an_old_step_fails(started):
+    client, scenario_id = started
+    job = _enqueue(client, scenario_id)
+    client.post("/api/sim/next", {**WORKPACK, "scenario_id": scenario_id}, format="json")
+
+    result = run_job(job["id"])
+
+    assert result.status == StepJob.FAILED
+    assert result.error == "Scenario is at step 2, job was enqueued for step 1."
+    assert _state(scenario_id).day == 5
+
+
+def test_running_job_is_reclaimed_after_its_lease(started):
+    client, scenario_id = started
+    job = _enqueue(client, scenario_id)
+    running = StepJob.objects.filter(id=job["id"])
+
+    running.update(status=StepJob.RUNNING, lease_until=timezone.now() + datetime.timedelta(minutes=1))
+    assert run_next_job() is None
+
+    # the worker died, the lease has expired
+    running.update(lease_until=timezone.now() - datetime.timedelta(seconds=1))
+    assert run_next_job().status == StepJob.DONE
+    assert _state(scenario_id).day == 5
+
+
+def test_step_is_not_stored_after_the_lease_was_lost(started, monkeypatch):
+    client, scenario_id = started
+    job = _enqueue(client, scenario_id)
+    continue_simulation = jobs.continue_simulation
+
+    def claimed_by_other_worker(session, req):
+        StepJob.objects.filter(id=job["id"]).update(lease_until=timezone.now())
+        return continue_simulation(session, req)
+
+    monkeypatch.setattr(jobs, "continue_simulation", claimed_by_other_worker)
+
+    assert run_job(job["id"]).status == StepJob.RUNNING
+    assert _state(scenario_id).day == 0
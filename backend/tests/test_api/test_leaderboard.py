@@ -0,0 +1,91 @@
+import pytest
+
+from app.models.course import Course
+from app.models.template_scenario import TemplateScenario
+from history.models.leaderboard import GLOBAL_BOARD, LeaderboardEntry
+from history.util.leaderboard import get_leaderboard, get_rank, update_leaderboards
+
+pytestmark = pytest.mark.django_db
+
+
+def _entries(template, course_id=GLOBAL_BOARD):
+    return {
+        e.user.username: (e.best_score, e.tries)
+        for e in LeaderboardEntry.objects.filter(
+            template_scenario_id=template.id, course_id=course_id
+        ).select_related("user")
+    }
+
+
+def test_update_leaderboards_keeps_best_score_and_counts_tries(make_user, make_result, template):
+    alice = make_user("alice")
+    course = Course.objects.create(name="course")
+    course.users.add(alice)
+    course.scenarios.add(template)
+
+    first = make_result(alice, template, 50)
+    update_leaderboards(first)
+    update_leaderboards(make_result(alice, template, 30))
+
+    assert _entries(template) == {"alice": (50, 2)}
+    assert _entries(template, course.id) == {"alice": (50, 2)}
+    entry = LeaderboardEntry.objects.get(template_scenario_id=template.id, course_id=GLOBAL_BOARD)
+    assert entry.result_id == first.id
+
+    best = make_result(alice, template, 80)
+    update_leaderboards(best)
+    assert _entries(template) == {"alice": (80, 3)}
+    assert _entries(template, course.id) == {"alice": (80, 3)}
+
+
+def test_course_receivers_follow_users_and_scenarios(make_user, make_result, template):
+    alice, bob = make_user("alice"), make_user("bob")
+    other = TemplateScenario.objects.create(name="other")
+    for user, score in ((alice, 70), (alice, 40), (bob, 60)):
+        update_leaderboards(make_result(user, template, score))
+    update_leaderboards(make_result(alice, other, 10))
+
+    course = Course.objects.create(name="course")
+    course.scenarios.add(template)
+    course.users.add(alice, bob)
+    assert _entries(template, course.id) == {"alice": (70, 2), "bob": (60, 1)}
+    assert _entries(other, course.id) == {}
+
+    # reverse direction: the template is added to the course
+    other.course_set.add(course)
+    assert _entries(other, course.id) == {"alice": (10, 1)}
+
+    course.users.remove(bob)
+    assert _entries(template, course.id) == {"alice": (70, 2)}
+    # reverse direction: the course is removed from the user
+    alice.course_set.remove(course)
+    assert _entries(template, course.id) == {}
+
+    course.users.add(alice)
+    course.scenarios.remove(other)
+    assert _entries(template, course.id) == {"alice": (70, 2)}
+    assert _entries(other, course.id) == {}
+
+    course.scenarios.clear()
+    assert _entries(template, course.id) == {}
+    # the global leaderboards are not changed by courses
+    assert _entries(template) == {"alice": (70, 2), "bob": (60, 1)}
+
+    course.scenarios.add(template)
+    course.delete()
+    assert not LeaderboardEntry.objects.exclude(course_id=GLOBAL_BOARD).exists()
+
+
+def test_equal_scores_share_a_rank(make_user, make_result, template):
+    for name, score in (("alice", 50), ("bob", 80), ("carol", 50), ("dave", 20)):
+        update_leaderboards(make_result(make_user(name), template, score))
+
+    ranked = [(rank, e.user.username) for rank, e in get_leaderboard(template.id)]
+    # alice reached 50 before carol
+    assert ranked == [(1, "bob"), (2, "alice"), (2, "carol"), (4, "dave")]
+
+    user_id = {e.user.username: e.user_id for _, e in get_leaderboard(template.id)}
+    assert get_rank(template.id, user_id["carol"])[0] == 2
+    assert get_rank(template.id, user_id["dave"])[0] == 4
+    assert get_leaderboard(template.id, limit=2)[-1][0] == 2
+    assert get_rank(template.id, user_id["bob"], course_id=1) is None
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from app.models.team import Member, SkillType, Team
+from app.serializers.team import MemberSerializer
+from app.src.util.pagination_util import paginate
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def members():
+    skill_type = SkillType.objects.create(name="junior", cost_per_day=200, throughput=2)
+    team = Team.objects.create()
+    return Member.objects.bulk_create(
+        [Member(skill_type=skill_type, team=team) for _ in range(5)]
+    )
+
+
+def _paginate(query="", **kwargs):
+    request = Request(APIRequestFactory().get(f"/api/member{query}"))
+    kwargs.setdefault("select_related", {"skill_type": "skill_type"})
+    with CaptureQueriesContext(connection) as queries:
+        data, next_cursor = paginate(request, Member.objects.all(), MemberSerializer, **kwargs)
+    return data, next_cursor, [q["sql"] for q in queries.captured_queries]
+
+
+def test_pages_follow_the_cursor(members):
+    ids = [m.id for m in members]
+
+    data, after, _ = _paginate("?limit=2")
+    assert [m["id"] for m in data] == ids[:2]
+    data, after, _ = _paginate(f"?limit=2&after={after}")
+    assert [m["id"] for m in data] == ids[2:4]
+    # the last page has no cursor, also if it is full
+    data, after, _ = _paginate(f"?limit=1&after={after}")
+    assert [m["id"] for m in data] == ids[4:]
+    assert after is None
+
+
+def test_without_limit_and_cursor_all_objects_are_read(members):
+    data, after, _ = _paginate(max_limit=3)
+    assert len(data) == 5
+    assert after is None
+
+    # a cursor without limit pages by max_limit
+    _, after, _ = _paginate("?limit=1", max_limit=3)
+    data, after, _ = _paginate(f"?after={after}", max_limit=3)
+    assert [m["id"] for m in data] == [m.id for m in members[1:4]]
+    assert after is not None
+
+
+def test_fields_are_pruned_and_only_their_columns_read(members):
+    data, _, sql = _paginate("?fields=id,stress")
+
+    assert data[0].keys() == {"id", "stress"}
+    assert len(sql) == 1
+    columns = sql[0].split(" FROM ")[0]
+    assert '"stress"' in columns
+    assert '"motivation"' not in columns
+    assert "JOIN" not in sql[0]
+
+
+def test_related_objects_are_only_joined_if_returned(members):
+    data, _, sql = _paginate("?fields=id,skill_type")
+
+    assert data[0]["skill_type"]["name"] == "junior"
+    # the skill types are joined instead of read per member
+    assert len(sql) == 1
+    assert "JOIN" in sql[0]
+
+    data, _, sql = _paginate()
+    assert data[0]["skill_type"]["name"] == "junior"
+    assert len(sql) == 1
+
+
+def test_default_fields(members):
+    data, _, _ = _paginate(default_fields=["id", "xp"])
+    assert data[0].keys() == {"id", "xp"}
+    data, _, _ = _paginate("?fields=stress", default_fields=["id", "xp"])
+    assert data[0].keys() == {"stress"}
+
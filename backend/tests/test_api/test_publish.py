@@ -0,0 +1,117 @@
+import pytest
+from django.db.models.query import QuerySet
+
+from app.exceptions import TemplateValidationException
+from app.models.answer import Answer
+from app.models.event import EventEffect
+from app.models.question import Question
+from app.models.template_scenario import TemplateScenario
+from app.src.publish import build_template_graph, save_template_graph
+
+pytestmark = pytest.mark.django_db
+
+BASE = {"type": "BASE", "template_name": "studio", "text": "story", "budget": 1000, "duration": 20, "easy_tasks": "5", "medium_tasks": 4, "hard_tasks": 1}
+MODEL_SELECTION = {"type": "MODELSELECTION", "text": "model", "models": ["Scrum", "Kanban"]}
+EVENT = {"type": "EVENT", "text": "event", "trigger_type": "day", "trigger_comparator": "ge", "trigger_value": "3", "budget": 1, "duration": 2, "stress": "", "motivation": 0, "familiarity": 0, "easy_tasks": 3}
+
+
+def _questions(name, n):
+    return {
+        "type": "QUESTIONS",
+        "text": name,
+        "questions": [
+            {"text": f"{name} {k}", "type": "MULTI" if k else "SINGLE", "answers": [{"label": "a", "points": 1}, {"label": "b", "points": str(k)}]}
+            for k in range(n)
+        ],
+    }
+
+
+def _fragment(limit, actions=("meetings",)):
+    return {
+        "type": "FRAGMENT",
+        "text": f"fragment {limit}",
+        "simulation_end": {"limit": str(limit), "type": "duration", "limit_type": "ge"},
+        "actions": [{"action": a, "lower_limit": 0, "upper_limit": 5} for a in actions],
+    }
+
+
+COMPONENTS = [BASE, _fragment(10), _questions("first", 2), MODEL_SELECTION, _fragment(20, ()), _questions("second", 3), EVENT, _fragment(30, ("meetings", "salary"))]
+
+
+def _check_template(template):
+    assert template.name == "studio"
+    assert template.studio_template_id == "studio-id"
+    assert template.version == 1
+    assert template.management_goal.easy_tasks == 5
+    assert template.score_card.template_scenario_id == template.id
+
+    fragments = template.simulation_fragments.order_by("index")
+    assert [(f.index, f.last, f.simulation_end.limit, [a.title for a in f.actions.order_by("id")]) for f in fragments] == [
+        (0, False, "10", ["meetings"]),
+        (3, False, "20", []),
+        (6, True, "30", ["meetings", "salary"]),
+    ]
+    collections = template.question_collections.order_by("index")
+    assert [(qc.index, qc.text) for qc in collections] == [(1, "first"), (4, "second")]
+    for qc in collections:
+        questions = qc.questions.order_by("question_index")
+        assert [q.text for q in questions] == [f"{qc.text} {k}" for k in range(len(questions))]
+        for k, q in enumerate(questions):
+            assert q.multi == bool(k)
+            assert [(a.label, a.points) for a in q.answers.order_by("id")] == [("a", 1), ("b", k)]
+    assert Question.objects.count() == 5
+    assert Answer.objects.count() == 10
+
+    (selection,) = template.model_selections.all()
+    assert (selection.index, selection.scrum, selection.kanban, selection.waterfall) == (2, True, True, False)
+    (event,) = template.events.all()
+    assert event.trigger_value == 3
+    effects = {e.type: (e.value, e.easy_tasks) for e in event.effects.all()}
+    assert effects == {
+        "budget": (1, 0),
+        "duration": (2, 0),
+        "stress": (0, 0),
+        "motivation": (0, 0),
+        "familiarity": (0, 0),
+        "tasks": (0, 3),
+    }
+
+
+def test_publish_creates_template_graph():
+    template = save_template_graph(build_template_graph(COMPONENTS, "studio-id"))
+
+    _check_template(TemplateScenario.objects.get(id=template.id))
+
+
+def test_publish_without_returned_ids(monkeypatch):
+    """Backends like MySQL do not set the ids of bulk created rows."""
+    bulk_create = QuerySet.bulk_create
+
+    def without_ids(self, objs, *args, **kwargs):
+        created = bulk_create(self, objs, *args, **kwargs)
+        for obj in objs:
+            obj.pk = None
+        return created
+
+    monkeypatch.setattr(QuerySet, "bulk_create", without_ids)
+    # another template, so the ids are looked up only for the new rows
+    save_template_graph(build_template_graph([BASE, _questions("other", 1), EVENT], "other"))
+    template = save_template_graph(build_template_graph(COMPONENTS, "studio-id"))
+
+    Question.objects.filter(question_collection__template_scenario__studio_template_id="other").delete()
+    EventEffect.objects.filter(event__template_scenario__studio_template_id="other").delete()
+    _check_template(TemplateScenario.objects.get(id=template.id))
+
+
+@pytest.mark.parametrize(
+    "components",
+    [
+        [_fragment(10)],
+        [BASE, {"type": "UNKNOWN"}],
+        [BASE, {**_fragment(10), "simulation_end": None}],
+        [BASE, {"type": "QUESTIONS", "text": "q", "questions": [{"answers": [{"points": "x"}]}]}],
+    ],
+)
+def test_invalid_components_are_rejected(components):
+    with pytest.raises(TemplateValidationException):
+        build_template_graph(components, "studio-id")
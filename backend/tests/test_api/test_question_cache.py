@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.cache import question_collection
+from app.cache.question_collection import get_compiled_questions
+from app.models.answer import Answer
+from app.models.question import Question
+from app.models.question_collection import QuestionCollection
+from app.models.template_scenario import TemplateScenario
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled():
+    # ids are reused between tests, the compiled questions must not be
+    question_collection._compiled.clear()
+    yield
+    question_collection._compiled.clear()
+
+
+def _compiled(template_id):
+    return get_compiled_questions(TemplateScenario.objects.get(id=template_id))
+
+
+def _questions(compiled):
+    return [
+        (q.question_index, q.text, [(a.label, a.points) for a in q.answers])
+        for q in compiled.collections[1].questions
+    ]
+
+
+def test_questions_are_compiled_once_per_version(simulation_template):
+    compiled = _compiled(simulation_template.id)
+
+    assert _questions(compiled) == [(0, "q", [("yes", 5), ("no", 0)])]
+    assert sorted(compiled.points.values()) == [0, 5]
+    template = TemplateScenario.objects.get(id=simulation_template.id)
+    with CaptureQueriesContext(connection) as ctx:
+        assert get_compiled_questions(template) is compiled
+    assert not ctx.captured_queries
+
+
+def test_edited_answer_is_compiled_again(simulation_template):
+    before = _compiled(simulation_template.id)
+    answer = Answer.objects.get(label="yes")
+    answer.points = 7
+    answer.save()
+
+    after = _compiled(simulation_template.id)
+
+    assert after is not before
+    assert after.version > before.version
+    assert after.points[answer.id] == 7
+    assert _questions(after) == [(0, "q", [("yes", 7), ("no", 0)])]
+    # the compiled questions of the old version are not changed
+    assert before.points[answer.id] == 5
+
+
+def test_edited_questions_are_compiled_again(simulation_template):
+    _compiled(simulation_template.id)
+    question = Question.objects.get()
+    question.text = "changed"
+    question.save()
+    assert _questions(_compiled(simulation_template.id)) == [(0, "changed", [("yes", 5), ("no", 0)])]
+
+    qc = QuestionCollection.objects.get()
+    new = Question.objects.create(text="new", question_index=1, multi=True, question_collection=qc)
+    Answer.objects.create(label="maybe", points=2, question=new)
+    assert _questions(_compiled(simulation_template.id))[1] == (1, "new", [("maybe", 2)])
+
+    question.delete()
+    assert _questions(_compiled(simulation_template.id)) == [(1, "new", [("maybe", 2)])]
+
+
+def test_saving_stale_template_keeps_version(simulation_template):
+    stale = TemplateScenario.objects.get(id=simulation_template.id)
+    answer = Answer.objects.get(label="yes")
+    answer.points = 7
+    answer.save()
+    version = TemplateScenario.objects.get(id=simulation_template.id).version
+    assert version > stale.version
+
+    stale.name = "renamed"
+    stale.save()
+
+    template = TemplateScenario.objects.get(id=simulation_template.id)
+    assert template.name == "renamed"
+    # saving the template is a change of its own
+    assert template.version == version + 1
+    assert get_compiled_questions(template).points[answer.id] == 7
+
+
+def test_deleted_template_is_dropped(simulation_template):
+    _compiled(simulation_template.id)
+
+    TemplateScenario.objects.get(id=simulation_template.id).delete()
+
+    assert simulation_template.id not in question_collection._compiled
@@ -0,0 +1,146 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from app.models.course import Course
+from app.models.template_scenario import TemplateScenario
+from history.models.leaderboard import GLOBAL_BOARD
+from history.models.result import Result
+from history.models.result_statistics import ResultStatistics
+from history.util import statistics
+from history.util.statistics import (
+    get_sketches,
+    rebuild_course_statistics,
+    update_result_statistics,
+)
+
+pytestmark = pytest.mark.django_db
+
+NOW = timezone.now()
+TODAY = timezone.localdate(NOW)
+YESTERDAY = TODAY - datetime.timedelta(days=1)
+
+
+@pytest.fixture
+def add_result(make_result, template):
+    def add_result(user, score, timestamp=NOW, template=template):
+        result = make_result(user, template, score, total_cost=score * 10)
+        # the timestamp is set on save, update() keeps the given one
+        Result.objects.filter(id=result.id).update(timestamp=timestamp)
+        result.refresh_from_db()
+        update_result_statistics(result)
+        return result
+
+    return add_result
+
+
+def _rows(template, course_id=GLOBAL_BOARD):
+    return {
+        row.day: (row.count, row.sketches["score"]["count"], row.sketches["score"]["max"])
+        for row in ResultStatistics.objects.filter(
+            template_scenario_id=template.id, course_id=course_id
+        )
+    }
+
+
+def test_results_are_added_to_the_row_of_their_day(make_user, add_result, template):
+    alice = make_user("alice")
+    add_result(alice, 40)
+    add_result(alice, 60)
+    add_result(alice, 90, timestamp=NOW - datetime.timedelta(days=1))
+
+    assert _rows(template) == {TODAY: (2, 2, 60), YESTERDAY: (1, 1, 90)}
+    row = ResultStatistics.objects.get(template_scenario_id=template.id, day=TODAY)
+    assert row.sketches["cost"]["sum"] == 1000
+
+
+def test_sketches_of_the_days_are_merged(make_user, add_result, template):
+    alice = make_user("alice")
+    for days, score in ((0, 10), (0, 20), (1, 30), (2, 40)):
+        add_result(alice, score, timestamp=NOW - datetime.timedelta(days=days))
+
+    sketches = get_sketches(template.id)
+    assert sketches["score"].count == 4
+    assert (sketches["score"].min, sketches["score"].max) == (10, 40)
+    assert sketches["score"].mean == 25
+    assert sketches["duration"].count == 4
+
+    sketches = get_sketches(template.id, date_from=YESTERDAY)
+    assert sketches["score"].count == 3
+    sketches = get_sketches(template.id, date_from=YESTERDAY, date_to=YESTERDAY)
+    assert sketches["score"].count == 1
+    assert sketches["score"].max == 30
+    assert get_sketches(template.id, course_id=1)["score"].count == 0
+
+
+def test_course_statistics_follow_users_and_scenarios(make_user, add_result, template):
+    alice, bob = make_user("alice"), make_user("bob")
+    other = TemplateScenario.objects.create(name="other")
+    add_result(alice, 70)
+    add_result(alice, 40, timestamp=NOW - datetime.timedelta(days=1))
+    add_result(bob, 50)
+    add_result(bob, 20, template=other)
+
+    course = Course.objects.create(name="course")
+    course.scenarios.add(template)
+    course.users.add(alice)
+    assert _rows(template, course.id) == {TODAY: (1, 1, 70), YESTERDAY: (1, 1, 40)}
+
+    # reverse direction: the course is added to the user
+    bob.course_set.add(course)
+    assert _rows(template, course.id) == {TODAY: (2, 2, 70), YESTERDAY: (1, 1, 40)}
+    assert _rows(other, course.id) == {}
+
+    # new results are added to the rebuilt rows
+    add_result(bob, 80)
+    assert _rows(template, course.id)[TODAY] == (3, 3, 80)
+
+    other.course_set.add(course)
+    assert _rows(other, course.id) == {TODAY: (1, 1, 20)}
+
+    course.users.remove(alice)
+    assert _rows(template, course.id) == {TODAY: (2, 2, 80)}
+    course.scenarios.remove(other)
+    assert _rows(other, course.id) == {}
+
+    bob.course_set.clear()
+    assert _rows(template, course.id) == {}
+    # the statistics of all users are not changed by courses
+    assert _rows(template) == {TODAY: (3, 3, 80), YESTERDAY: (1, 1, 40)}
+
+    course.users.add(alice)
+    course.delete()
+    assert not ResultStatistics.objects.exclude(course_id=GLOBAL_BOARD).exists()
+
+
+def test_added_users_are_merged_into_the_course_statistics(
+    make_user, add_result, template, monkeypatch
+):
+    alice, bob, carol = make_user("alice"), make_user("bob"), make_user("carol")
+    add_result(alice, 70)
+    add_result(bob, 50)
+    add_result(bob, 30, timestamp=NOW - datetime.timedelta(days=1))
+    add_result(carol, 90)
+    course = Course.objects.create(name="course")
+    course.scenarios.add(template)
+    course.users.add(alice)
+
+    def rebuild(*args, **kwargs):
+        raise AssertionError("the statistics should not be rebuilt")
+
+    monkeypatch.setattr(statistics, "rebuild_course_statistics", rebuild)
+    course.users.add(bob)
+    carol.course_set.add(course)
+    merged = {
+        row.day: (row.count, row.sketches)
+        for row in ResultStatistics.objects.filter(course_id=course.id)
+    }
+    assert _rows(template, course.id) == {TODAY: (3, 3, 90), YESTERDAY: (1, 1, 30)}
+
+    monkeypatch.undo()
+    rebuild_course_statistics(course.id)
+    assert merged == {
+        row.day: (row.count, row.sketches)
+        for row in ResultStatistics.objects.filter(course_id=course.id)
+    }
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from app.decorators import decorators
+from app.models.user_scenario import ScenarioState
+from app.src.util.admission_util import AdmissionController
+from custom_user.models import User
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+WORKPACK = {"type": "SIMULATION", "actions": {"days": 10}, "members": [{"skill_type": "junior", "change": 2}]}
+
+
+@pytest.fixture
+def started(scenario):
+    client, scenario_id = scenario
+    client.post("/api/sim/next", {"scenario_id": scenario_id, "type": "START"}, format="json")
+    return client, scenario_id
+
+
+def _events(response, content=None):
+    events = []
+    if content is None:
+        content = b"".join(response.streaming_content)
+    for chunk in content.decode().split("\n\n"):
+        if chunk:
+            event, data = chunk.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _day(scenario_id):
+    return ScenarioState.objects.get(user_scenario_id=scenario_id).day
+
+
+def test_stream_sends_days_then_response(started):
+    client, scenario_id = started
+
+    r = client.post("/api/sim/stream", {**WORKPACK, "scenario_id": scenario_id}, format="json")
+
+    assert r.status_code == 200
+    assert r["Content-Type"] == "text/event-stream"
+    events = _events(r)
+    names = [name for name, _ in events]
+    assert names == ["day"] * (len(events) - 1) + ["response"]
+    assert len(events) > 1
+    assert events[-1][1]["state"]["day"] == 10
+    assert _day(scenario_id) == 10
+
+
+def test_stream_sends_error_of_failed_step(started):
+    client, scenario_id = started
+
+    r = client.post(
+        "/api/sim/stream",
+        {**WORKPACK, "actions": {"days": 1, "meetings": 30}, "scenario_id": scenario_id},
+        format="json",
+    )
+
+    (event, data), = _events(r)
+    assert event == "error"
+    assert "meetings" in data["error-message"]
+    assert _day(scenario_id) == 0
+
+
+def test_stream_holds_admission_until_closed(started, monkeypatch):
+    client, scenario_id = started
+    controller = AdmissionController(max_requests=2, max_user_requests=1, max_queue=1, timeout=0)
+    monkeypatch.setattr(decorators, "get_admission_controller", lambda: controller)
+
+    r = client.post("/api/sim/stream", {**WORKPACK, "scenario_id": scenario_id}, format="json")
+    assert controller.metrics()["running"] == 1
+
+    rejected = client.post("/api/sim/stream", {**WORKPACK, "scenario_id": scenario_id}, format="json")
+    assert rejected.status_code == 429
+    assert rejected["Retry-After"]
+
+    assert _events(r)[-1][0] == "response"
+    assert controller.metrics()["running"] == 0
+
+
+def test_stream_under_asgi_is_sent_from_event_loop(started):
+    _, scenario_id = started
+    client = AsyncClient()
+    client.force_login(User.objects.get(username="student"))
+
+    async def stream():
+        r = await client.post(
+            "/api/sim/stream", {**WORKPACK, "scenario_id": scenario_id}, content_type="application/json"
+        )
+        # Django would read a sync iterator completely before sending it
+        assert r.is_async
+        return r, b"".join([chunk async for chunk in r.streaming_content])
+
+    r, content = async_to_sync(stream)()
+
+    names = [name for name, _ in _events(r, content)]
+    assert len(names) > 1
+    assert names == ["day"] * (len(names) - 1) + ["response"]
+    assert _day(scenario_id) == 10
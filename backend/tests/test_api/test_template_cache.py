@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from django.core.cache import cache
+
+from app.models.action import Action
+from app.models.answer import Answer
+from app.models.event import Event, EventEffect
+from app.models.management_goal import ManagementGoal
+from app.models.model_selection import ModelSelection
+from app.models.question import Question
+from app.models.question_collection import QuestionCollection
+from app.models.score_card import ScoreCard
+from app.models.simulation_end import SimulationEnd
+from app.models.simulation_fragment import SimulationFragment
+from app.models.template_scenario import TemplateScenario
+from app.serializers.template_scenario import TemplateScenarioSerializer
+
+pytestmark = pytest.mark.django_db
+
+DATA = {
+    "name": "cached",
+    "story": "story",
+    "management_goal": {"budget": 1000, "duration": 10, "easy_tasks": 1, "medium_tasks": 2, "hard_tasks": 3},
+    "score_card": {},
+    "question_collections": [
+        {"index": 1, "text": "questions", "questions": [{"question_index": 0, "text": "question", "multi": False, "answers": [{"label": "yes", "points": 1}, {"label": "no", "points": 0}]}]}
+    ],
+    "simulation_fragments": [
+        {"index": 0, "text": "fragment", "actions": [{"title": "meetings"}], "simulation_end": {"limit": "5", "type": "duration", "limit_type": "ge"}}
+    ],
+    "model_selections": [{"index": 2, "text": "model", "waterfall": True, "kanban": False, "scrum": True}],
+    "events": [{"text": "event", "trigger_type": "day", "trigger_value": 1, "trigger_comparator": "ge", "effects": [{"type": "budget", "value": 2}]}],
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # ids are reused between tests, the cached JSON must not be
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def templates():
+    result = []
+    for name in ("first", "second"):
+        serializer = TemplateScenarioSerializer(data={**DATA, "name": name})
+        assert serializer.is_valid(), serializer.errors
+        result.append(serializer.save())
+    return result
+
+
+@pytest.fixture
+def client(make_user, client_for):
+    return client_for(make_user("creator", creator=True))
+
+
+def _serialized(template_id):
+    # the response of the view before the JSON was cached
+    return json.loads(json.dumps(TemplateScenarioSerializer(TemplateScenario.objects.get(id=template_id)).data))
+
+
+def _save(obj, **fields):
+    for name, value in fields.items():
+        setattr(obj, name, value)
+    obj.save()
+
+
+EDITS = {
+    "template": lambda t: _save(TemplateScenario.objects.get(id=t.id), name="renamed"),
+    "management_goal": lambda t: _save(ManagementGoal.objects.get(template_scenario=t), budget=5),
+    "score_card": lambda t: _save(ScoreCard.objects.get(template_scenario=t), budget_limit=7),
+    "question_collection": lambda t: _save(QuestionCollection.objects.get(template_scenario=t), text="changed"),
+    "question": lambda t: _save(Question.objects.get(question_collection__template_scenario=t), text="changed"),
+    "answer": lambda t: _save(Answer.objects.filter(question__question_collection__template_scenario=t).first(), points=9),
+    "simulation_fragment": lambda t: _save(SimulationFragment.objects.get(template_scenario=t), text="changed"),
+    "simulation_end": lambda t: _save(SimulationEnd.objects.get(simulation_fragment__template_scenario=t), limit="8"),
+    "action": lambda t: _save(Action.objects.get(simulation_fragment__template_scenario=t), title="salary"),
+    "action added": lambda t: Action.objects.create(simulation_fragment=SimulationFragment.objects.get(template_scenario=t), title="overtime"),
+    "action deleted": lambda t: Action.objects.get(simulation_fragment__template_scenario=t).delete(),
+    "model_selection": lambda t: _save(ModelSelection.objects.get(template_scenario=t), kanban=True),
+    "event": lambda t: _save(Event.objects.get(template_scenario=t), text="changed"),
+    "event_effect": lambda t: _save(EventEffect.objects.get(event__template_scenario=t), value=4),
+}
+
+
+@pytest.mark.parametrize("edit", EDITS.values(), ids=EDITS.keys())
+def test_cached_json_is_replaced_after_edit(client, templates, edit):
+    first, second = templates
+    before = client.get(f"/api/template-scenario/{first.id}").json()
+    assert before == _serialized(first.id)
+
+    edit(first)
+
+    after = client.get(f"/api/template-scenario/{first.id}").json()
+    assert after != before
+    assert after == _serialized(first.id)
+    # the cached JSON of the other template stays valid
+    assert TemplateScenario.objects.get(id=second.id).version == second.version
+
+
+def test_list_matches_serializer(client, templates):
+    response = client.get("/api/template-scenario")
+
+    assert response.status_code == 200
+    assert response.json() == [_serialized(t.id) for t in templates]
+    # served from the cache
+    assert client.get("/api/template-scenario").content == response.content
+    assert client.get("/api/template-scenario/999999").status_code == 500
+
+
+def test_not_modified(client, templates):
+    first, _ = templates
+    response = client.get(f"/api/template-scenario/{first.id}")
+    etag = response["ETag"]
+
+    response = client.get(f"/api/template-scenario/{first.id}", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not response.content
+
+    # the list has its own ETag
+    assert client.get("/api/template-scenario", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    _save(QuestionCollection.objects.get(template_scenario=first), text="changed")
+    response = client.get(f"/api/template-scenario/{first.id}", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
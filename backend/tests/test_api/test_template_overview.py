@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.models.course import Course
+from app.models.template_scenario import TemplateScenario
+from custom_user.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def templates():
+    return [TemplateScenario.objects.create(name=f"template {i}", story=f"story {i}") for i in range(4)]
+
+
+@pytest.fixture
+def student(make_user, templates):
+    """Student in two courses with the first two templates, the third template is
+    only in a course of another student."""
+    user = make_user("student", student=True)
+    first = Course.objects.create(name="first")
+    first.users.add(user)
+    first.scenarios.add(templates[0], templates[1])
+    second = Course.objects.create(name="second")
+    second.users.add(user)
+    second.scenarios.add(templates[1])
+    other = Course.objects.create(name="other")
+    other.users.add(make_user("other", student=True))
+    other.scenarios.add(templates[2])
+    return user
+
+
+def _overview(template, tries=0, max_score=0):
+    return {
+        "id": template.id,
+        "name": template.name,
+        "story": template.story,
+        "studio_template_id": "",
+        "tries": tries,
+        "max_score": max_score,
+    }
+
+
+def test_student_sees_templates_of_courses(student, templates, client_for, make_result):
+    for score in (10, 30, 20):
+        make_result(student, templates[1], score)
+    # results of other users and templates are not counted
+    make_result(student, templates[2], 50)
+    make_result(User.objects.get(username="other"), templates[1], 90)
+    client = client_for(student)
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get("/api/template-overview")
+
+    assert r.status_code == 200
+    # each template once, also if it is in several courses of the student
+    assert r.json() == [_overview(templates[0]), _overview(templates[1], tries=3, max_score=30)]
+    # templates and results are read with one query each
+    assert len(ctx.captured_queries) == 2
+
+    r = client.get(f"/api/template-overview/{templates[1].id}")
+    assert r.json() == _overview(templates[1], tries=3, max_score=30)
+
+
+@pytest.mark.parametrize("template_index", [2, 3])
+def test_student_cannot_see_other_templates(student, templates, client_for, template_index):
+    r = client_for(student).get(f"/api/template-overview/{templates[template_index].id}")
+
+    assert r.status_code == 403
+
+
+def test_staff_sees_all_templates(make_user, templates, client_for, make_result):
+    staff = make_user("staff", staff=True)
+    make_result(staff, templates[3], 40)
+    client = client_for(staff)
+
+    r = client.get("/api/template-overview")
+
+    assert r.status_code == 200
+    assert r.json() == [_overview(t) for t in templates[:3]] + [_overview(templates[3], tries=1, max_score=40)]
+    assert client.get(f"/api/template-overview/{templates[2].id}").json() == _overview(templates[2])
+    assert client.get("/api/template-overview/999999").status_code == 403
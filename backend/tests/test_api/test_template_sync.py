@@ -0,0 +1,163 @@
+import copy
+
+import pytest
+
+from app.models.answer import Answer
+from app.models.event import EventEffect
+from app.models.question import Question
+from app.models.simulation_fragment import SimulationFragment
+from app.models.template_scenario import TemplateScenario
+from app.serializers.template_scenario import TemplateScenarioSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def _answers(*points):
+    return [{"label": f"answer {p}", "points": p} for p in points]
+
+
+DATA = {
+    "name": "template",
+    "story": "story",
+    "management_goal": {"budget": 1000, "duration": 10, "easy_tasks": 1, "medium_tasks": 2, "hard_tasks": 3},
+    "score_card": {},
+    "question_collections": [
+        {
+            "index": 1,
+            "text": "questions",
+            "questions": [
+                {"question_index": 0, "text": "first", "multi": False, "answers": _answers(1, 0)},
+                {"question_index": 1, "text": "second", "multi": True, "answers": _answers(2, 3, 0)},
+            ],
+        }
+    ],
+    "simulation_fragments": [
+        {"index": 0, "text": "start", "actions": [{"title": "meetings"}], "simulation_end": {"limit": "5", "type": "duration", "limit_type": "ge"}},
+        {"index": 3, "text": "end", "actions": [], "simulation_end": {"limit": "9", "type": "duration", "limit_type": "ge"}},
+    ],
+    "model_selections": [{"index": 2, "text": "model", "waterfall": True, "kanban": False, "scrum": True}],
+    "events": [{"text": "event", "trigger_type": "day", "trigger_value": 1, "trigger_comparator": "ge", "effects": [{"type": "budget", "value": 2}]}],
+}
+
+
+def _save(data, instance=None, partial=False):
+    serializer = TemplateScenarioSerializer(instance, data=data, partial=partial)
+    assert serializer.is_valid(), serializer.errors
+    return serializer.save()
+
+
+def _ids(model, template, lookup):
+    return set(model.objects.filter(**{lookup: template}).values_list("id", flat=True))
+
+
+def _questions(template):
+    return {
+        q.question_index: (q.text, [(a.label, a.points) for a in q.answers.order_by("id")])
+        for q in Question.objects.filter(question_collection__template_scenario=template)
+    }
+
+
+@pytest.fixture
+def created():
+    return _save(copy.deepcopy(DATA))
+
+
+def test_create(created):
+    data = TemplateScenarioSerializer(created).data
+
+    assert created.version == 1
+    assert data["management_goal"]["hard_tasks"] == 3
+    assert [f["index"] for f in data["simulation_fragments"]] == [0, 3]
+    assert data["simulation_fragments"][0]["simulation_end"]["limit"] == "5"
+    assert data["simulation_fragments"][0]["actions"][0]["title"] == "meetings"
+    assert data["model_selections"][0]["scrum"] is True
+    assert data["events"][0]["effects"][0]["value"] == 2
+    assert _questions(created) == {
+        0: ("first", [("answer 1", 1), ("answer 0", 0)]),
+        1: ("second", [("answer 2", 2), ("answer 3", 3), ("answer 0", 0)]),
+    }
+
+
+def test_unchanged_update_writes_nothing(created):
+    answers = _ids(Answer, created, "question__question_collection__template_scenario")
+
+    updated = _save(copy.deepcopy(DATA), created)
+
+    assert updated.version == 1
+    assert _ids(Answer, created, "question__question_collection__template_scenario") == answers
+
+
+def test_components_are_added_removed_and_reordered(created):
+    data = copy.deepcopy(DATA)
+    fragment_ids = _ids(SimulationFragment, created, "template_scenario")
+    # the question collection and the model selection swap places
+    data["question_collections"][0]["index"] = 2
+    data["model_selections"][0]["index"] = 1
+    # a fragment is added and the last one gets a new end
+    data["simulation_fragments"].append(
+        {"index": 4, "text": "new", "actions": [{"title": "x"}, {"title": "y"}], "simulation_end": {"limit": "1", "type": "duration", "limit_type": "ge"}}
+    )
+    data["simulation_fragments"][1]["simulation_end"]["limit"] = "12"
+    data["events"] = []
+
+    updated = _save(data, created)
+
+    result = TemplateScenarioSerializer(updated).data
+    assert updated.version == 2
+    assert [(f["index"], f["text"], f["simulation_end"]["limit"], len(f["actions"])) for f in result["simulation_fragments"]] == [
+        (0, "start", "5", 1),
+        (3, "end", "12", 0),
+        (4, "new", "1", 2),
+    ]
+    # fragments are matched by index and keep their ids
+    assert fragment_ids < _ids(SimulationFragment, updated, "template_scenario")
+    assert [(q["index"], len(q["questions"])) for q in result["question_collections"]] == [(2, 2)]
+    assert [m["index"] for m in result["model_selections"]] == [1]
+    assert result["events"] == []
+    assert not EventEffect.objects.exists()
+
+
+def test_questions_and_answers_are_synced(created):
+    data = copy.deepcopy(DATA)
+    answers = _ids(Answer, created, "question__question_collection__template_scenario")
+    questions = data["question_collections"][0]["questions"]
+    questions[0]["answers"][1]["points"] = 5
+    questions[0]["answers"].append({"label": "added", "points": 1})
+    questions[1]["text"] = "changed"
+    questions[1]["answers"] = questions[1]["answers"][:1]
+    questions.append({"question_index": 2, "text": "third", "multi": False, "answers": _answers(4)})
+
+    updated = _save({"question_collections": data["question_collections"]}, created, partial=True)
+
+    assert updated.version == 2
+    assert _questions(updated) == {
+        0: ("first", [("answer 1", 1), ("answer 0", 5), ("added", 1)]),
+        1: ("changed", [("answer 2", 2)]),
+        2: ("third", [("answer 4", 4)]),
+    }
+    # answers are matched by position and keep their ids
+    remaining = _ids(Answer, updated, "question__question_collection__template_scenario")
+    assert len(answers & remaining) == 3
+
+    # removing a question also removes its answers
+    questions.pop(0)
+    for i, q in enumerate(questions):
+        q["question_index"] = i
+    updated = _save({"question_collections": data["question_collections"]}, updated, partial=True)
+    assert updated.version == 3
+    assert list(_questions(updated)) == [0, 1]
+    assert Answer.objects.count() == 2
+
+
+def test_version_is_bumped_once_per_update(created):
+    _save({"name": "renamed", "story": "other"}, created, partial=True)
+    assert TemplateScenario.objects.get(id=created.id).version == 2
+
+    data = copy.deepcopy(DATA)
+    data["management_goal"]["budget"] = 5
+    data["score_card"] = {"budget_limit": 3}
+    data["simulation_fragments"][0]["text"] = "changed"
+    data["events"][0]["effects"][0]["value"] = 7
+    updated = _save(data, TemplateScenario.objects.get(id=created.id))
+    assert updated.version == 3
+    assert TemplateScenario.objects.get(id=created.id).version == 3
@@ -0,0 +1,38 @@
+import pytest
+
+from app.models.scenario import ScenarioConfig
+from app.models.task import Task
+from app.models.team import Member, SkillType, Team
+from app.models.user_scenario import ScenarioState, UserScenario
+from simulation_framework.wrappers import FastSecenario, FastTasks
+
+
+def _session(tasks=200, **config):
+    """Returns a session that is only kept in memory."""
+    config = ScenarioConfig(
+        id=1, stress_weekend_reduction=0.1, done_tasks_per_meeting=20, **config
+    )
+    scenario = UserScenario(id=1, config=config)
+    scenario.state = ScenarioState(id=1)
+    scenario.team = Team(id=1)
+    junior = SkillType(id=1, name="junior", cost_per_day=200, throughput=2, error_rate=0.2, development_quality=30)
+    senior = SkillType(id=2, name="senior", cost_per_day=500, throughput=6, error_rate=0.05, development_quality=90)
+    members = [
+        Member(id=1, skill_type=junior),
+        Member(id=2, skill_type=junior),
+        Member(id=3, skill_type=senior),
+    ]
+    session = FastSecenario(
+        scenario,
+        [],
+        FastTasks({Task(id=i + 1, difficulty=i % 3 + 1) for i in range(tasks)}),
+        id=1,
+        config=1,
+    )
+    session.set_members(members)
+    return session
+
+
+@pytest.fixture
+def make_session():
+    return _session
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from app.src.util.admission_util import AdmissionController, AdmissionRejected
+
+
+def _hold(controller, user_id, started, release):
+    with controller.admit(user_id):
+        started.set()
+        release.wait(5)
+
+
+def _start(controller, user_id, release):
+    started = threading.Event()
+    t = threading.Thread(target=_hold, args=(controller, user_id, started, release))
+    t.start()
+    assert started.wait(5)
+    return t
+
+
+def test_rejects_user_over_limit():
+    controller = AdmissionController(max_requests=4, max_user_requests=1, max_queue=8, timeout=0.05)
+    release = threading.Event()
+    t = _start(controller, 1, release)
+
+    with pytest.raises(AdmissionRejected) as e:
+        with controller.admit(1):
+            pass
+    assert e.value.reason == "user"
+    assert e.value.retry_after >= 1
+
+    # other users are not affected
+    with controller.admit(2):
+        pass
+
+    release.set()
+    t.join()
+    metrics = controller.metrics()
+    assert metrics["rejected_user"] == 1
+    assert metrics["admitted"] == 2
+    assert metrics["running"] == 0
+
+
+def test_queued_request_runs_when_slot_is_free():
+    controller = AdmissionController(max_requests=1, max_user_requests=1, max_queue=8, timeout=5)
+    release = threading.Event()
+    t = _start(controller, 1, release)
+
+    threading.Timer(0.05, release.set).start()
+    with controller.admit(2):
+        assert controller.metrics()["running"] == 1
+    t.join()
+
+    metrics = controller.metrics()
+    assert metrics["queued"] == 1
+    assert metrics["max_queue_depth"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_rejects_when_queue_is_full():
+    controller = AdmissionController(max_requests=1, max_user_requests=1, max_queue=0, timeout=5)
+    release = threading.Event()
+    t = _start(controller, 1, release)
+
+    with pytest.raises(AdmissionRejected) as e:
+        with controller.admit(2):
+            pass
+    assert e.value.reason == "capacity"
+
+    release.set()
+    t.join()
+    assert controller.metrics()["rejected_capacity"] == 1
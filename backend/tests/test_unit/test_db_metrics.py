@@ -0,0 +1,18 @@
+from app.db.metrics import ConnectionMetrics
+
+
+def test_connection_metrics():
+    metrics = ConnectionMetrics()
+    metrics.connected(0.002)
+    metrics.connected(0.004)
+    metrics.closed(10)
+    metrics.health_check_failed()
+
+    m = metrics.as_dict()
+    assert m["open"] == 1
+    assert m["connects"] == 2
+    assert m["closes"] == 1
+    assert m["health_check_failures"] == 1
+    assert round(m["avg_connect_ms"], 6) == 3.0
+    assert round(m["max_connect_ms"], 6) == 4.0
+    assert m["avg_age_s"] == 10
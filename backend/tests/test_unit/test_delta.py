@@ -0,0 +1,86 @@
+from django.core.cache import cache
+
+from app.dto.response import DeltaResponse
+from app.src.util.delta_util import diff_responses, encode_step_response
+
+
+def _member(id, stress=0.2, skill_type="junior"):
+    return {
+        "id": id,
+        "motivation": 0.75,
+        "familiarity": 0.0,
+        "stress": stress,
+        "xp": 0.0,
+        "skill_type": {"id": 1, "name": skill_type},
+    }
+
+
+def _response(day, members, **kwargs):
+    return {
+        "type": "SIMULATION",
+        "text": "",
+        "state": {"component_counter": 1, "step_counter": day, "day": day, "cost": 100.0 * day},
+        "tasks": {"tasks_todo": 10 - day, "tasks_done": day},
+        "members": members,
+        **kwargs,
+    }
+
+
+def test_diff_contains_only_changes():
+    old = _response(1, [_member(1), _member(2)], actions=[{"action": "meetings"}])
+    new = _response(2, [_member(1, stress=0.3), _member(3)], actions=[{"action": "meetings"}])
+
+    delta = diff_responses(old, new, 4, 5).dict()
+
+    assert DeltaResponse(**delta).dict() == delta
+    assert delta["changed"] == {
+        "state": {"step_counter": 2, "day": 2, "cost": 200.0},
+        "tasks": {"tasks_todo": 8, "tasks_done": 2},
+    }
+    assert delta["members"] == {
+        "added": [_member(3)],
+        "removed": [2],
+        "changed": [{"id": 1, "stress": 0.3}],
+    }
+    assert delta["removed"] == []
+
+
+def test_diff_of_new_component_type():
+    old = _response(1, [], actions=[{"action": "meetings"}])
+    new = _response(1, [], type="QUESTION", question_collection={"id": 1, "questions": []})
+
+    delta = diff_responses(old, new, 1, 2).dict()
+
+    assert delta["type"] == "QUESTION"
+    assert delta["changed"] == {"type": "QUESTION", "question_collection": {"id": 1, "questions": []}}
+    assert delta["removed"] == ["actions"]
+
+
+def test_diff_lists_values_removed_from_objects():
+    old = _response(1, [])
+    old["tasks"]["tasks_bug"] = 2
+    new = _response(1, [])
+    del new["state"]["cost"]
+    new["state"]["counter"] = None
+
+    delta = diff_responses(old, new, 1, 2).dict()
+
+    assert delta["changed"] == {"state": {"counter": None}}
+    assert delta["removed"] == ["state.cost", "tasks.tasks_bug"]
+
+
+def test_encode_sends_full_response_without_matching_version():
+    cache.delete("step-snapshot-7")
+    first = encode_step_response(7, _response(1, [_member(1)]), 1)
+    assert first["delta"] is False
+    assert first["state_version"] == 1
+    assert first["members"] == [_member(1)]
+
+    # client has seen an older version than the last response
+    second = encode_step_response(7, _response(2, [_member(1)]), 2, base_version=0)
+    assert second["delta"] is False
+
+    third = encode_step_response(7, _response(3, [_member(1)]), 3, base_version=2)
+    assert third["delta"] is True
+    assert third["members"] == {"added": [], "removed": [], "changed": []}
+    assert third["changed"]["state"]["day"] == 3
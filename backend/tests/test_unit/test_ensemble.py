@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.dto.request import Workpack
+from simulation_framework.ensemble import EnsembleParameters, EnsembleSimulation
+
+
+def _config(randomness="full", task_selection="random"):
+    return SimpleNamespace(
+        stress_weekend_reduction=0.1,
+        stress_overtime_increase=0.05,
+        stress_error_increase=0.02,
+        done_tasks_per_meeting=20,
+        train_skill_increase_rate=0.1,
+        cost_member_team_event=500.0,
+        randomness=randomness,
+        task_selection=task_selection,
+    )
+
+
+def _skill_types():
+    return [
+        SimpleNamespace(throughput=2, error_rate=0.2, cost_per_day=200, development_quality=30),
+        SimpleNamespace(throughput=4, error_rate=0.1, cost_per_day=350, development_quality=60),
+        SimpleNamespace(throughput=7, error_rate=0.05, cost_per_day=500, development_quality=95),
+    ]
+
+
+def _params(replicas, **kwargs):
+    return EnsembleParameters.from_models(
+        [_config(**kwargs)] * replicas,
+        [_skill_types()] * replicas,
+        [1] * 50 + [2] * 100 + [3] * 50,
+    )
+
+
+def test_ensemble_shapes():
+    ensemble = EnsembleSimulation(_params(7), seed=1)
+    ensemble.simulate(Workpack(days=5, meetings=3, training=2))
+
+    assert ensemble.stress.shape == (7, 3)
+    assert ensemble.done.shape == (7, 200)
+    assert ensemble.np_records().shape == (7, 9)
+    assert list(ensemble.day) == [5] * 7
+    assert list(ensemble.cost) == [5 * 1050] * 7
+
+
+def test_ensemble_is_reproducible_with_seed():
+    workpack = Workpack(days=10, meetings=4, unittest=True, bugfix=True)
+    records = []
+    for _ in range(2):
+        ensemble = EnsembleSimulation(_params(5), seed=42)
+        ensemble.simulate(workpack)
+        records.append(ensemble.np_records())
+
+    assert np.array_equal(records[0], records[1])
+
+
+def test_ensemble_without_randomness_solves_same_number_of_tasks():
+    ensemble = EnsembleSimulation(_params(4, randomness="none"), seed=3)
+    ensemble.simulate(Workpack(days=10))
+
+    solved = ensemble.done.sum(axis=1)
+    assert len(set(solved)) == 1
+    assert solved[0] > 0
+
+
+def test_ensemble_hardest_first_solves_hard_tasks_first():
+    ensemble = EnsembleSimulation(_params(3, task_selection="hardest-first"), seed=3)
+    ensemble.simulate(Workpack(days=2))
+
+    difficulty = ensemble.params.difficulty
+    assert (ensemble.done & (difficulty < 3)).sum() == 0
+    assert (ensemble.done & (difficulty == 3)).sum() > 0
+
+
+def test_team_event_and_integration_test_take_one_day_each():
+    ensemble = EnsembleSimulation(_params(2), seed=3)
+    ensemble.simulate(Workpack(days=5, teamevent=True, integrationtest=True))
+
+    assert list(ensemble.day) == [4, 4]
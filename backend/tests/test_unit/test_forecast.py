@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+
+from app.dto.request import SimulationRequest, Workpack
+from app.src.forecast import forecast
+
+
+def _request(**workpack):
+    return SimulationRequest(scenario_id=1, actions=Workpack(**workpack))
+
+
+def test_forecast_with_same_seed_is_equal(make_session):
+    session = make_session()
+    req = _request(days=10, meetings=2)
+
+    first = forecast(session, req, replicas=8, seed=7)
+    second = forecast(session, req, replicas=8, seed=7)
+
+    assert first == second
+    assert first.days.mean == 10
+    assert first.tasks_done.mean > 0
+
+
+def test_forecast_does_not_change_session_or_global_random_state(make_session):
+    session = make_session()
+    random.seed(1)
+    np.random.seed(1)
+    state, np_state = random.getstate(), np.random.get_state()
+
+    forecast(session, _request(days=10, meetings=2), replicas=4, seed=3)
+
+    assert random.getstate() == state
+    np.testing.assert_equal(np.random.get_state(), np_state)
+    assert session.scenario.state.day == 0
+    assert not session.tasks.solved()
@@ -0,0 +1,38 @@
+import os
+from types import SimpleNamespace
+
+import mongomock
+
+from app.db.mongo import MongoClientManager
+
+
+def _manager():
+    created = []
+
+    def factory(config, listener):
+        client = mongomock.MongoClient()
+        created.append(client)
+        return client
+
+    return MongoClientManager(factory=factory, config=SimpleNamespace(mongo_name="test")), created
+
+
+def test_client_is_created_once_per_process():
+    manager, created = _manager()
+    assert manager.get_client() is manager.get_client()
+    assert len(created) == 1
+
+    manager.get_collection("scenario_templates").insert_one({"scenario": []})
+    assert manager.get_database()["scenario_templates"].count_documents({}) == 1
+
+    # a forked process must not use the client of its parent
+    manager._pid = os.getpid() + 1
+    assert manager.get_client() is not created[0]
+    assert len(created) == 2
+
+
+def test_metrics_report_health():
+    manager, _ = _manager()
+    metrics = manager.metrics()
+    assert metrics["clients_created"] == 1
+    assert metrics["healthy"] is True
@@ -0,0 +1,42 @@
+import base64
+import json
+
+import pytest
+
+from app.exceptions import RequestParamException
+from app.src.util.pagination_util import (
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+    parse_limit,
+)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", {"id": "x"}, {"id": True}, {"id": None}, {"pk": 1}, [1]])
+def test_invalid_cursor(cursor):
+    if not isinstance(cursor, str):
+        cursor = base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+    with pytest.raises(RequestParamException):
+        decode_cursor(cursor)
+
+
+def test_parse_fields():
+    available = ["id", "username", "admin"]
+    assert parse_fields(None, available) is None
+    assert parse_fields("id, username", available) == ["id", "username"]
+    with pytest.raises(RequestParamException):
+        parse_fields("id,password", available)
+    with pytest.raises(RequestParamException):
+        parse_fields(",", available)
+
+
+def test_parse_limit():
+    assert parse_limit(None) is None
+    assert parse_limit("10", max_limit=10) == 10
+    for value in ("0", "11", "ten"):
+        with pytest.raises(RequestParamException):
+            parse_limit(value, max_limit=10)
@@ -0,0 +1,82 @@
+from itertools import product
+from types import SimpleNamespace
+
+from app.dto.response import (
+    ManagementGoalDTO,
+    MemberDTO,
+    ScenarioStateDTO,
+    SimulationResponse,
+    TasksStatusDTO,
+    TeamStatsDTO,
+)
+from app.models.task import Task
+from app.models.team import Member, SkillType
+from app.models.user_scenario import ScenarioState
+from app.serializers.team import MemberSerializer
+from app.serializers.user_scenario import ScenarioStateSerializer
+from app.src.util.member_util import get_member_report
+from app.src.util.task_util import get_tasks_status
+from app.src.util.user_scenario_util import get_scenario_state_dto
+from simulation_framework.wrappers import FastTasks
+
+
+def _members():
+    junior = SkillType(id=1, name="junior")
+    senior = SkillType(id=2, name="senior")
+    return [
+        Member(id=1, xp=0.5, motivation=0.7, familiarity=0.1, stress=0.2, skill_type=junior),
+        Member(id=2, xp=3, motivation=1, familiarity=0, stress=0.35, skill_type=senior),
+    ]
+
+
+def _tasks():
+    # one task for every combination of flags
+    flags = product([False, True], repeat=5)
+    return FastTasks(
+        {
+            Task(id=i + 1, difficulty=1, done=d, bug=b, unit_tested=u, integration_tested=it, correct_specification=c)
+            for i, (d, b, u, it, c) in enumerate(flags)
+        }
+    )
+
+
+def test_member_report_matches_serializer():
+    members = _members()
+    expected = [MemberDTO(**m) for m in MemberSerializer(members, many=True).data]
+
+    assert [MemberDTO(**m) for m in get_member_report(members)] == expected
+
+
+def test_scenario_state_matches_serializer():
+    state = ScenarioState(component_counter=2, step_counter=5, day=12, cost=1234.5, budget=9000, total_tasks=200)
+    scenario = SimpleNamespace(state=state)
+
+    expected = ScenarioStateDTO(**ScenarioStateSerializer(state).data)
+    assert ScenarioStateDTO(**get_scenario_state_dto(scenario)) == expected
+
+
+def test_tasks_status_matches_cached_tasks():
+    tasks = _tasks()
+    status = get_tasks_status(SimpleNamespace(tasks=tasks))
+
+    assert TasksStatusDTO(**status).dict() == status
+    assert status == {
+        "tasks_todo": len(tasks.todo()),
+        "tasks_done": len(tasks.done()),
+        "tasks_unit_tested": len(tasks.unit_tested()),
+        "tasks_integration_tested": len(tasks.integration_tested()),
+        "tasks_bug": len(tasks.bug()),
+    }
+
+
+def test_constructed_response_is_valid():
+    scenario = SimpleNamespace(state=ScenarioState(budget=100, total_tasks=10))
+    response = SimulationResponse.construct(
+        management=ManagementGoalDTO(budget=100, duration=20, tasks=10),
+        tasks=get_tasks_status(SimpleNamespace(tasks=_tasks())),
+        state=get_scenario_state_dto(scenario),
+        members=get_member_report(_members()),
+        team=TeamStatsDTO(motivation=0.85, familiarity=0.05, stress=0.275),
+    )
+
+    assert SimulationResponse(**response.dict()).dict() == response.dict()
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from history.util.sketch import QuantileSketch
+
+
+def _exact(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(8, 1) for _ in range(5000)]
+    sketch = QuantileSketch(0.01)
+    for v in values:
+        sketch.add(v)
+
+    assert sketch.count == 5000
+    assert sketch.mean == pytest.approx(sum(values) / len(values))
+    for q in (0.05, 0.25, 0.5, 0.75, 0.99):
+        assert sketch.quantile(q) == pytest.approx(_exact(values, q), rel=0.01)
+    assert sketch.quantile(0) == min(values)
+    assert sketch.quantile(1) == max(values)
+
+
+def test_merge_equals_single_sketch():
+    values = list(range(0, 300))
+    whole, a, b = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for v in values:
+        whole.add(v)
+        (a if v % 2 else b).add(v)
+    a.merge(b)
+
+    assert a.to_dict() == whole.to_dict()
+    assert a.quantile(0.5) == whole.quantile(0.5)
+
+
+def test_round_trip_and_histogram():
+    sketch = QuantileSketch()
+    for v in [0, 0, 12, 18, 28, 40]:
+        sketch.add(v)
+    copy = QuantileSketch.from_dict(sketch.to_dict())
+
+    assert copy.quantile(0.5) == sketch.quantile(0.5)
+    assert copy.zero_count == 2
+    histogram = copy.histogram(4)
+    assert [b["count"] for b in histogram] == [2, 2, 1, 1]
+    assert histogram[0]["lower"] == 0 and histogram[-1]["upper"] == 40
+
+
+def test_empty_and_invalid():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.mean is None
+    assert sketch.histogram() == []
+    with pytest.raises(ValueError):
+        sketch.quantile(2)
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(0.05))
@@ -0,0 +1,64 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.dto.request import SimulationRequest, Workpack
+from app.models.team import Team
+from app.src.simulation import simulate
+
+
+def _run(make_session, skip_ahead_days, seed):
+    session = make_session(
+        tasks=600, task_selection="random", skip_ahead_days=skip_ahead_days
+    )
+    session.rng = random.Random(seed)
+    session.np_rng = np.random.default_rng(seed)
+    simulate(SimulationRequest(scenario_id=1, actions=Workpack(days=20)), session)
+    assert session.scenario.state.day == 20
+    return len(session.tasks.solved()), session.scenario.state.cost
+
+
+def test_skip_ahead_has_same_distribution_as_day_loop(make_session):
+    seeds = range(200)
+    day_loop = [_run(make_session, 1, s) for s in seeds]
+    skip_ahead = [_run(make_session, 10, 10_000 + s) for s in seeds]
+
+    done = np.array([d for d, _ in day_loop], dtype=float)
+    done_skip = np.array([d for d, _ in skip_ahead], dtype=float)
+    # the means differ by less than 4 standard errors and the variances are
+    # within the bounds of an F-test (0.1%)
+    standard_error = np.sqrt(done.var() / len(done) + done_skip.var() / len(done_skip))
+    assert abs(done.mean() - done_skip.mean()) < 4 * standard_error
+    assert 0.6 < done_skip.var() / done.var() < 1.6
+
+    assert {c for _, c in day_loop} == {c for _, c in skip_ahead}
+
+
+def test_skip_ahead_without_tasks_equals_day_loop(make_session):
+    """Without tasks nothing is drawn, the stress drift and the cost of the
+    windows are exactly those of the day loop."""
+
+    def run(skip_ahead_days):
+        session = make_session(tasks=0, skip_ahead_days=skip_ahead_days, stress_overtime_increase=0.05)
+        simulate(SimulationRequest(scenario_id=1, actions=Workpack(days=17, overtime=2)), session)
+        return (
+            session.scenario.state.day,
+            session.scenario.state.cost,
+            [round(m.stress, 12) for m in session.members],
+        )
+
+    assert run(1) == run(5)
+
+
+@pytest.mark.parametrize("first_day", [0, 3])
+@pytest.mark.parametrize("reduction, increase", [(0.15, 0.1), (-0.15, 0.05), (0.3, -0.05), (0.0, 0.4)])
+def test_stress_drift_equals_daily_updates(first_day, reduction, increase):
+    shift, lower, upper = Team.stress_drift(first_day, 12, reduction, increase)
+    for start in (0.0, 0.1, 0.5, 0.95, 1.0):
+        stress = start
+        for d in range(12):
+            if (first_day + d) % 5 == 0:
+                stress = max(0, stress - reduction)
+            stress = min(1, increase + stress)
+            assert min(upper[d], max(lower[d], start + shift[d])) == pytest.approx(stress)
@@ -0,0 +1,39 @@
+import mongomock
+
+from app.src.util.studio_util import (
+    backfill_template_summaries,
+    list_templates,
+    template_document,
+)
+
+
+def _collection(n):
+    collection = mongomock.MongoClient().db.scenario_templates
+    for i in range(n):
+        collection.insert_one(
+            template_document([{"type": "BASE", "template_name": f"t{i}"}, {"type": "FRAGMENT"}])
+        )
+    return collection
+
+
+def test_pages_contain_every_template_once():
+    collection = _collection(7)
+    names, after = [], None
+    while True:
+        page, after = list_templates(collection, sort="name", limit=3, after=after)
+        assert len(page) <= 3
+        names += [t["name"] for t in page]
+        if after is None:
+            break
+    assert names == [f"t{i}" for i in range(7)]
+    assert page[0]["component_counts"] == {"BASE": 1, "FRAGMENT": 1}
+
+
+def test_templates_without_summary_are_backfilled():
+    collection = _collection(1)
+    collection.insert_one({"scenario": [{"type": "BASE", "template_name": "old"}]})
+
+    assert backfill_template_summaries(collection) == 1
+    page, after = list_templates(collection)
+    assert {t["name"] for t in page} == {"t0", "old"}
+    assert after is None
@@ -0,0 +1,128 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.dto.request import SimulationRequest, Workpack
+from app.models.task import (
+    Task,
+    TodoPools,
+    best_fit_order,
+    get_task_selection_policy,
+    select_any,
+    select_best_fit,
+    select_hardest_first,
+    select_random,
+)
+from app.src.simulation import simulate
+
+
+def _tasks():
+    tasks = {Task(id=i + 1, difficulty=i % 3 + 1) for i in range(30)}
+    # done tasks are never drawn
+    tasks |= {Task(id=100 + i, difficulty=3, done=True) for i in range(5)}
+    return tasks
+
+
+def _member(development_quality):
+    return SimpleNamespace(skill_type=SimpleNamespace(development_quality=development_quality))
+
+
+def _config(task_selection, randomness="full"):
+    return SimpleNamespace(task_selection=task_selection, randomness=randomness)
+
+
+class _NoRandom:
+    def randrange(self, n):
+        raise AssertionError("no random number should be drawn")
+
+
+def test_any_takes_tasks_in_order_of_todo_set_without_random():
+    tasks = _tasks()
+    todo = set(filter(lambda t: not t.done, tasks))
+    expected = [todo.pop() for _ in range(len(todo))]
+
+    pools = TodoPools(tasks, rng=_NoRandom())
+    drawn = [select_any(pools, _member(50)) for _ in range(len(pools))]
+
+    assert drawn == expected
+    assert len(pools) == 0
+    with pytest.raises(KeyError):
+        select_any(pools, _member(50))
+
+
+def test_random_draws_every_task_once_with_given_rng():
+    def draw(seed):
+        pools = TodoPools(_tasks(), rng=random.Random(seed))
+        return [select_random(pools, _member(50)).id for _ in range(len(pools))]
+
+    drawn = draw(1)
+    assert sorted(drawn) == list(range(1, 31))
+    assert draw(1) == drawn
+    assert draw(2) != drawn
+
+
+def test_hardest_first_takes_hard_tasks_first():
+    pools = TodoPools(_tasks())
+    difficulties = [select_hardest_first(pools, _member(10)).difficulty for _ in range(30)]
+
+    assert difficulties == [3] * 10 + [2] * 10 + [1] * 10
+
+
+def test_best_fit_takes_tasks_fitting_the_skill_first():
+    pools = TodoPools(_tasks())
+    junior = [select_best_fit(pools, _member(30)).difficulty for _ in range(12)]
+
+    assert junior == [1] * 10 + [2] * 2
+    # the pools are shared, the todo set follows them
+    assert len(pools) == len(pools.todo) == 18
+    assert select_any(pools, _member(30)).difficulty in (2, 3)
+
+
+def test_mixed_policies_keep_pool_positions():
+    pools = TodoPools(_tasks(), rng=random.Random(3))
+    policies = [select_any, select_random, select_best_fit, select_hardest_first]
+    drawn = []
+    for i in range(30):
+        drawn.append(policies[i % 4](pools, _member(60)))
+        for pool in pools.pools.values():
+            assert all(pools.positions[t] == j for j, t in enumerate(pool))
+        assert set(pools.positions) == pools.todo
+
+    assert sorted(t.id for t in drawn) == list(range(1, 31))
+
+
+def test_best_fit_order():
+    assert best_fit_order(30) == (1, 2, 3)
+    assert best_fit_order(60) == (2, 1, 3)
+    assert best_fit_order(95) == (3, 2, 1)
+    # equal distance to two difficulties prefers the harder one
+    assert best_fit_order(50) == (2, 1, 3)
+    assert best_fit_order(0) == (1, 2, 3)
+
+
+def test_get_task_selection_policy():
+    assert get_task_selection_policy(_config("any")) is select_any
+    assert get_task_selection_policy(_config("random")) is select_random
+    assert get_task_selection_policy(_config("best-fit")) is select_best_fit
+    assert get_task_selection_policy(_config("hardest-first")) is select_hardest_first
+    assert get_task_selection_policy(_config("unknown")) is select_any
+    # no random draws without randomness
+    assert get_task_selection_policy(_config("random", "none")) is select_any
+    assert get_task_selection_policy(_config("best-fit", "none")) is select_best_fit
+
+
+@pytest.mark.parametrize("skip_ahead_days", [0, 5])
+def test_todo_pools_are_built_once_per_step(make_session, monkeypatch, skip_ahead_days):
+    session = make_session(tasks=600, task_selection="best-fit", skip_ahead_days=skip_ahead_days)
+    built = []
+    todo_pools = type(session.tasks).todo_pools
+    monkeypatch.setattr(
+        type(session.tasks), "todo_pools", lambda self, rng: built.append(1) or todo_pools(self, rng)
+    )
+
+    simulate(SimulationRequest(scenario_id=1, actions=Workpack(days=10)), session)
+
+    assert len(built) == 1
+    assert session.scenario.state.day == 10
+    assert 0 < len(session.tasks.solved()) < 600
@@ -11,6 +11,10 @@
 echo "Apply database migrations"
 python /home/app/webapp/manage.py migrate
 
+# Create MongoDB indexes of the scenario studio
+echo "Prepare studio templates"
+python /home/app/webapp/manage.py prepare_studio_templates
+
 # Start server
 echo "Starting server"
 python /home/app/webapp/manage.py runserver 0.0.0.0:8000
\ No newline at end of file
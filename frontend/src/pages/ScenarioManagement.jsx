@@ -293,24 +293,17 @@ const ScenarioManagement = () => {
         queryParams.append("from", startDate);
       }
 
-      const res = await fetch(`${process.env.REACT_APP_DJANGO_HOST}/api/results?${queryParams.toString()}`, {
+      // the export endpoint streams the CSV of all results, however many there are
+      const res = await fetch(`${process.env.REACT_APP_DJANGO_HOST}/api/results/export?${queryParams.toString()}`, {
         method: "GET",
         credentials: "include",
       });
 
-      const response = await res.json();
+      const csvContent = await res.text();
 
-      if (Object.keys(response.data).length > 0) {
-        const headers = Object.keys(response.data[0]).map((key) => key);
-        const values = Object.values(response.data);
-
-        const csvContent = [
-          headers.join(";"),
-          ...values.map((obj) => headers.map((key) => JSON.stringify(obj[key] || "")).join(";")),
-        ].join("\n");
-
-        const encodedCsvContent = encodeURIComponent(csvContent);
-        const downloadLink = `data:text/csv;charset=utf-8,${encodedCsvContent}`;
+      // the first line holds the column names
+      if (res.ok && csvContent.trim().split("\n").length > 1) {
+        const downloadLink = URL.createObjectURL(new Blob([csvContent], { type: "text/csv;charset=utf-8" }));
 
         const link = document.createElement("a");
         link.href = downloadLink;
@@ -318,6 +311,7 @@ const ScenarioManagement = () => {
         document.body.appendChild(link);
         link.click();
         document.body.removeChild(link);
+        URL.revokeObjectURL(downloadLink);
       } else {
         toast({
           title: "No data available for this Scenario",
@@ -35,79 +35,28 @@ const ScenarioOverview = () => {
 
 
 
-  const fetchCourseScenarios = async () => {
-    try {
-      const response = await fetch(`${process.env.REACT_APP_DJANGO_HOST}/api/courses/user-scenarios`,
-          {
-            method: "GET",
-            credentials: "include",
-          });
-      const data = await response.json();
-      return data;
-    } catch (error) {
-      return [];
-    }
-  };
-
-
 const fetchScenarios = async () => {
   setIsLoading(true);
 
-  if (currentUser?.admin || currentUser?.creator) {
-    try {
-      const res = await fetch(
-        `${process.env.REACT_APP_DJANGO_HOST}/api/template-overview`,
-        {
-          method: "GET",
-          credentials: "include",
-        }
-      );
-      const fetchedScenarios = await res.json();
-
-      setScenarios(fetchedScenarios);
-      if ("error" in fetchedScenarios) {
-        return;
+  // the overview contains the scenarios the user has access to (all of them for
+  // admins and creators) with the tries and max score of the user
+  try {
+    const res = await fetch(
+      `${process.env.REACT_APP_DJANGO_HOST}/api/template-overview`,
+      {
+        method: "GET",
+        credentials: "include",
       }
-      setIsLoading(false);
-    } catch (error) {
-      setIsLoading(false);
-    }
-  } else {
-    try {
-      const scenarios = await fetchCourseScenarios();
-      const scenarioIds = scenarios.map(scenario => scenario.id);
-
-      const fetchRequests = scenarioIds.map(scenarioId =>
-        fetch(`${process.env.REACT_APP_DJANGO_HOST}/api/template-overview/${scenarioId}`, {
-          method: "GET",
-          credentials: "include",
-        })
-      );
-
-      const responses = await Promise.all(fetchRequests);
-      const fetchedScenarios = await Promise.all(responses.map(response => response.json()));
-
-      const uniqueFetchedScenarios = fetchedScenarios.reduce((accumulator, currentScenario) => {
-        const isDuplicate = accumulator.some(scenario => scenario.id === currentScenario.id);
-        if (!isDuplicate) {
-          accumulator.push(currentScenario);
-        }
-        return accumulator;
-      }, []);
-
-      const updatedScenarios = scenarios.map(scenario => {
-        const matchingScenario = uniqueFetchedScenarios.find(fetchedScenario => fetchedScenario.id === scenario.id);
-        if (matchingScenario) {
-          return { ...scenario, tries: matchingScenario.tries, max_score: matchingScenario.max_score };
-        }
-        return scenario;
-      });
+    );
+    const fetchedScenarios = await res.json();
 
-      setScenarios(updatedScenarios);
-      setIsLoading(false);
-    } catch (error) {
-      setIsLoading(false);
+    setScenarios(fetchedScenarios);
+    if ("error" in fetchedScenarios) {
+      return;
     }
+    setIsLoading(false);
+  } catch (error) {
+    setIsLoading(false);
   }
 };
 
@@ -80,7 +80,9 @@ const ScenarioStudio = () => {
     const [currentTemplateId, setCurrentTemplateId] = useState("");
 
     const [templateScenarios, setTemplateScenarios] = useState([])
+    const [templateScenariosNext, setTemplateScenariosNext] = useState(null) // cursor of the next page of templates
     const [isLoading, setIsLoading] = useState(false);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
 
     const [validationErrors, setValidationErrors] = useState([]);
     const [validationEnabled, setValidationEnabled] = useState(false)
@@ -599,37 +601,28 @@ const ScenarioStudio = () => {
         }
     };
 
-    const fetchScenarioTemplates = async () => {
+    const fetchScenarioTemplates = async (after = null) => {
+        // the listing is paginated, further pages are only fetched on demand
+        const setLoading = after ? setIsLoadingMore : setIsLoading;
         try {
-            setIsLoading(true);
-            const res = await fetch(`${process.env.REACT_APP_DJANGO_HOST}/api/studio/template-scenario`, {
+            setLoading(true);
+            const query = after ? `?after=${encodeURIComponent(after)}` : "";
+            const res = await fetch(`${process.env.REACT_APP_DJANGO_HOST}/api/studio/template-scenario${query}`, {
                 method: 'GET',
                 credentials: 'include',
             });
             const fetchedScenarioTemplates = await res.json();
 
-            let templateScenarios = [];
-
-            for (const templateScenario of fetchedScenarioTemplates.data) {
-                let name = null;
-                const scenarios = templateScenario?.scenario;
-                if (Array.isArray(scenarios)) {
-                    const baseScenario = scenarios.find(scenario => scenario.type === "BASE");
-                    if (baseScenario) {
-                        name = baseScenario.template_name;
-                    }
-                }
+            const templateScenarios = fetchedScenarioTemplates.data.map(templateScenario => ({
+                scenarioId: templateScenario.id,
+                name: templateScenario.name || null,
+            }));
 
-                const templateDto = {
-                    scenarioId: templateScenario.id,
-                    name: name,
-                };
-                templateScenarios.push(templateDto);
-            }
-
-            setTemplateScenarios(templateScenarios);
-            setIsLoading(false);
+            setTemplateScenarios(previous => after ? [...previous, ...templateScenarios] : templateScenarios);
+            setTemplateScenariosNext(fetchedScenarioTemplates.next);
+            setLoading(false);
         } catch (e) {
+            setLoading(false);
             toast({
                 title: `Could not fetch scenario templates. Please try again.`,
                 status: 'error',
@@ -852,6 +845,16 @@ const ScenarioStudio = () => {
                         }
                     </ModalBody>
                     <ModalFooter gap={5}>
+                        {!isLoading && templateScenariosNext &&
+                            <Button
+                                variant='outline'
+                                colorScheme='blue'
+                                isLoading={isLoadingMore}
+                                onClick={() => fetchScenarioTemplates(templateScenariosNext)}
+                            >
+                                Load more
+                            </Button>
+                        }
                     </ModalFooter>
                 </ModalContent>
             </Modal>